@@ -0,0 +1,43 @@
+"""Compare per-location column building with `DailyColumns.from_many`
+
+Usage: python -m bench.columnar_bench [locations] [days]
+"""
+
+import random
+import sys
+import timeit
+
+from src.open_meteo.columnar import DailyColumns
+from src.open_meteo.forecast import DAILY_VARIABLES
+
+
+def dailies(locations: int, days: int) -> list[dict]:
+    """Synthetic `daily` parts of a batch forecast response"""
+    result = []
+    for _ in range(locations):
+        daily = {"time": [1_700_000_000 + day * 86400 for day in range(days)]}
+        for variable in DAILY_VARIABLES:
+            daily[variable] = [random.uniform(-10, 30) for _ in range(days)]
+        daily["weather_code"] = [random.choice((0, 3, 61, 95)) for _ in range(days)]
+        result.append(daily)
+    return result
+
+
+def measure(function, repeat: int = 5) -> float:
+    """Best of `repeat` runs in ms, the least disturbed by other load"""
+    return min(timeit.repeat(function, number=1, repeat=repeat)) * 1000
+
+
+def main(locations: int = 10_000, days: int = 16):
+    data = dailies(locations, days)
+    print(f"{locations} locations x {days} days")
+
+    per_location = measure(lambda: [DailyColumns.from_json(daily) for daily in data])
+    print(f"  {'per location':<14}{per_location:9.1f} ms")
+
+    many = measure(lambda: DailyColumns.from_many(data))
+    print(f"  {'from_many':<14}{many:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,53 @@
+"""Compare forecast decoding through dicts with direct typed decoding
+
+Usage: python -m bench.decode_bench [locations] [days]
+"""
+
+import json
+import sys
+import timeit
+
+from src.decode import decode
+from src.open_meteo.forecast import CURRENT_VARIABLES, DAILY_VARIABLES
+from src.open_meteo.models import ForecastResponse
+
+
+def payload(locations: int, days: int) -> bytes:
+    """Synthetic batch forecast response"""
+    results = []
+    for index in range(locations):
+        daily = {"time": [1_700_000_000 + day * 86400 for day in range(days)]}
+        for variable in DAILY_VARIABLES:
+            daily[variable] = [float(day + index) for day in range(days)]
+        results.append(
+            {
+                "latitude": index * 0.1,
+                "longitude": index * 0.1,
+                "current": {variable: 1.0 for variable in CURRENT_VARIABLES},
+                "daily": daily,
+            }
+        )
+    return json.dumps(results).encode()
+
+
+def through_dicts(content: bytes) -> list[ForecastResponse]:
+    return [ForecastResponse(**result) for result in json.loads(content)]
+
+
+def typed(content: bytes) -> list[ForecastResponse]:
+    return decode(content, list[ForecastResponse])
+
+
+def main(locations: int = 100, days: int = 16, repeat: int = 5, number: int = 20):
+    content = payload(locations, days)
+    print(f"{locations} locations x {days} days, {len(content) / 1024:.1f} KiB")
+
+    for name, function in (("json + model", through_dicts), ("decode", typed)):
+        best = min(
+            timeit.repeat(lambda: function(content), repeat=repeat, number=number)
+        )
+        print(f"  {name:<14}{best / number * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,375 @@
+"""Offline benchmarks of refresh, decode and configuration hot paths
+
+Usage: python -m bench.suite [--only NAME ...] [--output FILE]
+                             [--baseline FILE] [--tolerance RATIO]
+
+HTTP requests are answered from recorded Open-Meteo responses in
+bench/fixtures. Results are stored as JSON; with a baseline every
+benchmark slower than baseline by more than tolerance is reported and the
+exit status is 1.
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable
+from loguru import logger
+from requests.adapters import BaseAdapter
+from requests.models import PreparedRequest, Response
+from urllib3 import HTTPResponse
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+
+from src.decode import decode
+from src.models import Coordinates
+from src.open_meteo.api import OpenMeteoAPI, OpenMeteoConfig
+from src.open_meteo.columnar import DailyColumns
+from src.open_meteo.forecast import FORECAST_URL, ForecastEndpoint
+from src.open_meteo.geo import GEO_URL, GeoEndpoint
+from src.open_meteo.models import ForecastResponse
+from src.open_meteo.service import ForecastStorage
+from src.setting import Setting
+from src.utils import unwrap_and_cast
+
+from .columnar_bench import dailies
+from .decode_bench import payload
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+ENDPOINTS = 10  # endpoints refreshed by WeatherAPI.refresh benchmarks
+STORED_LOCATIONS = 2000  # locations of a batch forecast written by storage benchmark
+
+
+class FixtureAdapter(BaseAdapter):
+    """Transport answering requests by URL prefix with recorded responses"""
+
+    def __init__(self, routes: dict[str, str]):
+        super().__init__()
+        self.routes = {}
+        for prefix, name in routes.items():
+            with open(os.path.join(FIXTURES, name), "rb") as file:
+                self.routes[prefix] = file.read()
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        url = request.url or ""
+        status, content = 404, b'{"error": true, "reason": "No fixture"}'
+        for prefix, fixture in self.routes.items():
+            if url.startswith(prefix):
+                status, content = 200, fixture
+                break
+
+        response = Response()
+        response.request = request
+        response.url = url
+        response.status_code = status
+        response.headers["Content-Type"] = "application/json"
+        response._content = content
+        # Cache backends read request details from the raw response
+        response.raw = HTTPResponse(
+            body=content, status=status, headers=response.headers, request_url=url
+        )
+        return response
+
+    def close(self):
+        pass
+
+
+def offline_api(**config) -> OpenMeteoAPI:
+    """OpenMeteoAPI with in-memory HTTP cache answered from fixtures"""
+    api = OpenMeteoAPI(OpenMeteoConfig(cache_backend="memory", **config))
+    api.session.mount(
+        "https://",
+        FixtureAdapter({FORECAST_URL: "forecast.json", GEO_URL: "geo.json"}),
+    )
+    return api
+
+
+# name -> (setup returning the measured callable, calls per timing)
+BENCHMARKS: dict[str, tuple[Callable[[], Callable], int]] = {}
+
+
+def benchmark(name: str, number: int = 20):
+    """Register setup function of a benchmark, setup itself isn't measured"""
+
+    def register(setup: Callable[[], Callable]) -> Callable[[], Callable]:
+        BENCHMARKS[name] = (setup, number)
+        return setup
+
+    return register
+
+
+BERLIN = Coordinates(latitude=52.52, longitude=13.41)
+
+
+@benchmark("forecast_refresh")
+def forecast_refresh():
+    api = offline_api(coordinates=BERLIN)
+    endpoint = ForecastEndpoint(api)
+
+    def run():
+        with api.session.cache_disabled():
+            endpoint.refresh()
+
+    return run
+
+
+@benchmark("forecast_refresh_cached")
+def forecast_refresh_cached():
+    endpoint = ForecastEndpoint(offline_api(coordinates=BERLIN))
+    return endpoint.refresh
+
+
+@benchmark("geo_refresh")
+def geo_refresh():
+    api = offline_api(city="Berlin", count=5)
+    endpoint = GeoEndpoint(api)
+
+    def run():
+        with api.session.cache_disabled():
+            endpoint.refresh()
+
+    return run
+
+
+def _api_with_endpoints() -> OpenMeteoAPI:
+    api = offline_api(coordinates=BERLIN)
+    for index in range(ENDPOINTS):
+        # Endpoints are keyed by class name, every one needs its own class
+        endpoint = type(f"Forecast{index}", (ForecastEndpoint,), {})(api)
+        endpoint.latitude += index
+        api.add(endpoint)
+    return api
+
+
+@benchmark(f"api_refresh_{ENDPOINTS}", number=5)
+def api_refresh():
+    api = _api_with_endpoints()
+
+    def run():
+        with api.session.cache_disabled():
+            api.refresh()
+
+    return run
+
+
+@benchmark(f"api_refresh_{ENDPOINTS}_parallel", number=5)
+def api_refresh_parallel():
+    api = _api_with_endpoints()
+
+    def run():
+        with api.session.cache_disabled():
+            api.refresh(parallel=True)
+
+    return run
+
+
+# Parent directory of files written by benchmarks, removed when the run ends
+_workspace: str | None = None
+
+
+def _directory() -> str:
+    """New directory for files of one benchmark"""
+    return tempfile.mkdtemp(prefix="offweather-bench-", dir=_workspace)
+
+
+def _setting() -> Setting:
+    directory = _directory()
+    setting = Setting(os.path.join(directory, "setting.toml"))
+    setting.update(
+        {
+            "open-meteo": {
+                "city": "Berlin",
+                "count": 5,
+                "coordinates": {"latitude": 52.52, "longitude": 13.41},
+                "tolerance": 2.5,
+                "cache_backend": "bounded",
+                "cache_max_bytes": 52428800,
+            }
+        }
+    )
+    return setting
+
+
+@benchmark("setting_fetch")
+def setting_fetch():
+    setting = _setting()
+    return lambda: setting.fetch(OpenMeteoConfig, ["open-meteo"])
+
+
+@benchmark("setting_save")
+def setting_save():
+    setting = _setting()
+    config = setting.fetch(OpenMeteoConfig, ["open-meteo"])
+    return lambda: setting.save(config, ["bench"])
+
+
+@benchmark("setting_update_burst")
+def setting_update_burst():
+    setting = _setting()
+    setting.debounce = 60
+
+    def run():
+        for index in range(50):
+            setting.add(f"key{index}", index)
+        setting.flush()
+
+    return run
+
+
+@benchmark("unwrap_and_cast_nested")
+def unwrap_and_cast_nested():
+    value = {str(key): [(str(i), str(i / 2)) for i in range(10)] for key in range(50)}
+    return lambda: unwrap_and_cast(dict[str, list[tuple[int, float]]], value)
+
+
+@benchmark("unwrap_and_cast_models")
+def unwrap_and_cast_models():
+    value = [[str(i / 10), str(i / 20)] for i in range(100)]
+    return lambda: unwrap_and_cast(list[Coordinates], value)
+
+
+@benchmark("decode_forecast_batch")
+def decode_forecast_batch():
+    content = payload(100, 16)
+    return lambda: decode(content, list[ForecastResponse])
+
+
+@benchmark("columnar_many", number=3)
+def columnar_many():
+    data = dailies(1000, 16)
+    return lambda: DailyColumns.from_many(data)
+
+
+@benchmark(f"storage_write_{STORED_LOCATIONS}", number=3)
+def storage_write():
+    locations = {
+        (index / 100, index / 100): {
+            "current": {"time": 1_700_000_000, "interval": 900, "temperature_2m": 1.5},
+            "daily": DailyColumns.from_json(daily),
+        }
+        for index, daily in enumerate(dailies(STORED_LOCATIONS, 16))
+    }
+    # Batch endpoint data of one API, as ForecastStorage reads it
+    api = SimpleNamespace(
+        id=None,
+        coordinates=None,
+        endpoints={"batch": SimpleNamespace(data={"locations": locations})},
+    )
+    directory = _directory()
+    processor = ForecastStorage(api=api, database=os.path.join(directory, "weather.db"))
+
+    def run():
+        processor.run()
+        processor.save()
+
+    return run
+
+
+def measure(setup: Callable[[], Callable], number: int, repeat: int) -> dict:
+    """Time benchmark, values are milliseconds per call"""
+    function = setup()
+    function()  # warm up caches and lazy imports
+
+    timings = [
+        total / number * 1000
+        for total in timeit.repeat(function, number=number, repeat=repeat)
+    ]
+    return {
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(names: list[str] | None = None, repeat: int = 5) -> dict:
+    """Run benchmarks, all when names aren't given"""
+    names = names or list(BENCHMARKS)
+    unknown = set(names) - BENCHMARKS.keys()
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    global _workspace
+
+    logger.disable("src")
+    workspace = tempfile.TemporaryDirectory(prefix="offweather-bench-")
+    _workspace = workspace.name
+    try:
+        results = {}
+        for name in names:
+            setup, number = BENCHMARKS[name]
+            results[name] = measure(setup, number, repeat)
+    finally:
+        _workspace = None
+        workspace.cleanup()
+        logger.enable("src")
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Benchmarks slower than baseline by more than tolerance ratio"""
+    regressions = []
+    for name, result in current["results"].items():
+        if (previous := baseline["results"].get(name)) is None:
+            continue
+        ratio = result["min_ms"] / previous["min_ms"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: {previous['min_ms']:.3f} ms -> {result['min_ms']:.3f} ms "
+                f"({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run offline benchmarks")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results JSON to file")
+    parser.add_argument("--baseline", help="results JSON of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    current = run(args.only, repeat=args.repeat)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    for name, result in current["results"].items():
+        line = (
+            f"{name:<32}{result['min_ms']:10.3f} ms  (median {result['median_ms']:.3f})"
+        )
+        if baseline and (previous := baseline["results"].get(name)):
+            line += f"  {result['min_ms'] / previous['min_ms']:.2f}x baseline"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(current, file, indent=2)
+
+    if baseline:
+        regressions = compare(current, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import cmd
+import time
 import src.static as static
 
 from loguru import logger
@@ -7,7 +8,10 @@ from types import UnionType
 from dataclasses import dataclass
 
 
+from .core import metrics, tracing
+from .core.scheduler import RefreshScheduler
 from .core.api import WeatherAPI, ConfigAPI
+from . import log
 from .setting import Setting
 from .errors import ApiError, EndpointError, ConfigError, CommandError, SettingError
 from .utils import unwrap_and_cast, unwrap_union_type, parser_arguments
@@ -22,9 +26,10 @@ class DebugShell(cmd.Cmd):
         self.api: WeatherAPI | None = None
         self.config: ConfigAPI | None = None
         self.selected: str | None = None
+        self.scheduler = RefreshScheduler()
 
-        self.setting: Setting = Setting("setting.toml")
-        logger.add(".log/debug.log")
+        self.setting: Setting = Setting("setting.toml", debounce=0.5)
+        log.configure()
         logger.info("Debug shell started")
 
         self.apis = static.apis()
@@ -67,7 +72,8 @@ class DebugShell(cmd.Cmd):
                     print("No API selected.")
                     return
                 try:
-                    self.api = self.apis[self.selected]["class"](self.config)
+                    with tracing.span(f"{self.selected}.up"):
+                        self.api = self.apis[self.selected]["class"](self.config)
                     logger.info(f"Created instance for API: {self.selected}")
                 except ApiError as e:
                     logger.error(
@@ -220,8 +226,157 @@ class DebugShell(cmd.Cmd):
         print(f"Config: {self.config if self.config else "Don't have config"}")
 
 
+    def do_cache(self, args):
+        """Manage HTTP cache of selected API
+
+        Usage: cache [stats|clear]
+        - stats : Show size, hit ratio and evictions of cache
+        - clear : Remove all cached responses
+        """
+        if not self.api:
+            print("❌ First create API")
+            return
+
+        session = getattr(self.api, "session", None)
+        cache = getattr(session, "cache", None)
+        if cache is None:
+            print("❌ API doesn't have HTTP cache")
+            return
+
+        match args.strip():
+            case "stats":
+                if hasattr(cache, "stats"):
+                    stats = cache.stats()
+                else:
+                    stats = {"backend": type(cache).__name__, "entries": len(cache.responses)}
+                for key, value in stats.items():
+                    print(f"  {key}: {value}")
+            case "clear":
+                cache.clear()
+                logger.info("HTTP cache cleared")
+            case _:
+                print("Invalid command.")
+                print(self.do_cache.__doc__)
+
+    def do_metrics(self, args):
+        """Show or export collected metrics
+
+        Usage: metrics [show|export <path>|reset]
+        - show : Show latency, sizes and counters per endpoint
+        - export <path> : Write metrics in Prometheus text format to file
+        - reset : Clear collected metrics
+        """
+        parts = args.split()
+        command = parts[0] if parts else "show"
+
+        match command:
+            case "show":
+                for metric in metrics.registry:
+                    if isinstance(metric, metrics.Histogram):
+                        for labels in metric.series():
+                            summary = metric.summary(**labels)
+                            values = ", ".join(f"{key}={value:.4g}" for key, value in summary.items())
+                            print(f"  {metric.name} {labels}: {values}")
+                    else:
+                        for _, labels, value in metric.samples():
+                            print(f"  {metric.name} {labels}: {value:g}")
+            case "export":
+                if len(parts) < 2:
+                    print("❌ Please provide a path to export metrics")
+                    return
+                try:
+                    metrics.registry.write(parts[1])
+                    logger.info(f"Metrics exported to {parts[1]}")
+                except OSError as e:
+                    print(f"❌ {e}")
+            case "reset":
+                metrics.registry.reset()
+                logger.info("Metrics cleared")
+            case _:
+                print("Invalid command.")
+                print(self.do_metrics.__doc__)
+
+    def do_trace(self, args):
+        """Show recent tracing spans
+
+        Usage: trace [slowest [count]|tree [trace_id]|file <path>|clear]
+        - slowest [count] : Show slowest recent spans, 10 by default
+        - tree [trace_id] : Show spans of trace as tree, latest trace by default
+        - file <path> : Also append finished spans to JSON lines file
+        - clear : Forget recent spans
+        """
+        parts = args.split()
+        command = parts[0] if parts else "slowest"
+
+        match command:
+            case "slowest":
+                count = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 10
+                for span in tracing.buffer.slowest(count):
+                    status = "" if span.status == "ok" else f" ❌ {span.error}"
+                    print(f"  {span.duration * 1000:9.2f} ms  {span.name} [{span.trace_id}]{status}")
+            case "tree":
+                spans = tracing.buffer.spans()
+                if not spans:
+                    print("❌ No spans recorded")
+                    return
+                trace = parts[1] if len(parts) > 1 else spans[-1].trace_id
+                children: dict[str | None, list[tracing.Span]] = {}
+                for span in tracing.buffer.trace(trace):
+                    children.setdefault(span.parent_id, []).append(span)
+                ids = {span.span_id for spans in children.values() for span in spans}
+                # Parents evicted from buffer: show their children as roots
+                stack = [(span, 0) for parent, spans in children.items() if parent not in ids for span in reversed(spans)]
+                while stack:
+                    span, depth = stack.pop()
+                    print(f"  {'  ' * depth}{span.name} {span.duration * 1000:.2f} ms ({span.thread})")
+                    stack.extend((child, depth + 1) for child in reversed(children.get(span.span_id, [])))
+            case "file":
+                if len(parts) < 2:
+                    print("❌ Please provide a path for spans")
+                    return
+                tracing.exporters.append(tracing.JsonLinesExporter(parts[1]))
+                logger.info(f"Spans exported to {parts[1]}")
+            case "clear":
+                tracing.buffer.clear()
+                logger.info("Spans cleared")
+            case _:
+                print("Invalid command.")
+                print(self.do_trace.__doc__)
+
+    def do_schedule(self, args):
+        """Refresh APIs in background when new model runs are published
+
+        Usage: schedule [add|start|stop|status]
+        - add : Schedule created API, refreshed at once
+        - start : Start background scheduler
+        - stop : Stop background scheduler
+        - status : Show last and next run of scheduled refreshes
+        """
+        match args.strip() or "status":
+            case "add":
+                if not self.api:
+                    print("❌ First create API")
+                    return
+                name = self.scheduler.add(self.api)
+                logger.info(f"Scheduled refresh {name}")
+            case "start":
+                self.scheduler.start()
+            case "stop":
+                self.scheduler.stop()
+            case "status":
+                for state in self.scheduler.state():
+                    last = time.strftime("%H:%M:%S", time.localtime(state.last_run)) if state.last_run else "never"
+                    next = time.strftime("%H:%M:%S", time.localtime(state.next_run))
+                    error = f" ❌ {state.last_error}" if state.last_error else ""
+                    print(f"  {state.name}: last {last}, next {next}, runs {state.runs}, apis {len(state.members)}{error}")
+            case _:
+                print("Invalid command.")
+                print(self.do_schedule.__doc__)
+
     def do_exit(self, args):
         """Exit the debug shell."""
+        self.scheduler.stop()
+        self.setting.flush()
         logger.info("Debug shell stopped")
         return 1
 
@@ -283,7 +438,8 @@ class DebugShell(cmd.Cmd):
         try:
             if argument:
                 workflow = self.workflows[argument]
-                workflow["executable"](self)
+                with tracing.span(f"workflow.{argument}"):
+                    workflow["executable"](self)
                 logger.info(f"Workflow {argument} started")
             else:
                 for key, value in self.workflows.items():
@@ -1,36 +1,99 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from typing import final, Any
 from loguru import logger
 
+import asyncio
+import contextvars
 import itertools as it
 
+from src.core import tracing
+from src.core.metrics import registry, current_endpoint
 from src.errors import EndpointError, CommandError
+from src.log import sampled
 from src.static import apis
 from src.utils import classproperty
 
 
+REFRESH_SECONDS = registry.histogram(
+    "offweather_endpoint_refresh_seconds",
+    "Duration of endpoint refresh including cache lookup and decoding",
+    ("api", "endpoint"),
+)
+REFRESH_ERRORS = registry.counter(
+    "offweather_endpoint_refresh_errors",
+    "Failed endpoint refreshes",
+    ("api", "endpoint"),
+)
+
+
 @dataclass
 class ConfigAPI(ABC):
     pass
 
 
+@dataclass
+class RefreshSummary:
+    """Result of refreshing several endpoints: data per endpoint and errors per endpoint"""
+
+    results: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def raise_for_errors(self):
+        """Raise EndpointError if any endpoint failed"""
+        if self.errors:
+            failed = ", ".join(
+                f"{name}: {error}" for name, error in self.errors.items()
+            )
+            raise EndpointError(f"Failed to refresh endpoints: {failed}")
+
+
+# Revisions of endpoint data, unique across endpoints of the process
+_revisions = it.count(1)
+
+
 class WeatherEndpoint(ABC):
     @classproperty
     def name(cls) -> str:
         return cls.__name__
 
+    @property
+    def data(self) -> dict[str, Any]:
+        return self._data
+
+    @data.setter
+    def data(self, value: dict[str, Any]):
+        """Replacing data gives it a new revision, mutating in place does not"""
+        self._data = value
+        self.revision = next(_revisions)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        tracing.instrument(cls, "refresh", "arefresh")
+
     @abstractmethod
     def __init__(self, api):
         self.api = api
         self.data: dict[str, Any] = {}
-        logger.info(f"Initialized endpoint {self.name} with attributes {self.__dict__}")
+        # Thousands of endpoints may be created: sample and render attributes only when logged
+        sampled(100).opt(lazy=True).debug(
+            "Initialized endpoint {} with attributes {}", lambda: self.name, lambda: self.__dict__
+        )
 
     @abstractmethod
     def refresh(self):
         """Update data for variables that store weather data"""
         pass
 
+    async def arefresh(self):
+        """Asynchronous refresh, by default runs blocking refresh in a worker thread"""
+        await asyncio.to_thread(self.refresh)
+
     @abstractmethod
     def check(self):
         """Check Endpoint"""
@@ -42,6 +105,10 @@ class CommandAPI(ABC):
     def name(cls) -> str:
         return cls.__name__
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        tracing.instrument(cls, "execute")
+
     @abstractmethod
     def __init__(self, api) -> None:
         self.api = api
@@ -105,11 +172,91 @@ class WeatherAPI(ABC):
         raise EndpointError(f"Endpoint with name '{name}' does not exist")
 
     @final
-    def refresh(self):
-        """Refresh data for all endpoints"""
+    def refresh(self, parallel: bool = False, workers: int = 8) -> RefreshSummary:
+        """Refresh data for all endpoints
+
+        Sequential mode stops on the first error. Parallel mode refreshes
+        endpoints on a pool of at most `workers` threads, a failing endpoint
+        doesn't abort the rest, errors are collected into the summary.
+        """
         logger.info(f"Refreshing endpoints {self.__class__.__name__}")
-        for endpoint in self._endpoints.values():
-            endpoint.refresh()
+        summary = RefreshSummary()
+
+        with tracing.span(f"{self.name}.refresh", parallel=parallel):
+            if not self._endpoints:
+                return summary
+
+            if not parallel:
+                for name, endpoint in self._endpoints.items():
+                    self._refresh_endpoint(name, endpoint)
+                    summary.results[name] = endpoint.data
+                return summary
+
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(workers, len(self._endpoints))),
+                thread_name_prefix=f"{self.name}-refresh",
+            ) as pool:
+                # Every task runs in own copy of context: spans of workers keep this parent
+                futures = {
+                    pool.submit(contextvars.copy_context().run, self._refresh_endpoint, name, endpoint): name
+                    for name, endpoint in self._endpoints.items()
+                }
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        future.result()
+                        summary.results[name] = self._endpoints[name].data
+                    except Exception as e:
+                        logger.error(f"Endpoint {name} refresh failed: {e}")
+                        summary.errors[name] = e
+
+        return summary
+
+    @final
+    async def arefresh(self) -> RefreshSummary:
+        """Refresh data for all endpoints concurrently on the running event loop"""
+        logger.info(f"Refreshing endpoints {self.__class__.__name__} asynchronously")
+        summary = RefreshSummary()
+
+        names = list(self._endpoints)
+        with tracing.span(f"{self.name}.arefresh"):
+            results = await asyncio.gather(
+                *(self._arefresh_endpoint(name, self._endpoints[name]) for name in names),
+                return_exceptions=True,
+            )
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.error(f"Endpoint {name} refresh failed: {result}")
+                summary.errors[name] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                summary.results[name] = self._endpoints[name].data
+
+        return summary
+
+    def _refresh_endpoint(self, name: str, endpoint: WeatherEndpoint):
+        """Refresh one endpoint recording duration and failure metrics"""
+        token = current_endpoint.set(name)
+        try:
+            with REFRESH_SECONDS.time(api=self.name, endpoint=name):
+                endpoint.refresh()
+        except Exception:
+            REFRESH_ERRORS.inc(api=self.name, endpoint=name)
+            raise
+        finally:
+            current_endpoint.reset(token)
+
+    async def _arefresh_endpoint(self, name: str, endpoint: WeatherEndpoint):
+        token = current_endpoint.set(name)
+        try:
+            with REFRESH_SECONDS.time(api=self.name, endpoint=name):
+                await endpoint.arefresh()
+        except Exception:
+            REFRESH_ERRORS.inc(api=self.name, endpoint=name)
+            raise
+        finally:
+            current_endpoint.reset(token)
 
     @abstractmethod
     def check(self):
@@ -121,6 +268,10 @@ class WeatherAPI(ABC):
         """Start API"""
         pass
 
+    async def aclose(self):
+        """Release async resources bound to the running event loop"""
+        pass
+
     @final
     def admin(self):
         """Not-save command for gets all commands"""
@@ -133,10 +284,11 @@ class WeatherAPI(ABC):
         """Execute Command"""
         name = command.name if isinstance(command, CommandAPI) else command
 
-        if result := self.commands.get(name):
-            result.execute(*args, **kwargs)
-        else:
-            raise CommandError(f"Avalible command with name '{name}' does not exist")
+        with tracing.span(f"{self.name}.execute", command=name):
+            if result := self.commands.get(name):
+                result.execute(*args, **kwargs)
+            else:
+                raise CommandError(f"Avalible command with name '{name}' does not exist")
 
     @property
     def commands(self):
@@ -0,0 +1,145 @@
+from array import array
+from bisect import bisect_left
+from typing import Sequence
+from loguru import logger
+
+import mmap
+import os
+
+from src.errors import DataBaseError
+
+
+class TimeSeriesArchive:
+    """Append-only binary archive of time series
+
+    Every (location, variable) pair is two files: `<variable>.time` with int64
+    timestamps and `<variable>.values` with float32 values. Files are read
+    back through mmap, so a time range is a zero-copy memoryview slice.
+    """
+
+    TIME_SUFFIX = ".time"
+    VALUES_SUFFIX = ".values"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, location_id: str, variable: str) -> str:
+        location = location_id.replace(os.sep, "_")
+        return os.path.join(self.root, location, variable.replace(os.sep, "_"))
+
+    def last_time(self, location_id: str, variable: str) -> int | None:
+        """Get last archived timestamp of variable"""
+        path = self._path(location_id, variable) + self.TIME_SUFFIX
+        try:
+            with open(path, "rb") as file:
+                file.seek(0, os.SEEK_END)
+                if file.tell() < 8:
+                    return None
+                file.seek(-8, os.SEEK_END)
+                return array("q", file.read(8))[0]
+        except FileNotFoundError:
+            return None
+
+    def append(
+        self,
+        location_id: str,
+        variable: str,
+        times: Sequence[int],
+        values: Sequence[float],
+    ) -> int:
+        """Append points newer than the last archived one, returns appended count"""
+        if len(times) != len(values):
+            raise DataBaseError(
+                f"Length of times {len(times)} and values {len(values)} don't match"
+            )
+
+        path = self._path(location_id, variable)
+        try:
+            self._align(path)
+        except OSError as e:
+            logger.error(f"Failed to repair archive {path}: {e}")
+            raise DataBaseError(f"Failed to repair archive {path}: {e}")
+
+        last = self.last_time(location_id, variable)
+        start = 0 if last is None else bisect_left(times, last + 1)
+        if start == len(times):
+            return 0
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Values first: a crash between writes leaves values without time,
+            # they are dropped by the alignment of the next append
+            with open(path + self.VALUES_SUFFIX, "ab") as file:
+                array("f", values[start:]).tofile(file)
+            with open(path + self.TIME_SUFFIX, "ab") as file:
+                array("q", times[start:]).tofile(file)
+        except OSError as e:
+            logger.error(f"Failed to append to archive {path}: {e}")
+            raise DataBaseError(f"Failed to append to archive {path}: {e}")
+
+        return len(times) - start
+
+    def _align(self, path: str):
+        """Truncate files to points present in both, left over by an interrupted append"""
+        sizes = []
+        for suffix, itemsize in ((self.TIME_SUFFIX, 8), (self.VALUES_SUFFIX, 4)):
+            try:
+                sizes.append((path + suffix, os.path.getsize(path + suffix), itemsize))
+            except FileNotFoundError:
+                sizes.append((path + suffix, 0, itemsize))
+
+        count = min(size // itemsize for _, size, itemsize in sizes)
+        for file, size, itemsize in sizes:
+            if size > count * itemsize:
+                logger.warning(
+                    f"Dropping {size - count * itemsize} bytes of interrupted append from {file}"
+                )
+                os.truncate(file, count * itemsize)
+
+    @staticmethod
+    def _map(path: str, typecode: str) -> memoryview:
+        try:
+            with open(path, "rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return memoryview(array(typecode))
+                # The map stays alive as long as the returned view
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return memoryview(array(typecode))
+
+        view = memoryview(mapped)
+        itemsize = array(typecode).itemsize
+        return view[: len(view) - len(view) % itemsize].cast(typecode)
+
+    def read(
+        self,
+        location_id: str,
+        variable: str,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> tuple[memoryview, memoryview]:
+        """Read (times, values) in range [start, end) as zero-copy views"""
+        path = self._path(location_id, variable)
+        times = self._map(path + self.TIME_SUFFIX, "q")
+        values = self._map(path + self.VALUES_SUFFIX, "f")
+
+        size = min(len(times), len(values))
+        lo = 0 if start is None else bisect_left(times, start, 0, size)
+        hi = size if end is None else bisect_left(times, end, lo, size)
+        return times[lo:hi], values[lo:hi]
+
+    def variables(self, location_id: str) -> list[str]:
+        """Get archived variables of location"""
+        try:
+            names = os.listdir(os.path.dirname(self._path(location_id, "_")))
+        except FileNotFoundError:
+            return []
+        return sorted(
+            name.removesuffix(self.TIME_SUFFIX)
+            for name in names
+            if name.endswith(self.TIME_SUFFIX)
+        )
+
+    def __str__(self):
+        return f"TimeSeriesArchive({self.root})"
@@ -0,0 +1,292 @@
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+from loguru import logger
+from requests_cache.backends.base import BaseCache, BaseStorage
+from requests_cache.backends.sqlite import SQLiteDict
+
+import gzip
+import os
+import sqlite3
+import threading
+import time
+
+from src.errors import SettingError
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+
+@dataclass(frozen=True)
+class Codec:
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def codec(name: str | None) -> Codec:
+    """Get compression codec by name: None, 'gzip' or 'zstd'"""
+    match name:
+        case None | "none":
+            return Codec("none", lambda data: data, lambda data: data)
+        case "gzip":
+            return Codec(
+                "gzip",
+                lambda data: gzip.compress(data, compresslevel=6),
+                gzip.decompress,
+            )
+        case "zstd":
+            if zstandard is None:
+                raise SettingError("zstd compression requires package 'zstandard'")
+            return Codec(
+                "zstd",
+                zstandard.ZstdCompressor(level=3).compress,
+                lambda data: zstandard.ZstdDecompressor().decompress(data),
+            )
+        case _:
+            raise SettingError(f"Unknown compression '{name}'")
+
+
+class BoundedStorage(BaseStorage):
+    """Response storage in SQLite with a byte budget
+
+    Stored bodies are optionally compressed. When the total size exceeds
+    `max_bytes`, least recently used (lru) or least frequently used (lfu)
+    entries are evicted. Access times and hits of reads are kept in memory
+    and written in one batch before eviction, so a cache hit doesn't write.
+    """
+
+    # Pending access updates written once this many keys were read
+    ACCESS_BATCH = 256
+
+    EVICTION_ORDER = {
+        "lru": "accessed",
+        "lfu": "hits, accessed",
+    }
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int | None = None,
+        eviction: str = "lru",
+        compression: str | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        if eviction not in self.EVICTION_ORDER:
+            raise SettingError(f"Unknown eviction policy '{eviction}'")
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.codec = codec(compression)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if directory := os.path.dirname(path):
+            os.makedirs(directory, exist_ok=True)
+
+        # Key -> (last access, hits) of reads not yet written
+        self._accessed: dict[str, tuple[float, int]] = {}
+
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Cache entries can be fetched again: no fsync on every commit
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                accessed REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        self._connection.commit()
+        self._size = self._total_size()
+
+    def _total_size(self) -> int:
+        row = self._connection.execute("SELECT SUM(size) FROM responses").fetchone()
+        return row[0] or 0
+
+    def __getitem__(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                raise KeyError(key)
+
+            self.hits += 1
+            hits = self._accessed.get(key, (0.0, 0))[1]
+            self._accessed[key] = (time.time(), hits + 1)
+            if len(self._accessed) >= self.ACCESS_BATCH:
+                self.flush_access()
+        return self.deserialize(key, self.codec.decompress(row[0]))
+
+    def flush_access(self):
+        """Write pending access times and hits of reads"""
+        with self._lock:
+            if not self._accessed:
+                return
+            with self._connection:
+                self._connection.executemany(
+                    "UPDATE responses SET accessed = ?, hits = hits + ? WHERE key = ?",
+                    (
+                        (accessed, hits, key)
+                        for key, (accessed, hits) in self._accessed.items()
+                    ),
+                )
+            self._accessed.clear()
+
+    def __setitem__(self, key, value):
+        raw = self.serialize(value)
+        blob = self.codec.compress(raw)
+
+        with self._lock:
+            self._accessed.pop(key, None)
+            with self._connection:
+                previous = self._connection.execute(
+                    "SELECT size FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, raw_size, accessed, hits) VALUES (?, ?, ?, ?, ?, 0)",
+                    (key, blob, len(blob), len(raw), time.time()),
+                )
+            self._size += len(blob) - (previous[0] if previous else 0)
+            self.evict()
+
+    def __delitem__(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(key)
+
+            with self._connection:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._accessed.pop(key, None)
+            self._size -= row[0]
+
+    def bulk_delete(self, keys: Iterable):
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(
+                    "DELETE FROM responses WHERE key = ?", ((key,) for key in keys)
+                )
+            self._size = self._total_size()
+
+    def __iter__(self) -> Iterator:
+        with self._lock:
+            rows = self._connection.execute("SELECT key FROM responses").fetchall()
+        return (row[0] for row in rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            with self._connection:
+                self._connection.execute("DELETE FROM responses")
+            self._accessed.clear()
+            self._size = 0
+
+    def evict(self):
+        """Remove entries by eviction policy until storage fits the budget"""
+        if self.max_bytes is None:
+            return
+
+        with self._lock:
+            if self._size <= self.max_bytes:
+                return
+
+            # Order of eviction depends on reads since last write
+            self.flush_access()
+            order = self.EVICTION_ORDER[self.eviction]
+            rows = self._connection.execute(
+                f"SELECT key, size FROM responses ORDER BY {order}"
+            )
+            victims = []
+            for key, size in rows:
+                if self._size <= self.max_bytes:
+                    break
+                victims.append((key,))
+                self._size -= size
+            rows.close()
+
+            with self._connection:
+                self._connection.executemany(
+                    "DELETE FROM responses WHERE key = ?", victims
+                )
+            self.evictions += len(victims)
+            logger.debug(f"Evicted {len(victims)} cached responses from {self.path}")
+
+    @property
+    def size(self) -> int:
+        """Stored bytes after compression"""
+        return self._size
+
+    def stats(self) -> dict:
+        with self._lock:
+            self.flush_access()
+            entries, raw_bytes = self._connection.execute(
+                "SELECT COUNT(*), SUM(raw_size) FROM responses"
+            ).fetchone()
+
+        requests = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": self._size,
+            "raw_bytes": raw_bytes or 0,
+            "max_bytes": self.max_bytes,
+            "eviction": self.eviction,
+            "compression": self.codec.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            self.flush_access()
+            self._connection.close()
+
+
+class BoundedCache(BaseCache):
+    """requests_cache backend with size-bounded, compressed response storage"""
+
+    def __init__(
+        self,
+        path: str = ".cache/http_cache.sqlite",
+        max_bytes: int | None = None,
+        eviction: str = "lru",
+        compression: str | None = None,
+        **kwargs,
+    ):
+        super().__init__(cache_name=path, **kwargs)
+        self.responses = BoundedStorage(
+            path,
+            max_bytes=max_bytes,
+            eviction=eviction,
+            compression=compression,
+            serializer="pickle",
+        )
+        self.redirects = SQLiteDict(path, table_name="redirects", serializer=None)
+
+    def stats(self) -> dict:
+        return self.responses.stats()  # type: ignore
+
+    def close(self):
+        self.responses.close()
+        self.redirects.close()
@@ -61,4 +61,4 @@ class Data(CommandAPI):
             raise SettingError("Don't set name")
 
         end = self.api.get(name)
-        logger.info(f"{end.name} data: {end.data}")
+        logger.opt(lazy=True).info("{} data: {}", lambda: end.name, lambda: end.data)
@@ -0,0 +1,273 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from urllib.parse import urlsplit
+
+import math
+import os
+import tempfile
+import threading
+import time
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = tuple(1024 * 4**power for power in range(9))  # 1 KiB .. 64 MiB
+
+# Endpoint being refreshed, labels HTTP metrics recorded deeper in the stack
+current_endpoint: ContextVar[str | None] = ContextVar("current_endpoint", default=None)
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if labels.keys() != set(self.labels):
+            raise ValueError(f"Metric {self.name} expects labels {self.labels}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    @abstractmethod
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        """(name suffix, labels, value) of every series"""
+        pass
+
+    @abstractmethod
+    def reset(self):
+        """Forget every series"""
+        pass
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield "_total", dict(zip(self.labels, key)), value
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per series: count in every bucket (not cumulative), sum, count
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            if (series := self._series.get(key)) is None:
+                series = self._series[key] = ([0] * len(self.buckets), [0.0, 0])
+            series[0][index] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe duration of block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def summary(self, **labels) -> dict:
+        """Count, sum, mean and bucket estimated quantiles of one series"""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None:
+                return {"count": 0, "sum": 0.0}
+            counts, (total, count) = list(series[0]), series[1]
+
+        result = {"count": count, "sum": total, "mean": total / count}
+        for quantile in (0.5, 0.95, 0.99):
+            rank, seen = quantile * count, 0
+            for bound, amount in zip(self.buckets, counts):
+                seen += amount
+                if seen >= rank:
+                    result[f"p{round(quantile * 100)}"] = bound
+                    break
+        return result
+
+    def series(self) -> list[dict[str, str]]:
+        """Labels of every observed series"""
+        with self._lock:
+            return [dict(zip(self.labels, key)) for key in self._series]
+
+    def samples(self):
+        with self._lock:
+            series = [(key, list(c), list(s)) for key, (c, s) in self._series.items()]
+        for key, counts, (total, count) in series:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, amount in zip(self.buckets, counts):
+                cumulative += amount
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                yield "_bucket", labels | {"le": le}, cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, count
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Process-wide collection of metrics, exported in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register[M: Metric](self, metric: M) -> M:
+        with self._lock:
+            existing = self._metrics.setdefault(metric.name, metric)
+        if type(existing) is not type(metric) or existing.labels != metric.labels:
+            raise ValueError(f"Metric {metric.name} already registered differently")
+        return existing  # type: ignore
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def __iter__(self) -> Iterator[Metric]:
+        with self._lock:
+            return iter(list(self._metrics.values()))
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def prometheus(self) -> str:
+        """Metrics in Prometheus text exposition format"""
+        lines = []
+        for metric in self:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(
+                    f"{metric.name}{suffix}{{{text}}} {value}"
+                    if text
+                    else f"{metric.name}{suffix} {value}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write Prometheus text to file atomically, e.g. for node exporter"""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(descriptor, "w") as file:
+            file.write(self.prometheus())
+        os.replace(temporary, path)
+
+    def reset(self):
+        for metric in self:
+            metric.reset()
+
+
+registry = MetricsRegistry()
+
+
+HTTP_SECONDS = registry.histogram(
+    "offweather_http_request_seconds",
+    "Time from sending request to receiving response headers over network",
+    ("endpoint",),
+)
+HTTP_BYTES = registry.histogram(
+    "offweather_http_response_bytes",
+    "Size of response bodies",
+    ("endpoint",),
+    buckets=BYTES_BUCKETS,
+)
+HTTP_RESPONSES = registry.counter(
+    "offweather_http_responses",
+    "Responses by status code",
+    ("endpoint", "status"),
+)
+HTTP_CACHE = registry.counter(
+    "offweather_http_cache",
+    "HTTP cache lookups: hit, stale (served while revalidating) or miss",
+    ("endpoint", "result"),
+)
+HTTP_RETRIES = registry.counter(
+    "offweather_http_retries",
+    "Retried requests before the final response",
+    ("endpoint",),
+)
+
+
+def endpoint_label(url: str) -> str:
+    """Endpoint being refreshed, path of url outside of a refresh"""
+    return current_endpoint.get() or urlsplit(url).path
+
+
+def observe_result(endpoint: str, result: str, status: int, size: int):
+    """Record cache result, status code and size of a response returned to caller"""
+    HTTP_CACHE.inc(endpoint=endpoint, result=result)
+    HTTP_RESPONSES.inc(endpoint=endpoint, status=status)
+    HTTP_BYTES.observe(size, endpoint=endpoint)
+
+
+def observe_response(response, *args, **kwargs):
+    """requests response hook recording HTTP metrics of a response"""
+    endpoint = endpoint_label(response.url)
+
+    if getattr(response, "from_cache", False):
+        result = "stale" if getattr(response, "is_expired", False) else "hit"
+    else:
+        result = "miss"
+        HTTP_SECONDS.observe(response.elapsed.total_seconds(), endpoint=endpoint)
+        retries = getattr(response.raw, "retries", None)
+        if retries is not None and retries.history:
+            HTTP_RETRIES.inc(len(retries.history), endpoint=endpoint)
+
+    observe_result(endpoint, result, response.status_code, len(response.content))
+    return response
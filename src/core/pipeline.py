@@ -0,0 +1,211 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Hashable, Iterable
+from loguru import logger
+
+import contextvars
+import itertools
+import threading
+import time
+
+from src.core import tracing
+from src.core.metrics import registry
+from src.errors import ProcessorError
+
+if TYPE_CHECKING:
+    from src.core.service import WeatherProcessor
+
+
+PROCESSOR_SECONDS = registry.histogram(
+    "offweather_processor_seconds",
+    "Duration of processor steps run by pipelines",
+    ("processor", "step"),
+)
+PROCESSOR_SKIPPED = registry.counter(
+    "offweather_processor_skipped",
+    "Processors skipped by pipelines because their inputs didn't change",
+    ("processor",),
+)
+
+
+@dataclass
+class PipelineConfig:
+    workers: int = 4  # processors of one stage running at once
+    incremental: bool = True  # skip processors whose inputs didn't change
+
+
+@dataclass
+class StageTiming:
+    name: str
+    stage: int  # index of stage, processors of one stage run concurrently
+    run: float = 0.0  # seconds
+    save: float = 0.0  # seconds
+    skipped: bool = False
+    error: str | None = None
+
+
+@dataclass
+class PipelineReport:
+    """Result of one pipeline run: timing per processor and errors per processor"""
+
+    stages: list[list[str]] = field(default_factory=list)
+    timings: dict[str, StageTiming] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+    duration: float = 0.0  # seconds
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def skipped(self) -> list[str]:
+        return [name for name, timing in self.timings.items() if timing.skipped]
+
+    def raise_for_errors(self):
+        """Raise ProcessorError if any processor failed"""
+        if self.errors:
+            failed = ", ".join(
+                f"{name}: {error}" for name, error in self.errors.items()
+            )
+            raise ProcessorError(f"Failed to run processors: {failed}")
+
+
+class Pipeline:
+    """Runs processors in order of their associations
+
+    Associations of a processor are the processors whose results it uses,
+    they are run before it. Processors of one stage don't depend on each
+    other and run concurrently on a pool of `workers` threads. A processor
+    is skipped when neither its inputs nor the results of its associations
+    changed since its last successful run. Processors depending on a failed
+    one are not run.
+    """
+
+    def __init__(self, config: PipelineConfig | None = None):
+        self.config = config or PipelineConfig()
+
+        # Processor name -> key of inputs and revision of results of last run
+        self._done: dict[str, tuple[Hashable, int]] = {}
+        self._revisions = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def graph(
+        processors: Iterable[WeatherProcessor],
+    ) -> dict[str, WeatherProcessor]:
+        """Processors by name including associations not given explicitly"""
+        result: dict[str, WeatherProcessor] = {}
+        pending = list(processors)
+        while pending:
+            processor = pending.pop()
+            if (known := result.get(processor.name)) is not None:
+                if known is not processor:
+                    raise ProcessorError(
+                        f"Different processors with name '{processor.name}'"
+                    )
+                continue
+            result[processor.name] = processor
+            pending.extend(processor.associations.values())
+        return result
+
+    @staticmethod
+    def stages(processors: dict[str, WeatherProcessor]) -> list[list[str]]:
+        """Names of processors grouped into stages, each after its associations"""
+        remaining = {
+            name: set(processor.associations) for name, processor in processors.items()
+        }
+        result = []
+        while remaining:
+            ready = sorted(name for name, needs in remaining.items() if not needs)
+            if not ready:
+                raise ProcessorError(
+                    f"Associations of processors form a cycle: {', '.join(sorted(remaining))}"
+                )
+            for name in ready:
+                del remaining[name]
+            for needs in remaining.values():
+                needs.difference_update(ready)
+            result.append(ready)
+        return result
+
+    def _key(self, processor: WeatherProcessor) -> Hashable | None:
+        inputs = processor.inputs()
+        if inputs is None:
+            return None
+        with self._lock:
+            upstream = tuple(
+                (name, self._done.get(name, (None, 0))[1])
+                for name in sorted(processor.associations)
+            )
+        return inputs, upstream
+
+    def _process(self, processor: WeatherProcessor, timing: StageTiming):
+        name = processor.name
+        key = self._key(processor) if self.config.incremental else None
+
+        with self._lock:
+            last = self._done.get(name)
+        if key is not None and last is not None and last[0] == key:
+            timing.skipped = True
+            PROCESSOR_SKIPPED.inc(processor=name)
+            return
+
+        with tracing.span(f"{name}.process", stage=timing.stage):
+            start = time.perf_counter()
+            processor.run()
+            timing.run = time.perf_counter() - start
+
+            start = time.perf_counter()
+            processor.save()
+            timing.save = time.perf_counter() - start
+
+        PROCESSOR_SECONDS.observe(timing.run, processor=name, step="run")
+        PROCESSOR_SECONDS.observe(timing.save, processor=name, step="save")
+        with self._lock:
+            self._done[name] = (key, next(self._revisions))
+
+    def run(self, processors: Iterable[WeatherProcessor]) -> PipelineReport:
+        """Run processors and their associations, errors are collected in report"""
+        start = time.perf_counter()
+        graph = self.graph(processors)
+        report = PipelineReport(stages=self.stages(graph))
+
+        with tracing.span("Pipeline.run", processors=len(graph)):
+            with ThreadPoolExecutor(
+                max_workers=self.config.workers, thread_name_prefix="pipeline"
+            ) as pool:
+                for index, names in enumerate(report.stages):
+                    futures = {}
+                    for name in names:
+                        timing = report.timings[name] = StageTiming(name, index)
+                        failed = [
+                            upstream
+                            for upstream in graph[name].associations
+                            if upstream in report.errors
+                        ]
+                        if failed:
+                            timing.error = f"Associations failed: {', '.join(failed)}"
+                            report.errors[name] = ProcessorError(timing.error)
+                            continue
+                        future = pool.submit(
+                            contextvars.copy_context().run,
+                            self._process,
+                            graph[name],
+                            timing,
+                        )
+                        futures[future] = name
+
+                    for future in as_completed(futures):
+                        name = futures[future]
+                        if (error := future.exception()) is not None:
+                            logger.error(f"Processor {name} failed: {error}")
+                            report.timings[name].error = str(error)
+                            report.errors[name] = error  # type: ignore
+
+        report.duration = time.perf_counter() - start
+        logger.info(
+            f"Pipeline ran {len(graph)} processors in {len(report.stages)} stages "
+            f"within {report.duration:.3f} s, {len(report.skipped)} skipped"
+        )
+        return report
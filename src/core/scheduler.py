@@ -0,0 +1,229 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from typing import Callable
+from loguru import logger
+
+import asyncio
+import random
+import threading
+import time
+
+from src.core import tracing
+from src.core.api import WeatherAPI
+
+
+@dataclass
+class SchedulerConfig:
+    jitter: float = 300.0  # seconds, random delay after model run spreads load
+    max_concurrent: int = 4  # refreshes running at once
+    interval: float = 3600.0  # seconds, cadence of APIs without cache policy
+    retry_after: float = 300.0  # seconds, delay after failed refresh
+    grid: float = 0.1  # degrees, locations in one cell share a refresh
+    max_sleep: float = 60.0  # seconds, upper bound of one wait of the loop
+    seed: int | None = None
+
+
+@dataclass
+class JobState:
+    name: str
+    next_run: float  # unixtime
+    last_run: float | None = None  # unixtime
+    last_duration: float | None = None  # seconds
+    last_error: str | None = None
+    runs: int = 0
+    failures: int = 0
+    members: list[str] = field(default_factory=list)
+
+
+@dataclass
+class _Job:
+    state: JobState
+    apis: list[WeatherAPI]
+    running: bool = False
+
+
+class RefreshScheduler:
+    """Refreshes many WeatherAPI instances on the cadence of upstream model runs
+
+    APIs with a cache policy are refreshed once data of the next model run
+    is published, others every `interval`. A random jitter spreads requests,
+    at most `max_concurrent` refreshes run at once. APIs of one type whose
+    coordinates fall into the same grid cell form one job: only the first is
+    refreshed, the others receive its endpoint data.
+    """
+
+    def __init__(
+        self,
+        config: SchedulerConfig | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.config = config or SchedulerConfig()
+        self.clock = clock
+        self.random = random.Random(self.config.seed)
+
+        self._jobs: dict[str, _Job] = {}
+        self._cells: dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.config.max_concurrent, thread_name_prefix="scheduler"
+        )
+
+    def _cell(self, api: WeatherAPI) -> tuple | None:
+        coordinates = getattr(api, "coordinates", None)
+        if coordinates is None:
+            return None
+        return (
+            api.name,
+            round(coordinates.latitude / self.config.grid),
+            round(coordinates.longitude / self.config.grid),
+            tuple(sorted(api.endpoints)),
+        )
+
+    def add(self, api: WeatherAPI) -> str:
+        """Schedule API, refreshed at once. Returns name of its job"""
+        cell = self._cell(api)
+        with self._lock:
+            if cell is not None and (name := self._cells.get(cell)) is not None:
+                job = self._jobs[name]
+                job.apis.append(api)
+                job.state.members.append(f"{api.name}#{id(api):x}")
+                return name
+
+            # Endpoints are part of the cell: jobs of one location differ by them
+            name = (
+                f"{api.name}@{api.coordinates.key}/{'+'.join(cell[3])}"  # type: ignore
+                if cell is not None
+                else f"{api.name}#{id(api):x}"
+            )
+            self._jobs[name] = _Job(
+                JobState(name, self.clock(), members=[f"{api.name}#{id(api):x}"]),
+                [api],
+            )
+            if cell is not None:
+                self._cells[cell] = name
+
+        self._wake.set()
+        return name
+
+    def remove(self, name: str):
+        """Stop scheduling job"""
+        with self._lock:
+            self._jobs.pop(name)
+            self._cells = {
+                cell: job for cell, job in self._cells.items() if job != name
+            }
+
+    def state(self) -> list[JobState]:
+        """Snapshot of every job ordered by next run"""
+        with self._lock:
+            states = [
+                replace(job.state, members=list(job.state.members))
+                for job in self._jobs.values()
+            ]
+        return sorted(states, key=lambda state: state.next_run)
+
+    def next_run(self, api: WeatherAPI, now: float) -> float:
+        """Time of next refresh of API refreshed at `now`"""
+        policy = getattr(api, "cache_policy", None)
+        if policy is None:
+            due = now + self.config.interval
+        elif policy.forecast_expire_after is not None:
+            due = now + policy.forecast_expire_after
+        else:
+            due = policy.next_model_run(now)
+        return due + self.random.uniform(0, self.config.jitter)
+
+    def run_pending(self) -> int:
+        """Run due jobs, at most max_concurrent at once. Returns count of jobs run"""
+        now = self.clock()
+        with self._lock:
+            due = [
+                job
+                for job in self._jobs.values()
+                if not job.running and job.state.next_run <= now
+            ]
+            for job in due:
+                job.running = True
+
+        wait([self._pool.submit(self._run, job) for job in due])
+        return len(due)
+
+    def _run(self, job: _Job):
+        leader, *followers = job.apis
+        state = job.state
+        started, start = self.clock(), time.perf_counter()
+        next_run = started + self.config.retry_after
+        try:
+            with tracing.span("RefreshScheduler.run", job=state.name):
+                leader.refresh()
+            for follower in followers:
+                for name, endpoint in leader.endpoints.items():
+                    if (other := follower.endpoints.get(name)) is not None:
+                        other.data = endpoint.data
+            state.last_error = None
+            next_run = self.next_run(leader, self.clock())
+        except Exception as e:
+            logger.error(f"Scheduled refresh {state.name} failed: {e}")
+            state.last_error = str(e)
+            state.failures += 1
+            next_run = self.clock() + self.config.retry_after
+        finally:
+            with self._lock:
+                state.last_run = started
+                state.last_duration = time.perf_counter() - start
+                state.next_run = next_run
+                state.runs += 1
+                job.running = False
+
+    def _delay(self) -> float:
+        """Seconds until earliest job is due"""
+        with self._lock:
+            earliest = min(
+                (job.state.next_run for job in self._jobs.values()), default=None
+            )
+        if earliest is None:
+            return self.config.max_sleep
+        return min(max(0.0, earliest - self.clock()), self.config.max_sleep)
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            self.run_pending()
+            self._wake.wait(self._delay())
+            self._wake.clear()
+
+    def start(self):
+        """Run scheduler in background thread"""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="refresh-scheduler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Refresh scheduler started with {len(self._jobs)} jobs")
+
+    def stop(self):
+        """Stop background thread, running refreshes are completed"""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        logger.info("Refresh scheduler stopped")
+
+    async def serve(self):
+        """Run scheduler on the running event loop until cancelled"""
+        while True:
+            await asyncio.to_thread(self.run_pending)
+            await asyncio.sleep(self._delay())
+
+    def __enter__(self) -> "RefreshScheduler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,20 +1,65 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import final
-from dataclasses import dataclass
+from collections import deque
+from typing import final, Any, Hashable
+from dataclasses import dataclass, field
+from loguru import logger
+
+import asyncio
 
 from .api import WeatherAPI
-from src.errors import ProcessorError, CommandError
+from src.core import tracing
+from src.core.pipeline import Pipeline, PipelineConfig, PipelineReport
+from src.core.metrics import registry
+from src.errors import ProcessorError, CommandError, ServiceError
 from src.static import services
 from src.utils import classproperty
 
 
+PROVIDER_SECONDS = registry.histogram(
+    "offweather_provider_seconds",
+    "Duration of provider requests in fan-out, completed ones only",
+    ("service", "provider", "outcome"),
+)
+PROVIDER_HEDGES = registry.counter(
+    "offweather_provider_hedges",
+    "Extra provider requests started because the earlier ones were slow or failed",
+    ("service",),
+)
+
+
 @dataclass
 class ServiceConfig(ABC):
     pass
 
 
+@dataclass
+class ProviderStats:
+    latency: float | None = None  # seconds, moving average of successful requests
+    successes: int = 0
+    failures: int = 0
+    wins: int = 0
+
+    @property
+    def score(self) -> float:
+        """Expected cost of asking provider first, lower is better"""
+        reliability = (self.successes + 1) / (self.successes + self.failures + 1)
+        return (self.latency or 0.0) / reliability
+
+
+@dataclass
+class FanoutResult:
+    provider: str
+    data: dict[str, Any]
+    latency: float  # seconds of winning request
+    started: list[str] = field(default_factory=list)  # requested providers in order
+    errors: dict[str, Exception] = field(default_factory=dict)
+
+
 class WeatherService(ABC):
+    # Weight of the newest latency in the moving average of a provider
+    LATENCY_SMOOTHING = 0.3
+
     @classproperty
     def name(cls) -> str:
         return cls.__name__
@@ -26,6 +71,12 @@ class WeatherService(ABC):
         self.available_commands: dict[str, CommandService] = {}
         self.processors: dict[str, WeatherProcessor] = {}
 
+        # Provider name -> API and name of its endpoint answering fan-out requests
+        self.providers: dict[str, tuple[WeatherAPI, str]] = {}
+        self.provider_stats: dict[str, ProviderStats] = {}
+
+        self.pipeline = Pipeline(PipelineConfig())
+
         self.services = services()
 
     @final
@@ -57,16 +108,167 @@ class WeatherService(ABC):
             raise ProcessorError(f"Processor with name '{name}' does not exist")
         return self.processors[name]
 
+    @final
+    def process(self) -> PipelineReport:
+        """Run processors of service in order of their associations"""
+        return self.pipeline.run(self.processors.values())
+
+    @final
+    def add_provider(
+        self, api: WeatherAPI, endpoint: str, name: str | None = None
+    ) -> str:
+        """Add API whose endpoint answers fan-out requests, returns provider name"""
+        name = name or api.name
+
+        if name in self.providers:
+            raise ServiceError(f"Provider with name '{name}' already exists")
+        api.get(endpoint)
+
+        self.providers[name] = (api, endpoint)
+        self.provider_stats[name] = ProviderStats()
+        return name
+
+    @final
+    def delete_provider(self, name: str):
+        """Remove provider"""
+        if name not in self.providers:
+            raise ServiceError(f"Provider with name '{name}' does not exist")
+        del self.providers[name]
+        del self.provider_stats[name]
+
+    def ranked_providers(self) -> list[str]:
+        """Providers ordered by expected latency, the first one is primary"""
+        return sorted(self.providers, key=lambda name: self.provider_stats[name].score)
+
+    def _observe(self, name: str, seconds: float, ok: bool):
+        stats = self.provider_stats[name]
+        if ok:
+            stats.successes += 1
+            stats.latency = (
+                seconds
+                if stats.latency is None
+                else stats.latency + self.LATENCY_SMOOTHING * (seconds - stats.latency)
+            )
+        else:
+            stats.failures += 1
+        PROVIDER_SECONDS.observe(
+            seconds, service=self.name, provider=name, outcome="ok" if ok else "error"
+        )
+
+    @final
+    async def afetch(
+        self, hedge_after: float | None = 0.5, timeout: float | None = None
+    ) -> FanoutResult:
+        """Refresh providers concurrently, the first good response wins
+
+        The primary provider is asked first. While no response has arrived
+        `hedge_after` seconds later, the next provider is asked as well. A
+        failure asks the next provider at once. 0 asks all providers at
+        once, None only fails over. Requests still running when one wins
+        are cancelled.
+        """
+        if not self.providers:
+            raise ServiceError("Service doesn't have providers")
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        waiting = deque(self.ranked_providers())
+        running: dict[asyncio.Task, tuple[str, float]] = {}
+        result = FanoutResult("", {}, 0.0)
+
+        def launch():
+            name = waiting.popleft()
+            api, endpoint = self.providers[name]
+            if result.started:
+                PROVIDER_HEDGES.inc(service=self.name)
+            result.started.append(name)
+            task = asyncio.create_task(
+                api.get(endpoint).arefresh(), name=f"{self.name}-{name}"
+            )
+            running[task] = (name, loop.time())
+
+        with tracing.span(f"{self.name}.fetch", hedge_after=hedge_after):
+            try:
+                launch()
+                while hedge_after == 0 and waiting:
+                    launch()
+
+                while running:
+                    wait = hedge_after if waiting else None
+                    if deadline is not None:
+                        left = max(0.0, deadline - loop.time())
+                        wait = left if wait is None else min(wait, left)
+
+                    done, _ = await asyncio.wait(
+                        running, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if deadline is not None and not done and loop.time() >= deadline:
+                        raise ServiceError(
+                            f"Providers didn't respond within {timeout} s"
+                        )
+
+                    failed = False
+                    for task in done:
+                        name, started = running.pop(task)
+                        elapsed = loop.time() - started
+                        if (error := task.exception()) is None:
+                            self._observe(name, elapsed, ok=True)
+                            self.provider_stats[name].wins += 1
+                            api, endpoint = self.providers[name]
+                            result.provider, result.latency = name, elapsed
+                            result.data = api.get(endpoint).data
+                            return result
+
+                        logger.error(f"Provider {name} failed: {error}")
+                        self._observe(name, elapsed, ok=False)
+                        result.errors[name] = error  # type: ignore
+                        failed = True
+
+                    # Hedge when the running requests are slow or failed
+                    if waiting and (failed or not done):
+                        launch()
+            finally:
+                for task, (name, started) in running.items():
+                    task.cancel()
+                    # Lost the race: took at least this long, keeps it from ranking first
+                    stats = self.provider_stats[name]
+                    elapsed = loop.time() - started
+                    if stats.latency is None or stats.latency < elapsed:
+                        stats.latency = elapsed
+                await asyncio.gather(*running, return_exceptions=True)
+
+        failed = ", ".join(f"{name}: {error}" for name, error in result.errors.items())
+        raise ServiceError(f"All providers failed: {failed}")
+
+    @final
+    def fetch(
+        self, hedge_after: float | None = 0.5, timeout: float | None = None
+    ) -> FanoutResult:
+        """Blocking afetch for code without running event loop"""
+
+        async def run() -> FanoutResult:
+            try:
+                return await self.afetch(hedge_after, timeout)
+            finally:
+                # Clients bound to this loop are closed before it is
+                for api, _ in self.providers.values():
+                    await api.aclose()
+
+        return asyncio.run(run())
+
     @final
     def execute(self, command: CommandService | str):
         """Execute API"""
 
         name = command.name if isinstance(command, CommandService) else command
 
-        if result := self.available_commands.get(name):
-            result.execute()
-        else:
-            raise CommandError(f"Avalible command with name '{name}' does not exist")
+        with tracing.span(f"{self.name}.execute", command=name):
+            if result := self.available_commands.get(name):
+                result.execute()
+            else:
+                raise CommandError(
+                    f"Avalible command with name '{name}' does not exist"
+                )
 
 
 class WeatherProcessor[T: WeatherAPI](ABC):
@@ -85,6 +287,19 @@ class WeatherProcessor[T: WeatherAPI](ABC):
         """Save data to database"""
         pass
 
+    def inputs(self) -> Hashable | None:
+        """Key of data read by run, pipelines skip processor while it is unchanged
+
+        None runs processor every time. By default revisions of endpoint data
+        of the API of processor.
+        """
+        api: WeatherAPI | None = getattr(self, "api", None)
+        if api is None:
+            return None
+        return tuple(
+            (name, endpoint.revision) for name, endpoint in api.endpoints.items()
+        )
+
     @property
     def associations(self):
         return self._associations
@@ -95,6 +310,10 @@ class WeatherProcessor[T: WeatherAPI](ABC):
 
 
 class CommandService:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        tracing.instrument(cls, "execute")
+
     @abstractmethod
     def __init__(self, api) -> None:
         self.name: str = self.__class__.__name__
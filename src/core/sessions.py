@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+from urllib3.connection import HTTPConnection
+
+import socket
+import threading
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    pool_connections: int = 16  # hosts with a cached connection pool
+    pool_maxsize: int = 32  # connections kept per host
+    pool_block: bool = False  # wait for a free connection instead of opening more
+    connect_timeout: float = 5.0  # seconds
+    read_timeout: float = 30.0  # seconds, between bytes of response
+    keep_alive: bool = True  # reuse connections, TCP keepalive on idle sockets
+    retries: int = 5
+    backoff_factor: float = 0.2
+    status_to_retry: tuple[int, ...] = (500, 502, 504)
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTP adapter with retries, default timeouts and keep-alive sockets"""
+
+    def __init__(self, config: PoolConfig):
+        self.pool_config = config
+        super().__init__(
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize,
+            pool_block=config.pool_block,
+            max_retries=Retry(
+                total=config.retries,
+                read=config.retries,
+                connect=config.retries,
+                backoff_factor=config.backoff_factor,
+                status_forcelist=config.status_to_retry,
+                allowed_methods=None,
+            ),
+        )
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.pool_config.keep_alive:
+            kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = (self.pool_config.connect_timeout, self.pool_config.read_timeout)
+        if not self.pool_config.keep_alive:
+            request.headers["Connection"] = "close"
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+class SessionManager:
+    """Process-wide connection pools shared by every session
+
+    Sessions keep their own cache and hooks but send requests through one
+    adapter per pool configuration. Its pool manager keeps one connection
+    pool per host, so connections and TLS sessions are reused across API
+    instances.
+    """
+
+    def __init__(self):
+        self._adapters: dict[PoolConfig, PooledAdapter] = {}
+        self._lock = threading.Lock()
+
+    def adapter(self, config: PoolConfig | None = None) -> PooledAdapter:
+        """Shared adapter of configuration"""
+        config = config or PoolConfig()
+        with self._lock:
+            if (adapter := self._adapters.get(config)) is None:
+                adapter = self._adapters[config] = PooledAdapter(config)
+            return adapter
+
+    def mount[S](self, session: S, config: PoolConfig | None = None) -> S:
+        """Send HTTP and HTTPS requests of session through shared pools"""
+        adapter = self.adapter(config)
+        for prefix in ("http://", "https://"):
+            session.mount(prefix, adapter)  # type: ignore
+        return session
+
+    def stats(self) -> dict[str, dict]:
+        """Pooled hosts and idle connections per host"""
+        result = {}
+        with self._lock:
+            adapters = list(self._adapters.values())
+        for adapter in adapters:
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{key.key_scheme}://{key.key_host}:{key.key_port}"
+                entry = result.setdefault(host, {"pools": 0, "idle": 0, "opened": 0})
+                entry["pools"] += 1
+                if pool.pool is not None:
+                    # Queue is filled with None placeholders for unopened connections
+                    entry["idle"] += sum(1 for conn in list(pool.pool.queue) if conn)
+                entry["opened"] += pool.num_connections
+        return result
+
+    def close(self):
+        """Close idle connections of every pool"""
+        with self._lock:
+            for adapter in self._adapters.values():
+                adapter.close()
+
+
+sessions = SessionManager()
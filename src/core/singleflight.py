@@ -0,0 +1,106 @@
+from typing import Awaitable, Callable
+from weakref import WeakKeyDictionary
+
+import asyncio
+import threading
+
+from src.core.metrics import registry, current_endpoint
+
+
+SHARED = registry.counter(
+    "offweather_singleflight_shared",
+    "Calls answered by an identical call already in flight",
+    ("endpoint",),
+)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs one call per key at a time, concurrent callers share its result
+
+    A caller arriving while a call with the same key is in flight waits
+    for it and gets the same result or exception instead of calling again.
+    Keys are forgotten once the call completes, nothing is cached.
+    Async calls run in a task of their own: a cancelled caller, the first
+    one included, doesn't cancel the call of others, the call is cancelled
+    only when every caller is.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._flights: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, _Flight]
+        ] = WeakKeyDictionary()
+
+    def do[T](self, key: str, function: Callable[[], T]) -> T:
+        """Call function or wait for in-flight call of key in another thread"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            SHARED.inc(endpoint=current_endpoint.get() or "-")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado[T](self, key: str, function: Callable[[], Awaitable[T]]) -> T:
+        """Await function or in-flight call of key on the running event loop"""
+        loop = asyncio.get_running_loop()
+        flights = self._flights.setdefault(loop, {})
+
+        flight = flights.get(key)
+        if flight is not None and not flight.task.done():
+            SHARED.inc(endpoint=current_endpoint.get() or "-")
+        else:
+            flight = flights[key] = _Flight(asyncio.ensure_future(function()))
+
+            def forget(task: asyncio.Future):
+                if flights.get(key) is flight:
+                    del flights[key]
+                if not task.cancelled():
+                    task.exception()  # retrieved: no warning when nobody waits
+
+            flight.task.add_done_callback(forget)
+
+        flight.waiters += 1
+        try:
+            # Cancelled caller mustn't cancel the call of others
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+
+# Shared by every API instance of the process
+flights = SingleFlight()
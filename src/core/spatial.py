@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from typing import Callable
+import math
+import threading
+
+from src.models import Coordinates
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine(a: Coordinates, b: Coordinates) -> float:
+    """Great-circle distance between two points in kilometres"""
+    return _haversine(a.latitude, a.longitude, b.latitude, b.longitude)
+
+
+def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lat2 = math.radians(lat1), math.radians(lat2)
+    dlat = lat2 - lat1
+    dlon = math.radians(lon2 - lon1)
+
+    h = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+class SpatialIndex[T]:
+    """Points with values bucketed on a latitude/longitude grid
+
+    A nearest lookup only scans the buckets that can hold points within the
+    tolerance, so its cost doesn't grow with the number of stored points.
+    With `max_size` the least recently inserted points are dropped first.
+    """
+
+    def __init__(self, cell: float = 0.1, max_size: int | None = None):
+        """`cell` is the grid step in degrees, 0.1° is about 11 km"""
+        self.cell = cell
+        self.max_size = max_size
+        self._columns = round(360 / cell)
+        self._rows = round(180 / cell)
+        self._buckets: dict[tuple[int, int], dict[tuple[float, float], T]] = {}
+        # Points in order of insertion, oldest first
+        self._order: OrderedDict[tuple[float, float], None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, latitude: float, longitude: float) -> tuple[int, int]:
+        row = min(int((latitude + 90) // self.cell), self._rows - 1)
+        column = int((longitude + 180) // self.cell) % self._columns
+        return row, column
+
+    def insert(self, coordinates: Coordinates, value: T):
+        """Store value for point, replacing previous value of the same point"""
+        point = (coordinates.latitude, coordinates.longitude)
+        with self._lock:
+            self._buckets.setdefault(self._bucket(*point), {})[point] = value
+            self._order[point] = None
+            self._order.move_to_end(point)
+            if self.max_size is not None:
+                while len(self._order) > self.max_size:
+                    oldest, _ = self._order.popitem(last=False)
+                    self._drop(oldest)
+
+    def remove(self, coordinates: Coordinates):
+        point = (coordinates.latitude, coordinates.longitude)
+        with self._lock:
+            self._order.pop(point, None)
+            self._drop(point)
+
+    def _drop(self, point: tuple[float, float]):
+        bucket = self._buckets.get(key := self._bucket(*point))
+        if bucket is not None:
+            bucket.pop(point, None)
+            if not bucket:
+                del self._buckets[key]
+
+    def nearest(
+        self,
+        coordinates: Coordinates,
+        tolerance: float,
+        where: Callable[[T], bool] | None = None,
+    ) -> tuple[Coordinates, T, float] | None:
+        """Find nearest point within `tolerance` km whose value passes `where`"""
+        row, column = self._bucket(coordinates.latitude, coordinates.longitude)
+
+        rows = math.ceil(tolerance / (KM_PER_DEGREE * self.cell))
+        # Longitude degrees shrink towards the poles, widen the scan accordingly
+        edge = min(90.0, abs(coordinates.latitude) + (rows + 1) * self.cell)
+        shrink = math.cos(math.radians(edge))
+        columns = (
+            self._columns // 2
+            if shrink < 1e-6
+            else min(
+                self._columns // 2,
+                math.ceil(tolerance / (KM_PER_DEGREE * self.cell * shrink)),
+            )
+        )
+
+        best: tuple[tuple[float, float], T, float] | None = None
+        with self._lock:
+            for r in range(max(0, row - rows), min(self._rows, row + rows + 1)):
+                for c in range(column - columns, column + columns + 1):
+                    bucket = self._buckets.get((r, c % self._columns))
+                    if not bucket:
+                        continue
+                    for point, value in bucket.items():
+                        distance = _haversine(
+                            coordinates.latitude, coordinates.longitude, *point
+                        )
+                        if distance > tolerance or (best and distance >= best[2]):
+                            continue
+                        if where is None or where(value):
+                            best = (point, value, distance)
+
+        if best is None:
+            return None
+        (latitude, longitude), value, distance = best
+        return Coordinates(latitude=latitude, longitude=longitude), value, distance
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._order)
@@ -0,0 +1,244 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Sequence
+from loguru import logger
+
+import os
+import sqlite3
+import threading
+
+from src.errors import DataBaseError
+
+
+# Series of one variable: timestamps and values of equal length
+Series = tuple[array, array]
+
+
+def _unpack(times: bytes, values: bytes) -> Series:
+    return array("q", times), array("d", values)
+
+
+def _merge(stored: Series, times: array, values: array) -> Series:
+    """Points of written series replace stored points within its time range"""
+    stored_times, stored_values = stored
+    if not times:
+        return stored
+    start = bisect_left(stored_times, times[0])
+    end = bisect_right(stored_times, times[-1])
+    return (
+        stored_times[:start] + times + stored_times[end:],
+        stored_values[:start] + values + stored_values[end:],
+    )
+
+
+class SQLiteStore:
+    """Time series of weather variables in a local SQLite database
+
+    Every (location_id, variable) is one row holding packed int64 times
+    and float64 values, so a forecast of thousands of locations is tens of
+    thousands of rows, not one per value. Written series replace stored
+    points within their time range, older points are kept. Writes are
+    bulk `executemany` inserts in a single transaction, the database runs
+    in WAL mode so readers are not blocked by a writer.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS series (
+            location_id TEXT NOT NULL,
+            variable TEXT NOT NULL,
+            start INTEGER NOT NULL,
+            end INTEGER NOT NULL,
+            times BLOB NOT NULL,
+            vals BLOB NOT NULL,
+            PRIMARY KEY (location_id, variable)
+        ) WITHOUT ROWID
+    """
+
+    INSERT = "INSERT OR REPLACE INTO series (location_id, variable, start, end, times, vals) VALUES (?, ?, ?, ?, ?, ?)"
+    SELECT = "SELECT variable, times, vals FROM series WHERE location_id = ? ORDER BY variable"
+    SELECT_BOUNDS = "SELECT variable, start, end FROM series WHERE location_id = ?"
+    SELECT_VARIABLE = (
+        "SELECT times, vals FROM series WHERE location_id = ? AND variable = ?"
+    )
+    SELECT_LOCATIONS = "SELECT location_id FROM series GROUP BY location_id"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        try:
+            if directory := os.path.dirname(path):
+                os.makedirs(directory, exist_ok=True)
+
+            # Statements above are reused, sqlite3 keeps them prepared in its cache
+            self._connection = sqlite3.connect(
+                path, check_same_thread=False, cached_statements=32
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(self.SCHEMA)
+            self._connection.commit()
+            self._migrate()
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Failed to open database {path}: {e}")
+            raise DataBaseError(f"Failed to open database {path}: {e}")
+
+    def _migrate(self):
+        """Pack rows of the former one-row-per-value table into series"""
+        exists = self._connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'forecast'"
+        ).fetchone()
+        if not exists:
+            return
+
+        rows = self._connection.execute(
+            "SELECT location_id, variable, time, value FROM forecast ORDER BY location_id, variable, time"
+        )
+        with self._connection:
+            self._insert(
+                (
+                    location_id,
+                    variable,
+                    array("q", (row[2] for row in points)),
+                    array("d", (row[3] for row in points)),
+                )
+                for (location_id, variable), points in (
+                    (key, list(group)) for key, group in groupby(rows, itemgetter(0, 1))
+                )
+            )
+            self._connection.execute("DROP TABLE forecast")
+        logger.info(f"Migrated value rows of {self.path} into series")
+
+    def write(self, rows: Iterable[tuple[str, str, int, float]]) -> int:
+        """Insert or replace rows (location_id, variable, time, value), returns row count"""
+        series = []
+        for (location_id, variable), points in groupby(
+            sorted(rows, key=itemgetter(0, 1, 2)), itemgetter(0, 1)
+        ):
+            # Last row of a time wins
+            values = {time: value for _, _, time, value in points}
+            series.append(
+                (location_id, variable, array("q", values), array("d", values.values()))
+            )
+        return self.write_series(series)
+
+    def write_series(
+        self, series: Iterable[tuple[str, str, Sequence[int], Sequence[float]]]
+    ) -> int:
+        """Insert or replace series (location_id, variable, times, values) sorted by time
+
+        Returns count of values written.
+        """
+        try:
+            with self._lock, self._connection:
+                return self._insert(series)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write to database {self.path}: {e}")
+            raise DataBaseError(f"Failed to write to database {self.path}: {e}")
+
+    def _insert(
+        self, series: Iterable[tuple[str, str, Sequence[int], Sequence[float]]]
+    ) -> int:
+        count = 0
+        # Time range of stored series per location, read once per location
+        bounds: dict[str, dict[str, tuple[int, int]]] = {}
+        pending: dict[tuple[str, str], Series] = {}
+        for location_id, variable, times, values in series:
+            if len(times) != len(values):
+                raise DataBaseError(
+                    f"Series {location_id}/{variable} has {len(times)} times and {len(values)} values"
+                )
+            if not isinstance(times, array) or times.typecode != "q":
+                times = array("q", times)
+            if not isinstance(values, array) or values.typecode != "d":
+                values = array("d", values)
+            count += len(times)
+
+            key = (location_id, variable)
+            if (previous := pending.get(key)) is not None:
+                times, values = _merge(previous, times, values)
+            else:
+                if (known := bounds.get(location_id)) is None:
+                    known = bounds[location_id] = {
+                        name: (start, end)
+                        for name, start, end in self._connection.execute(
+                            self.SELECT_BOUNDS, (location_id,)
+                        )
+                    }
+                # Stored points are read only if some lie outside written range
+                stored = known.get(variable)
+                if (
+                    stored is not None
+                    and times
+                    and (stored[0] < times[0] or stored[1] > times[-1])
+                ):
+                    row = self._connection.execute(self.SELECT_VARIABLE, key).fetchone()
+                    times, values = _merge(_unpack(*row), times, values)
+            pending[key] = (times, values)
+
+        self._connection.executemany(
+            self.INSERT,
+            (
+                (
+                    location_id,
+                    variable,
+                    times[0] if times else 0,
+                    times[-1] if times else 0,
+                    times.tobytes(),
+                    values.tobytes(),
+                )
+                for (location_id, variable), (times, values) in pending.items()
+            ),
+        )
+        return count
+
+    def read_series(self, location_id: str) -> dict[str, Series]:
+        """Read series (times, values) of every variable of location"""
+        return {
+            variable: _unpack(times, values)
+            for variable, times, values in self._select(self.SELECT, (location_id,))
+        }
+
+    def read(self, location_id: str) -> list[tuple[str, int, float]]:
+        """Read all rows (variable, time, value) of location"""
+        return [
+            (variable, time, value)
+            for variable, (times, values) in self.read_series(location_id).items()
+            for time, value in zip(times, values)
+        ]
+
+    def read_variable(
+        self,
+        location_id: str,
+        variable: str,
+        start: int = -(2**63),
+        end: int = 2**63 - 1,
+    ) -> list[tuple[int, float]]:
+        """Read rows (time, value) of one variable in time range [start, end)"""
+        found = self._select(self.SELECT_VARIABLE, (location_id, variable))
+        if not found:
+            return []
+        times, values = _unpack(*found[0])
+        first, last = bisect_left(times, start), bisect_left(times, end)
+        return list(zip(times[first:last], values[first:last]))
+
+    def locations(self) -> list[str]:
+        """Get ids of all stored locations"""
+        return [row[0] for row in self._select(self.SELECT_LOCATIONS, ())]
+
+    def _select(self, query: str, params: tuple) -> list:
+        try:
+            with self._lock:
+                return self._connection.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read from database {self.path}: {e}")
+            raise DataBaseError(f"Failed to read from database {self.path}: {e}")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __str__(self):
+        return f"SQLiteStore({self.path})"
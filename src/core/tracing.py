@@ -0,0 +1,148 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from functools import wraps
+from typing import Any, Callable, Iterator, Protocol
+
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start: float  # unixtime
+    duration: float = 0.0  # seconds
+    status: str = "ok"
+    error: str | None = None
+    thread: str = ""
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span): ...
+
+
+class RingBufferExporter:
+    """Keeps the most recent finished spans in memory"""
+
+    def __init__(self, capacity: int = 1024):
+        self._spans: deque[Span] = deque(maxlen=capacity)
+
+    def export(self, span: Span):
+        self._spans.append(span)
+
+    def spans(self) -> list[Span]:
+        return list(self._spans)
+
+    def slowest(self, count: int = 10) -> list[Span]:
+        return sorted(self._spans, key=lambda span: span.duration, reverse=True)[:count]
+
+    def trace(self, trace_id: str) -> list[Span]:
+        """Spans of one trace ordered by start"""
+        return sorted(
+            (span for span in self._spans if span.trace_id == trace_id),
+            key=lambda span: span.start,
+        )
+
+    def clear(self):
+        self._spans.clear()
+
+
+class JsonLinesExporter:
+    """Appends every finished span as one JSON line to file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        if directory := os.path.dirname(path):
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(asdict(span), default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a") as file:
+                file.write(line)
+
+
+# Recent spans of the process, read by the debug shell
+buffer = RingBufferExporter()
+exporters: list[SpanExporter] = [buffer]
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Measure block as child of the current span
+
+    Context variables follow asyncio tasks automatically, for threads run
+    the target inside `contextvars.copy_context().run`.
+    """
+    parent = _current.get()
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else secrets.token_hex(8),
+        span_id=secrets.token_hex(4),
+        parent_id=parent.span_id if parent else None,
+        start=time.time(),
+        thread=threading.current_thread().name,
+        attributes=attributes,
+    )
+    token = _current.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current.reset(token)
+        for exporter in exporters:
+            exporter.export(current)
+
+
+def traced(function: Callable) -> Callable:
+    """Run every call of function (sync or async) in a span named by its qualname"""
+    if getattr(function, "__traced__", False):
+        return function
+
+    name = function.__qualname__
+    if inspect.iscoroutinefunction(function):
+
+        @wraps(function)
+        async def async_wrapper(*args, **kwargs):
+            with span(name):
+                return await function(*args, **kwargs)
+
+        wrapper = async_wrapper
+    else:
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+
+    wrapper.__traced__ = True  # type: ignore
+    return wrapper
+
+
+def instrument(cls: type, *methods: str):
+    """Trace methods defined directly on class, used by __init_subclass__ hooks"""
+    for method in methods:
+        if (function := cls.__dict__.get(method)) is not None and callable(function):
+            setattr(cls, method, traced(function))
@@ -0,0 +1,120 @@
+from requests.models import PreparedRequest, Response
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from urllib3 import HTTPResponse
+from loguru import logger
+
+import base64
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from src.core.sessions import PooledAdapter, PoolConfig
+from src.errors import RequestError, SettingError
+
+
+def rebase_url(url: str, base_url: str | None) -> str:
+    """Replace scheme and host of url with base_url, e.g. a local stand-in server"""
+    if not base_url:
+        return url
+
+    parts = urlsplit(url)
+    base = urlsplit(base_url)
+    return urlunsplit(
+        (base.scheme, base.netloc, base.path.rstrip("/") + parts.path, parts.query, "")
+    )
+
+
+def normalize_url(url: str) -> str:
+    """URL with query parameters sorted, equal requests get equal URLs"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def request_key(method: str, url: str, params: dict | None = None) -> str:
+    """Identity of request: method and normalized URL with query parameters"""
+    if params:
+        url = f"{url}{'&' if '?' in url else '?'}{urlencode(params, doseq=True)}"
+    return f"{method.upper()} {normalize_url(url)}"
+
+
+class RecordReplayAdapter(PooledAdapter):
+    """Transport that records responses to disk and replays them later
+
+    Modes: 'record' sends every request and stores the response, 'replay'
+    answers only from recordings and fails on unknown requests, 'auto'
+    replays recorded requests and records the rest. One JSON file is kept
+    per method and normalized URL. Requests sent to network get retries,
+    default timeouts and pool size of `config` like shared pools.
+    """
+
+    MODES = ("record", "replay", "auto")
+
+    # Recorded body is already decoded and complete
+    SKIPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+    def __init__(self, path: str, mode: str = "auto", config: PoolConfig | None = None):
+        super().__init__(config or PoolConfig())
+        if mode not in self.MODES:
+            raise SettingError(f"Unknown transport mode '{mode}'")
+
+        self.path = path
+        self.mode = mode
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, request: PreparedRequest) -> str:
+        key = f"{request.method} {normalize_url(request.url or '')}"
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return os.path.join(self.path, f"{digest}.json")
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        file = self._file(request)
+
+        if self.mode != "record" and os.path.exists(file):
+            return self._replay(request, file)
+        if self.mode == "replay":
+            logger.error(f"No recorded response for {request.method} {request.url}")
+            raise RequestError(f"No recorded response for {request.url}")
+
+        response = super().send(request, **kwargs)
+        self._record(response, file)
+        return response
+
+    def _record(self, response: Response, file: str):
+        record = {
+            "method": response.request.method,
+            "url": response.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {
+                key: value
+                for key, value in response.headers.items()
+                if key.lower() not in self.SKIPPED_HEADERS
+            },
+            "body": base64.b64encode(response.content).decode(),
+        }
+
+        # Temporary file and rename: readers never see a partial recording
+        descriptor, temporary = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(descriptor, "w") as output:
+            json.dump(record, output)
+        os.replace(temporary, file)
+        logger.debug(f"Recorded {response.url} to {file}")
+
+    def _replay(self, request: PreparedRequest, file: str) -> Response:
+        with open(file) as input:
+            record = json.load(input)
+
+        body = base64.b64decode(record["body"])
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers={**record["headers"], "Content-Length": str(len(body))},
+            status=record["status"],
+            reason=record["reason"],
+            preload_content=False,
+            request_method=request.method,
+            request_url=request.url,
+        )
+        return self.build_response(request, raw)
@@ -0,0 +1,29 @@
+from functools import cache
+from pydantic import TypeAdapter, ValidationError
+
+from .core.metrics import registry
+from .errors import ResponseError
+
+DECODE_SECONDS = registry.histogram(
+    "offweather_decode_seconds",
+    "Time to parse and validate response bodies into models",
+    ("model",),
+)
+
+
+@cache
+def _adapter(target) -> TypeAdapter:
+    return TypeAdapter(target)
+
+
+def decode[T](content: bytes | str, target: type[T]) -> T:
+    """Parse JSON and validate it into target type in a single pass
+
+    pydantic-core parses the raw bytes straight into the typed model without
+    building intermediate dicts. Validators are cached per type.
+    """
+    try:
+        with DECODE_SECONDS.time(model=getattr(target, "__name__", str(target))):
+            return _adapter(target).validate_json(content)
+    except ValidationError as e:
+        raise ResponseError(f"Invalid response for {target}: {e}")
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+from loguru import logger
+
+import itertools
+import sys
+
+
+@dataclass
+class LogConfig:
+    path: str = ".log/debug.log"
+    level: str = "DEBUG"
+    rotation: str | int = "10 MB"  # size of file before it is rotated
+    retention: int = 5  # rotated files kept
+    compression: str | None = None  # e.g. "gz" for rotated files
+    enqueue: bool = True  # write from background thread
+
+
+def configure(config: LogConfig | None = None) -> int:
+    """Add file sink of application log, returns loguru handler id
+
+    With enqueue callers only put records on a queue: rendering lines and
+    writing the file happen on a background thread, so slow disks don't
+    stall refreshes. Rotated files are removed beyond retention.
+    """
+    config = config or LogConfig()
+    return logger.add(
+        config.path,
+        level=config.level,
+        rotation=config.rotation,
+        retention=config.retention,
+        compression=config.compression,
+        enqueue=config.enqueue,
+    )
+
+
+class _Dropped:
+    """Stand-in for logger of a dropped sample, every call does nothing"""
+
+    def _drop(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, name: str):
+        return self._drop
+
+
+_dropped = _Dropped()
+_counters: dict[tuple, itertools.count] = {}
+
+
+def sampled(every: int):
+    """Logger for every Nth call from the calling line, first call included
+
+    Dropped calls return before arguments are formatted: use brace style
+    arguments, e.g. `sampled(100).debug("Refreshed {}", name)`, not f-strings.
+    """
+    if every <= 1:
+        return logger
+
+    frame = sys._getframe(1)
+    key = (frame.f_code, frame.f_lineno)
+    if (counter := _counters.get(key)) is None:
+        counter = _counters.setdefault(key, itertools.count())
+    return logger if next(counter) % every == 0 else _dropped
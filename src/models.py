@@ -7,6 +7,11 @@ class Coordinates(BaseModel):
     latitude: float
     longitude: float
 
+    @property
+    def key(self) -> str:
+        """Stable text id of location"""
+        return f"{self.latitude:.4f},{self.longitude:.4f}"
+
 
 class BasicWeather(BaseModel):
     temperature: float
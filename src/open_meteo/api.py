@@ -1,10 +1,30 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+import httpx
 import requests
-from requests_cache import CachedSession
-from retry_requests import retry
+from requests_cache import CachedSession, BaseCache, SQLiteCache, get_expiration_datetime
+from urllib3 import HTTPResponse
 from dataclasses import dataclass
+from weakref import WeakKeyDictionary
 from loguru import logger
 
+from .cache import CachePolicy
+from .gazetteer import Gazetteer
+from .geo import GEO_URL
+
 from src.core.api import WeatherAPI, ConfigAPI
+from src.core.cache import BoundedCache
+from src.core.metrics import (
+    HTTP_SECONDS,
+    endpoint_label,
+    observe_response,
+    observe_result,
+)
+from src.core.sessions import PoolConfig, sessions
+from src.core.transport import RecordReplayAdapter, rebase_url
+from src.core.singleflight import flights
 from src.errors import SettingError, ApiError
 from src.models import Coordinates
 
@@ -18,6 +38,139 @@ class OpenMeteoConfig(ConfigAPI):
     city: str | None = None
     language: str | None = None
     count: int | None = None
+    gazetteer: str | None = None
+    tolerance: float | None = None  # km, serve forecast of nearest cached point
+    geo_expire_after: int | None = None  # seconds
+    forecast_expire_after: int | None = None  # seconds, unset aligns to model runs
+    model_run_hours: int | None = None
+    stale_while_revalidate: int | None = None  # seconds, 0 disables
+    cache_path: str | None = None
+    cache_backend: str | None = None  # sqlite, bounded or memory
+    cache_max_bytes: int | None = None
+    cache_eviction: str | None = None  # lru or lfu
+    cache_compression: str | None = None  # gzip or zstd
+    base_url: str | None = None  # e.g. local stand-in server http://127.0.0.1:8080
+    transport: str | None = None  # record, replay or auto
+    transport_path: str | None = None
+    pool_size: int | None = None  # connections per host, shared by all instances
+    connect_timeout: float | None = None  # seconds
+    read_timeout: float | None = None  # seconds
+    keep_alive: bool | None = None
+
+
+# File cache backends by settings, instances using one file share its handle
+_backends: dict[tuple, BaseCache] = {}
+_backends_lock = threading.Lock()
+
+# Background revalidations of stale responses, referenced until done. They
+# run on a loop of their own, a caller's loop may be closed before they end
+_revalidations: set[concurrent.futures.Future] = set()
+_background: asyncio.AbstractEventLoop | None = None
+_background_lock = threading.Lock()
+
+# Record/replay transports by settings, instances recording to one path share pools
+_transports: dict[tuple, RecordReplayAdapter] = {}
+_transports_lock = threading.Lock()
+
+# Pooled async clients of every event loop by pool configuration, shared by
+# every OpenMeteoAPI instance
+_async_clients: WeakKeyDictionary[
+    asyncio.AbstractEventLoop,
+    tuple[dict[PoolConfig, httpx.AsyncClient], asyncio.Task],
+] = WeakKeyDictionary()
+
+
+async def _close_on_shutdown(clients: dict[PoolConfig, httpx.AsyncClient]):
+    """Wait until cancelled, then close clients of the event loop
+
+    asyncio.run cancels remaining tasks before closing its loop, so the
+    clients and their sockets don't outlive the loop they are bound to.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.create_future()
+    finally:
+        entry = _async_clients.get(loop)
+        if entry is not None and entry[0] is clients:
+            del _async_clients[loop]
+        for client in list(clients.values()):
+            await client.aclose()
+
+
+def _new_async_client(config: PoolConfig) -> httpx.AsyncClient:
+    """Async client with timeouts, limits and retries of pool configuration"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+        limits=httpx.Limits(
+            # Pools of requests are per host and open more connections unless blocking
+            max_connections=(
+                config.pool_connections * config.pool_maxsize
+                if config.pool_block
+                else None
+            ),
+            max_keepalive_connections=(
+                config.pool_connections * config.pool_maxsize
+                if config.keep_alive
+                else 0
+            ),
+        ),
+        transport=httpx.AsyncHTTPTransport(retries=config.retries),
+    )
+
+
+def async_client(config: PoolConfig | None = None) -> httpx.AsyncClient:
+    """Get shared async HTTP client of pool configuration for the running event loop"""
+    loop = asyncio.get_running_loop()
+    config = config or PoolConfig()
+
+    if (entry := _async_clients.get(loop)) is None:
+        clients: dict[PoolConfig, httpx.AsyncClient] = {}
+        entry = _async_clients[loop] = (
+            clients,
+            loop.create_task(_close_on_shutdown(clients), name="async-client-close"),
+        )
+    clients = entry[0]
+    if (client := clients.get(config)) is None or client.is_closed:
+        client = clients[config] = _new_async_client(config)
+    return client
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Get event loop of the daemon thread running background revalidations"""
+    global _background
+
+    with _background_lock:
+        if _background is None:
+            _background = asyncio.new_event_loop()
+            threading.Thread(
+                target=_background.run_forever, name="revalidation", daemon=True
+            ).start()
+        return _background
+
+
+def wait_revalidations(timeout: float | None = None) -> bool:
+    """Block until revalidations started so far are done, False on timeout"""
+    with _background_lock:
+        pending = list(_revalidations)
+    return not concurrent.futures.wait(pending, timeout).not_done
+
+
+async def aclose_async_client():
+    """Close shared async HTTP clients of the running event loop"""
+    loop = asyncio.get_running_loop()
+
+    if (entry := _async_clients.pop(loop, None)) is not None:
+        clients, closer = entry
+        closer.cancel()
+        await asyncio.gather(closer, return_exceptions=True)
+        # Closer cancelled before it started doesn't close clients itself
+        for client in list(clients.values()):
+            await client.aclose()
+
+
+def _forget_revalidation(future: concurrent.futures.Future):
+    with _background_lock:
+        _revalidations.discard(future)
 
 
 class OpenMeteoAPI(WeatherAPI):
@@ -35,10 +188,236 @@ class OpenMeteoAPI(WeatherAPI):
         self.language = config.language
         self.count = config.count
 
-        self.session: requests.Session = retry(
-            CachedSession(".cache/", expire_after=3600), retries=5, backoff_factor=0.2
+        # Offline geocoding index, remote geocoding is a fallback
+        self.gazetteer = Gazetteer(config.gazetteer) if config.gazetteer else None
+        self.tolerance = config.tolerance
+        self.base_url = config.base_url
+
+        self.cache_policy = CachePolicy.from_config(config)
+        self.pool_config = self._pool_config(config)
+        # Cache settings are per instance, connections come from process-wide pools
+        self.session: requests.Session = sessions.mount(
+            CachedSession(
+                backend=self._cache_backend(config),
+                expire_after=3600,
+                urls_expire_after={
+                    rebase_url(GEO_URL, self.base_url).split("://", 1)[1]: (
+                        self.cache_policy.geo_expire_after
+                    )
+                },
+                stale_while_revalidate=self.cache_policy.stale_while_revalidate,
+                stale_if_error=True,
+            ),
+            self.pool_config,
+        )
+        self.transport: RecordReplayAdapter | None = None
+        if config.transport:
+            self._mount_transport(config)
+        self.session.hooks["response"].append(observe_response)
+
+    def _mount_transport(self, config: OpenMeteoConfig):
+        """Route requests through recording transport with pool settings of config"""
+        path = config.transport_path or ".cache/recordings"
+        key = (path, config.transport, self.pool_config)
+        with _transports_lock:
+            if (adapter := _transports.get(key)) is None:
+                adapter = _transports[key] = RecordReplayAdapter(
+                    path,
+                    mode=config.transport,  # type: ignore
+                    config=self.pool_config,
+                )
+        self.transport = adapter
+        for prefix in ("http://", "https://"):
+            self.session.mount(prefix, adapter)
+
+    @staticmethod
+    def _pool_config(config: OpenMeteoConfig) -> PoolConfig:
+        """Connection pool settings from config, unset fields keep defaults"""
+        values = {
+            "pool_maxsize": config.pool_size,
+            "connect_timeout": config.connect_timeout,
+            "read_timeout": config.read_timeout,
+            "keep_alive": config.keep_alive,
+        }
+        return PoolConfig(**{key: value for key, value in values.items() if value is not None})
+
+    @staticmethod
+    def _cache_backend(config: OpenMeteoConfig) -> BaseCache:
+        """Create HTTP cache backend from config, file backends are shared"""
+        path = config.cache_path or ".cache/http_cache.sqlite"
+        backend = config.cache_backend or (
+            "bounded"
+            if config.cache_max_bytes or config.cache_compression
+            else "sqlite"
+        )
+        key = (
+            backend,
+            path,
+            config.cache_max_bytes,
+            config.cache_eviction,
+            config.cache_compression,
+        )
+
+        match backend:
+            case "memory":
+                return BaseCache()
+            case "sqlite" | "bounded":
+                with _backends_lock:
+                    if (cache := _backends.get(key)) is None:
+                        cache = _backends[key] = (
+                            SQLiteCache(path)
+                            if backend == "sqlite"
+                            else BoundedCache(
+                                path,
+                                max_bytes=config.cache_max_bytes,
+                                eviction=config.cache_eviction or "lru",
+                                compression=config.cache_compression,
+                            )
+                        )
+                    return cache
+            case _:
+                raise SettingError(f"Unknown cache backend '{backend}'")
+
+    @property
+    def asession(self) -> httpx.AsyncClient:
+        """Async HTTP client with connection pool shared across instances"""
+        return async_client(self.pool_config)
+
+    async def aget(
+        self, url: str, params: dict, expire_after: int | None = None
+    ) -> tuple[int, bytes]:
+        """GET on the running event loop through the HTTP cache of session
+
+        Follows the cache policy of the blocking session: fresh cached
+        responses are returned without network, expired ones within
+        stale-while-revalidate are returned at once while a task on the
+        background loop replaces them, and a failed request falls back to a
+        stale response (stale-if-error). Returns status code and content.
+        HTTP metrics are recorded like those of the blocking session.
+        """
+        request = self.session.prepare_request(
+            requests.Request("GET", url, params=params)
+        )
+        result, status_code, content = await self._lookup(request, expire_after)
+        observe_result(endpoint_label(url), result, status_code, len(content))
+        return status_code, content
+
+    async def _lookup(
+        self, request: requests.PreparedRequest, expire_after: int | None
+    ) -> tuple[str, int, bytes]:
+        """Cache result (hit, stale or miss), status code and content of request"""
+        cache: BaseCache = self.session.cache  # type: ignore
+        key = cache.create_key(request)
+
+        cached = await asyncio.to_thread(cache.get_response, key)
+        if cached is not None:
+            if not cached.is_expired:
+                return "hit", cached.status_code, cached.content
+            if cached.expires is not None and self.cache_policy.serves_stale(
+                cached.expires.timestamp()
+            ):
+                self._revalidate(request, key, expire_after)
+                return "stale", cached.status_code, cached.content
+
+        try:
+            status_code, content = await self._asend(request, key, expire_after)
+        except (httpx.HTTPError, requests.RequestException) as e:
+            if cached is None:
+                raise
+            logger.warning(f"Request failed, using stale response: {e}")
+            return "stale", cached.status_code, cached.content
+
+        if cached is not None and status_code >= 500:
+            logger.warning(f"Request failed with {status_code}, using stale response")
+            return "stale", cached.status_code, cached.content
+        return "miss", status_code, content
+
+    async def _asend(
+        self, request: requests.PreparedRequest, key: str, expire_after: int | None
+    ) -> tuple[int, bytes]:
+        """Send request with async client, cacheable responses are saved
+
+        With a record/replay transport the request goes through it like
+        requests of the blocking session, replay mode never reaches network.
+        """
+        start = time.perf_counter()
+        if self.transport is not None:
+            result = await asyncio.to_thread(self.transport.send, request)
+        else:
+            response = await self.asession.get(request.url)  # type: ignore
+            result = self._convert(request, response)
+        HTTP_SECONDS.observe(
+            time.perf_counter() - start, endpoint=endpoint_label(result.url)
+        )
+
+        if result.status_code in self.session.settings.allowable_codes:  # type: ignore
+            await asyncio.to_thread(self._save, request, key, result, expire_after)
+        return result.status_code, result.content
+
+    @staticmethod
+    def _convert(
+        request: requests.PreparedRequest, response: httpx.Response
+    ) -> requests.Response:
+        """requests response of async response, as stored by the HTTP cache"""
+        # Content is decoded already, encoding headers no longer apply
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        }
+        result = requests.Response()
+        result.request = request
+        result.url = request.url  # type: ignore
+        result.status_code = response.status_code
+        result.reason = response.reason_phrase
+        result.headers.update(headers)
+        result._content = response.content
+        # Cache backends read request details from the raw response
+        result.raw = HTTPResponse(
+            body=response.content,
+            status=response.status_code,
+            headers=headers,
+            request_url=request.url,
+        )
+        return result
+
+    def _save(
+        self,
+        request: requests.PreparedRequest,
+        key: str,
+        result: requests.Response,
+        expire_after: int | None,
+    ):
+        """Save async response into the HTTP cache shared with the blocking session"""
+        if expire_after is None:
+            expire_after = self.session.settings.expire_after  # type: ignore
+        self.session.cache.save_response(  # type: ignore
+            result, key, get_expiration_datetime(expire_after)
         )
 
+    def _revalidate(
+        self, request: requests.PreparedRequest, key: str, expire_after: int | None
+    ):
+        """Replace stale cached response in background, once per key"""
+
+        async def revalidate():
+            try:
+                await flights.ado(
+                    f"revalidate {key}",
+                    lambda: self._asend(request, key, expire_after),
+                )
+            except (httpx.HTTPError, requests.RequestException) as e:
+                logger.warning(f"Revalidation of {request.url} failed: {e}")
+
+        future = asyncio.run_coroutine_threadsafe(revalidate(), background_loop())
+        with _background_lock:
+            _revalidations.add(future)
+        future.add_done_callback(_forget_revalidation)
+
+    async def aclose(self):
+        """Close shared async client of the running loop"""
+        await aclose_async_client()
+
     def up(self):
         self.check()
 
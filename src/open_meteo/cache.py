@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+import time
+
+
+@dataclass
+class CachePolicy:
+    """How long Open-Meteo responses stay fresh in the HTTP cache
+
+    Geocoding results barely change, so they are kept for a long time.
+    Forecasts change only when a new model run is published, so by default
+    they expire exactly when data of the next run becomes available.
+    Expired responses are still returned immediately while a background
+    request replaces them (stale-while-revalidate).
+    """
+
+    geo_expire_after: int = 30 * 24 * 3600
+    forecast_expire_after: int | None = None  # None aligns to model runs
+    model_run_hours: int = 6
+    model_run_delay: int = 2 * 3600  # time from run start to published data
+    stale_while_revalidate: bool | int = True
+
+    @classmethod
+    def from_config(cls, config) -> "CachePolicy":
+        """Build policy from OpenMeteoConfig, unset fields keep defaults"""
+        values = {
+            "geo_expire_after": config.geo_expire_after,
+            "forecast_expire_after": config.forecast_expire_after,
+            "model_run_hours": config.model_run_hours,
+            "stale_while_revalidate": config.stale_while_revalidate,
+        }
+        return cls(**{key: value for key, value in values.items() if value is not None})
+
+    def last_model_run(self, now: float | None = None) -> float:
+        """Timestamp when data of the latest model run became available"""
+        now = time.time() if now is None else now
+        cycle = self.model_run_hours * 3600
+        return (now - self.model_run_delay) // cycle * cycle + self.model_run_delay
+
+    def next_model_run(self, now: float | None = None) -> float:
+        """Timestamp when data of the next model run becomes available"""
+        return self.last_model_run(now) + self.model_run_hours * 3600
+
+    def forecast_expiration(self, now: float | None = None) -> int:
+        """Seconds a forecast fetched now stays fresh"""
+        if self.forecast_expire_after is not None:
+            return self.forecast_expire_after
+
+        now = time.time() if now is None else now
+        return max(1, round(self.next_model_run(now) - now))
+
+    def serves_stale(self, expires: float, now: float | None = None) -> bool:
+        """Response expired at `expires` may be returned while it is replaced"""
+        if self.stale_while_revalidate is True:
+            return True
+        now = time.time() if now is None else now
+        return now < expires + self.stale_while_revalidate
+
+    def forecast_fresh_since(self, now: float | None = None) -> float:
+        """Forecasts fetched before this timestamp are stale"""
+        now = time.time() if now is None else now
+        if self.forecast_expire_after is not None:
+            return now - self.forecast_expire_after
+        return self.last_model_run(now)
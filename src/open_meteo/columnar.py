@@ -0,0 +1,252 @@
+from array import array
+from typing import Iterable, Iterator, Sequence
+from pydantic import TypeAdapter, ValidationError
+import math
+
+from .models import CurrentWeather, DailyWeather, Weather, WeatherCode
+
+from src.errors import ResponseError
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, array-backed fallback is used
+    np = None
+
+
+# DailyWeather field -> Open-Meteo daily variable
+DAILY_FIELDS: dict[str, str] = {
+    "weather_code": "weather_code",
+    "temperature_min": "temperature_2m_min",
+    "temperature_max": "temperature_2m_max",
+    "temperature_mean": "temperature_2m_mean",
+    "apparent_temperature_min": "apparent_temperature_min",
+    "apparent_temperature_max": "apparent_temperature_max",
+    "apparent_temperature_mean": "apparent_temperature_mean",
+    "relative_humidity_min": "relative_humidity_2m_min",
+    "relative_humidity_max": "relative_humidity_2m_max",
+    "relative_humidity_mean": "relative_humidity_2m_mean",
+    "wind_speed_min": "wind_speed_10m_min",
+    "wind_speed_max": "wind_speed_10m_max",
+    "wind_speed_mean": "wind_speed_10m_mean",
+    "wind_gusts_min": "wind_gusts_10m_min",
+    "wind_gusts_max": "wind_gusts_10m_max",
+    "wind_gusts_mean": "wind_gusts_10m_mean",
+    "wind_direction_dominant": "wind_direction_10m_dominant",
+}
+
+# CurrentWeather field -> Open-Meteo current variable
+CURRENT_FIELDS: dict[str, str] = {
+    "weather_code": "weather_code",
+    "temperature": "temperature_2m",
+    "apparent_temperature": "apparent_temperature",
+    "relative_humidity": "relative_humidity_2m",
+    "wind_speed": "wind_speed_10m",
+    "wind_direction": "wind_direction_10m",
+    "wind_gusts": "wind_gusts_10m",
+}
+
+# Lookup table WMO code -> WeatherCode, None for codes Open-Meteo doesn't use
+WEATHER_CODES: tuple[WeatherCode | None, ...] = tuple(
+    WeatherCode._value2member_map_.get(code) for code in range(100)
+)
+if np is not None:
+    _VALID_CODES = np.array([code is not None for code in WEATHER_CODES])
+
+_DAILY_ROWS = TypeAdapter(list[DailyWeather])
+
+
+def weather_code(value: float) -> WeatherCode | None:
+    """Map stored weather code to WeatherCode, NaN is None"""
+    return None if math.isnan(value) else WEATHER_CODES[int(value)]
+
+
+def _check_codes(values: Sequence[float]):
+    """Raise ResponseError when column contains unknown weather codes"""
+    if np is not None and len(values) > 256:
+        vector = np.asarray(values, dtype=np.float64)
+        vector = vector[~np.isnan(vector)]
+        valid = (vector >= 0) & (vector < len(WEATHER_CODES)) & (vector % 1 == 0)
+        if valid.all():
+            valid = _VALID_CODES[vector.astype(np.intp)]
+        if not valid.all():
+            raise ResponseError(f"Unknown weather codes {set(vector[~valid])}")
+        return
+
+    for value in values:
+        if math.isnan(value):
+            continue
+        if not (value % 1 == 0 and 0 <= value < len(WEATHER_CODES)) or (
+            WEATHER_CODES[int(value)] is None
+        ):
+            raise ResponseError(f"Unknown weather code {value}")
+
+
+def _column(variable: str, values: list | None, length: int) -> array:
+    """Float64 column of one daily variable, None becomes NaN"""
+    if values is None:
+        return array("d", [math.nan]) * length
+    if len(values) != length:
+        raise ResponseError(
+            f"Daily '{variable}' has {len(values)} values, expected {length}"
+        )
+
+    try:
+        return array("d", values)
+    except TypeError:
+        pass  # None values, converted one by one below
+    try:
+        return array("d", (math.nan if value is None else value for value in values))
+    except TypeError as e:
+        raise ResponseError(f"Invalid daily '{variable}': {e}")
+
+
+class DailyColumns:
+    """Daily forecast of one location stored column by column
+
+    `time` is an int64 unixtime axis, every field is a contiguous float64
+    array of the same length with NaN for missing values. Columns are
+    validated as a whole, DailyWeather rows are built only on demand.
+    """
+
+    __slots__ = ("time", "columns")
+
+    def __init__(self, time: array, columns: dict[str, array]):
+        self.time = time
+        self.columns = columns
+
+    @classmethod
+    def from_json(cls, daily: dict) -> "DailyColumns":
+        """Build columns from `daily` part of Open-Meteo response"""
+        result = cls._convert(daily)
+        _check_codes(result.columns["weather_code"])
+        return result
+
+    @classmethod
+    def from_many(cls, dailies: Iterable[dict]) -> list["DailyColumns"]:
+        """Build columns of many locations, weather codes are checked in one pass"""
+        result = list(map(cls._convert, dailies))
+
+        codes = array("d")
+        for columns in result:
+            codes.extend(columns.columns["weather_code"])
+        _check_codes(codes)
+        return result
+
+    @classmethod
+    def _convert(cls, daily: dict) -> "DailyColumns":
+        try:
+            time = array("q", daily.get("time", ()))
+        except TypeError as e:
+            raise ResponseError(f"Invalid daily time axis: {e}")
+
+        length = len(time)
+        return cls(
+            time,
+            {
+                field: _column(variable, daily.get(variable), length)
+                for field, variable in DAILY_FIELDS.items()
+            },
+        )
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __repr__(self) -> str:
+        return f"DailyColumns(days={len(self)}, fields={len(self.columns)})"
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by column buffers"""
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.time, *self.columns.values())
+        )
+
+    def column(self, field: str) -> array:
+        """Get column of DailyWeather field"""
+        return self.columns[field]
+
+    def _record(self, index: int) -> dict:
+        values = {field: column[index] for field, column in self.columns.items()}
+        values["date"] = self.time[index]
+        values["weather_code"] = weather_code(values["weather_code"])
+        return values
+
+    def row(self, index: int) -> DailyWeather:
+        """Build DailyWeather for one day"""
+        try:
+            return DailyWeather.model_validate(self._record(index))
+        except ValidationError as e:
+            raise ResponseError(f"Invalid daily weather: {e}")
+
+    def rows(self) -> Iterator[DailyWeather]:
+        """Lazily build DailyWeather for every day"""
+        return (self.row(index) for index in range(len(self)))
+
+    def records(self) -> list[DailyWeather]:
+        """Build DailyWeather for every day, validated in one call"""
+        try:
+            return _DAILY_ROWS.validate_python(map(self._record, range(len(self))))
+        except ValidationError as e:
+            raise ResponseError(f"Invalid daily weather: {e}")
+
+    def weather_codes(self) -> list[WeatherCode | None]:
+        """Weather code of every day"""
+        return list(map(weather_code, self.columns["weather_code"]))
+
+    def weather(self, current: dict) -> Weather:
+        """Build Weather model from current values and every daily row"""
+        values = {field: current.get(var) for field, var in CURRENT_FIELDS.items()}
+        if (code := values["weather_code"]) is not None:
+            values["weather_code"] = weather_code(code)
+        try:
+            return Weather(
+                current=CurrentWeather.model_validate(values), daily=self.records()
+            )
+        except ValidationError as e:
+            raise ResponseError(f"Invalid current weather: {e}")
+
+    def min(self, field: str) -> float:
+        return reduce([self], field, "min")
+
+    def max(self, field: str) -> float:
+        return reduce([self], field, "max")
+
+    def mean(self, field: str) -> float:
+        return reduce([self], field, "mean")
+
+
+def stack(frames: Iterable[DailyColumns], field: str) -> array:
+    """Concatenate one field of many locations into a single array"""
+    result = array("d")
+    for frame in frames:
+        result.extend(frame.column(field))
+    return result
+
+
+def reduce(frames: Iterable[DailyColumns], field: str, operation: str) -> float:
+    """Aggregate field across days and locations ignoring NaN: min, max or mean"""
+    if operation not in ("min", "max", "mean"):
+        raise ValueError(f"Unknown operation '{operation}'")
+
+    values = stack(frames, field)
+
+    if np is not None:
+        vector = np.frombuffer(values, dtype=np.float64)
+        if vector.size == 0 or np.isnan(vector).all():
+            return math.nan
+        return float(
+            {"min": np.nanmin, "max": np.nanmax, "mean": np.nanmean}[operation](vector)
+        )
+
+    present = [value for value in values if not math.isnan(value)]
+    if not present:
+        return math.nan
+
+    match operation:
+        case "min":
+            return min(present)
+        case "max":
+            return max(present)
+        case _:
+            return math.fsum(present) / len(present)
@@ -1,7 +1,7 @@
 from loguru import logger
 
 from .api import OpenMeteoAPI
-from .geo import DataGeoEndpointList
+from .geo import DataGeoEndpoint
 
 from src.core.api import CommandAPI
 from src.errors import SettingError, CommandError
@@ -9,37 +9,66 @@ from src.models import Coordinates
 
 
 class SelectGeo(CommandAPI):
+    """Select location by id from gazetteer or geocoding results"""
+
     def __init__(self, api: OpenMeteoAPI) -> None:
         self.api: OpenMeteoAPI = api
 
     def execute(self, id: int | None = None):
-        geo = self.api.get("GeoEndpoint")
+        if self.api.id is None and id is None:
+            logger.error("Please set id")
+            raise SettingError("Please set id")
+
+        id = int(id if id else self.api.id)  # type: ignore
+
+        result = self._lookup(id)
+        if result is None:
+            logger.error(f"No matching id found, id={id}")
+            raise CommandError(f"No matching id found, id={id}")
+
+        self.api.id = result.id
+        self.api.city = result.name
+        self.api.country = result.country
+        self.api.coordinates = Coordinates(
+            latitude=result.latitude, longitude=result.longitude
+        )
+        if "GeoEndpoint" in self.api.endpoints:
+            self.api.delete("GeoEndpoint")
+            logger.info("Deleted GeoEndpoint")
+        logger.info(
+            f"Changes attribute city={result.name}, country={result.country}, coordinates={self.api.coordinates}"
+        )
+        return result
+
+    def _lookup(self, id: int) -> DataGeoEndpoint | None:
+        if self.api.gazetteer is not None:
+            if result := self.api.gazetteer.get(id):
+                return result
 
+        geo = self.api.get("GeoEndpoint")
         try:
-            data: DataGeoEndpointList = geo.data["DataGeoEndpointList"]
+            ids: dict[int, DataGeoEndpoint] = geo.data["ids"]
         except KeyError:
             logger.error(f"{geo.name} data not found")
             raise CommandError(f"{geo.name} data not found")
+        return ids.get(id)
 
-        if self.api.id is None or id is None:
-            logger.error("Please set id")
-            raise SettingError("Please set id")
 
-        id = id if id else self.api.id
-
-        for result in data.results:
-            if result.id == id:
-                self.api.id = result.id
-                self.api.city = result.name
-                self.api.country = result.country
-                self.api.coordinates = Coordinates(
-                    latitude=result.latitude, longitude=result.longitude
-                )
-                self.api.delete("GeoEndpoint")
-                logger.info(
-                    f"Deleted {geo.name}, changes attribute city={result.name}, country={result.country}, coordinates={self.api.coordinates}"
-                )
-                return result
-        else:
-            logger.error(f"No matching id found, id={id}")
-            raise CommandError(f"No matching id found, id={id}")
+class Autocomplete(CommandAPI):
+    """Find cities by name prefix in offline gazetteer"""
+
+    def __init__(self, api: OpenMeteoAPI) -> None:
+        self.api: OpenMeteoAPI = api
+
+    def execute(self, prefix: str | None = None, limit: int = 10):
+        if prefix is None:
+            logger.error("Don't set prefix")
+            raise SettingError("Don't set prefix")
+        if self.api.gazetteer is None:
+            logger.error("Gazetteer isn't configured")
+            raise CommandError("Gazetteer isn't configured")
+
+        results = self.api.gazetteer.search(prefix, limit=int(limit))
+        for result in results:
+            print(f"{result.id}: {result.name}, {result.country_code}")
+        return results
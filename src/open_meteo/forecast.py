@@ -1,8 +1,74 @@
+from functools import partial
+from typing import Iterable
+from urllib.parse import urlencode
 from loguru import logger
+import asyncio
+import copy
+import time
 import requests
 
+from .columnar import DailyColumns
+from .models import ForecastResponse
+
 from src.core.api import WeatherEndpoint
+from src.core.singleflight import flights
+from src.core.spatial import SpatialIndex
+from src.core.transport import rebase_url, request_key
+from src.decode import decode
 from src.errors import SettingError, ResponseError
+from src.log import sampled
+from src.models import Coordinates
+
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+CURRENT_VARIABLES = [
+    "weather_code",
+    "temperature_2m",
+    "apparent_temperature",
+    "relative_humidity_2m",
+    "wind_speed_10m",
+    "wind_direction_10m",
+    "wind_gusts_10m",
+]
+
+DAILY_VARIABLES = [
+    "weather_code",
+    "temperature_2m_min",
+    "temperature_2m_max",
+    "temperature_2m_mean",
+    "apparent_temperature_min",
+    "apparent_temperature_max",
+    "apparent_temperature_mean",
+    "relative_humidity_2m_min",
+    "relative_humidity_2m_max",
+    "relative_humidity_2m_mean",
+    "wind_speed_10m_min",
+    "wind_speed_10m_max",
+    "wind_speed_10m_mean",
+    "wind_gusts_10m_min",
+    "wind_gusts_10m_max",
+    "wind_gusts_10m_mean",
+    "wind_direction_10m_dominant",
+]
+
+
+# Points of latest forecasts fetched by this process kept for tolerance lookups
+CACHED_FORECASTS = 10_000
+
+# Forecasts fetched by this process: (fetched_at, data) per point. Data is
+# shared by every API, each endpoint gets its own copy
+cached_forecasts: SpatialIndex[tuple[float, dict]] = SpatialIndex(
+    max_size=CACHED_FORECASTS
+)
+
+
+def forecast_data(response: ForecastResponse) -> dict:
+    """Extract stored parts of one location from forecast response"""
+    return {
+        "current": response.current,
+        "daily": DailyColumns.from_json(response.daily),
+    }
 
 
 class ForecastEndpoint(WeatherEndpoint):
@@ -11,64 +77,237 @@ class ForecastEndpoint(WeatherEndpoint):
         api,
     ):
         super().__init__(api)
-        self.url = "https://api.open-meteo.com/v1/forecast"
+        self.url = rebase_url(FORECAST_URL, getattr(self.api, "base_url", None))
 
-        self.latitude = self.api.coordinates.latitude
-        self.longitude = self.api.coordinates.longitude
+        self.coordinates: Coordinates = self.api.coordinates
+        self.latitude = self.coordinates.latitude
+        self.longitude = self.coordinates.longitude
+
+    def params(self) -> dict:
+        """Query parameters of forecast request"""
+        return {
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "timeformat": "unixtime",
+            "current": CURRENT_VARIABLES,
+            "daily": DAILY_VARIABLES,
+        }
 
     def refresh(self):
+        if self._from_nearest():
+            return
+
         session: requests.Session = self.api.session
+        params = self.params()
 
-        params = {
-            "latitude": self.latitude,
-            "longitude": self.longitude,
+        def fetch() -> dict:
+            response = session.get(
+                self.url,
+                params=params,
+                expire_after=self.api.cache_policy.forecast_expiration(),
+            )
+            return self._decode(response.status_code, response.content)
+
+        # Identical requests in flight, e.g. from other API instances, are sent once
+        self.data = dict(flights.do(request_key("GET", self.url, params), fetch))
+
+    async def arefresh(self):
+        if self._from_nearest():
+            return
+
+        params = self.params()
+        expire_after = self.api.cache_policy.forecast_expiration()
+
+        async def fetch() -> dict:
+            status_code, content = await self.api.aget(self.url, params, expire_after)
+            return self._decode(status_code, content)
+
+        self.data = dict(await flights.ado(request_key("GET", self.url, params), fetch))
+
+    def _from_nearest(self) -> bool:
+        """Serve forecast of nearest cached point within API tolerance"""
+        tolerance = getattr(self.api, "tolerance", None)
+        if not tolerance:
+            return False
+
+        oldest = self.api.cache_policy.forecast_fresh_since()
+        nearest = cached_forecasts.nearest(
+            self.coordinates, tolerance, where=lambda value: value[0] >= oldest
+        )
+        if nearest is None:
+            return False
+
+        coordinates, (_, data), distance = nearest
+        self.data = copy.deepcopy(data)
+        sampled(100).info(
+            "{} served from cached point {} {:.2f} km away",
+            self.name,
+            coordinates.key,
+            distance,
+        )
+        return True
+
+    def _decode(self, status_code: int, content: bytes) -> dict:
+        """Forecast data of response or raise error on failed request"""
+        if status_code != 200:
+            logger.error(f"{self.name} Error network request failed: {status_code}")
+            raise ResponseError(f"Network request failed: {status_code}")
+
+        data = forecast_data(decode(content, ForecastResponse))
+        cached_forecasts.insert(self.coordinates, (time.time(), copy.deepcopy(data)))
+        return data
+
+    def check(self):
+        """Check settings of Endpoint"""
+        if self.latitude is None or self.longitude is None:
+            logger.error("Coordinates not specified")
+            raise SettingError("Coordinates not specified")
+
+
+class BatchForecastEndpoint(WeatherEndpoint):
+    """Forecast for many locations, one request per chunk of coordinates
+
+    Open-Meteo accepts comma-separated coordinate lists and answers with an
+    array of results in the same order. Coordinates are split into chunks so
+    that the request URL stays below `max_url_length`.
+    """
+
+    def __init__(
+        self,
+        api,
+        coordinates: Iterable[Coordinates] | None = None,
+        max_url_length: int = 2000,
+        max_locations: int = 100,
+    ):
+        super().__init__(api)
+        self.url = rebase_url(FORECAST_URL, getattr(self.api, "base_url", None))
+        self.max_url_length = max_url_length
+        self.max_locations = max_locations
+
+        self.coordinates: list[Coordinates] = []
+        if coordinates is not None:
+            self.coordinates.extend(coordinates)
+        elif self.api.coordinates is not None:
+            self.coordinates.append(self.api.coordinates)
+
+    def add_location(self, coordinates: Coordinates):
+        """Add location to batch"""
+        self.coordinates.append(coordinates)
+
+    @staticmethod
+    def _format(value: float) -> str:
+        return f"{value:.4f}".rstrip("0").rstrip(".")
+
+    def params(self, chunk: list[Coordinates]) -> dict:
+        """Query parameters of forecast request for chunk of coordinates"""
+        return {
+            "latitude": ",".join(self._format(c.latitude) for c in chunk),
+            "longitude": ",".join(self._format(c.longitude) for c in chunk),
             "timeformat": "unixtime",
-            "current": [
-                "weather_code",
-                "temperature_2m",
-                "apparent_temperature",
-                "relative_humidity_2m",
-                "wind_speed_10m",
-                "wind_direction_10m",
-                "wind_gusts_10m",
-            ],
-            "daily": [
-                "weather_code",
-                "temperature_2m_min",
-                "temperature_2m_max",
-                "temperature_2m_mean",
-                "apparent_temperature_min",
-                "apparent_temperature_max",
-                "apparent_temperature_mean",
-                "relative_humidity_2m_min",
-                "relative_humidity_2m_max",
-                "relative_humidity_2m_mean",
-                "wind_speed_10m_min",
-                "wind_speed_10m_max",
-                "wind_speed_10m_mean",
-                "wind_gusts_10m_min",
-                "wind_gusts_10m_max",
-                "wind_gusts_10m_mean",
-                "wind_direction_10m_dominant",
-            ],
+            "current": CURRENT_VARIABLES,
+            "daily": DAILY_VARIABLES,
         }
 
-        response = session.get(self.url, params=params)
+    def chunks(self) -> list[list[Coordinates]]:
+        """Split coordinates into chunks with URL-length-safe requests"""
+        # Length of request without coordinates, commas are encoded as %2C
+        base = len(self.url) + 1 + len(urlencode(self.params([]), doseq=True))
 
-        if response.status_code == 200:
-            json_data = response.json()
-            current = json_data.get("current", {})
-            daily = json_data.get("daily", {})
-            self.data = {"current": current, "daily": daily}
+        chunks: list[list[Coordinates]] = []
+        chunk: list[Coordinates] = []
+        length = base
+        for coordinates in self.coordinates:
+            size = len(self._format(coordinates.latitude)) + len(
+                self._format(coordinates.longitude)
+            )
+            if chunk:
+                size += 6  # two separators
 
-        else:
+            if chunk and (
+                length + size > self.max_url_length or len(chunk) >= self.max_locations
+            ):
+                chunks.append(chunk)
+                chunk, length = [], base
+                size -= 6
+
+            chunk.append(coordinates)
+            length += size
+
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def refresh(self):
+        session: requests.Session = self.api.session
+
+        locations = {}
+        expire_after = self.api.cache_policy.forecast_expiration()
+        def fetch(
+            chunk: list[Coordinates], params: dict
+        ) -> dict[tuple[float, float], dict]:
+            response = session.get(self.url, params=params, expire_after=expire_after)
+            return self._demultiplex(chunk, response.status_code, response.content)
+
+        for chunk in self.chunks():
+            params = self.params(chunk)
+            locations.update(
+                flights.do(
+                    request_key("GET", self.url, params), partial(fetch, chunk, params)
+                )
+            )
+        self.data = {"locations": locations}
+
+    async def arefresh(self):
+        expire_after = self.api.cache_policy.forecast_expiration()
+
+        async def fetch(chunk: list[Coordinates]) -> dict[tuple[float, float], dict]:
+            params = self.params(chunk)
+
+            async def send():
+                status_code, content = await self.api.aget(
+                    self.url, params, expire_after
+                )
+                return self._demultiplex(chunk, status_code, content)
+
+            return await flights.ado(request_key("GET", self.url, params), send)
+
+        locations = {}
+        for result in await asyncio.gather(*map(fetch, self.chunks())):
+            locations.update(result)
+        self.data = {"locations": locations}
+
+    def _demultiplex(
+        self,
+        chunk: list[Coordinates],
+        status_code: int,
+        content: bytes,
+    ) -> dict[tuple[float, float], dict]:
+        """Split response of one chunk into data per requested location"""
+        if status_code != 200:
+            logger.error(f"{self.name} Error network request failed: {status_code}")
+            raise ResponseError(f"Network request failed: {status_code}")
+
+        # One location is answered with an object, several with an array
+        decoded = decode(content, list[ForecastResponse] | ForecastResponse)
+        results = decoded if isinstance(decoded, list) else [decoded]
+
+        if len(results) != len(chunk):
             logger.error(
-                f"{self.name} Error network request failed: {response.status_code}"
+                f"{self.name} expected {len(chunk)} locations, received {len(results)}"
             )
-            raise ResponseError(f"Network request failed: {response.status_code}")
+            raise ResponseError(
+                f"Expected {len(chunk)} locations, received {len(results)}"
+            )
+
+        # Weather codes of the whole chunk are validated at once
+        dailies = DailyColumns.from_many([result.daily for result in results])
+        return {
+            (c.latitude, c.longitude): {"current": result.current, "daily": daily}
+            for c, result, daily in zip(chunk, results, dailies)
+        }
 
     def check(self):
         """Check settings of Endpoint"""
-        if self.latitude is None or self.longitude is None:
+        if not self.coordinates:
             logger.error("Coordinates not specified")
             raise SettingError("Coordinates not specified")
@@ -0,0 +1,323 @@
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterator
+from loguru import logger
+
+import mmap
+import os
+import struct
+import sys
+
+from .geo import DataGeoEndpoint
+
+from src.errors import SettingError
+
+
+# GeoNames dump columns (geoname table, tab-separated)
+GEONAMES_ID = 0
+GEONAMES_NAME = 1
+GEONAMES_ASCIINAME = 2
+GEONAMES_LATITUDE = 4
+GEONAMES_LONGITUDE = 5
+GEONAMES_FEATURE_CODE = 7
+GEONAMES_COUNTRY_CODE = 8
+GEONAMES_POPULATION = 14
+GEONAMES_DEM = 16
+GEONAMES_TIMEZONE = 17
+
+# GeoNames countryInfo.txt columns
+COUNTRY_ISO = 0
+COUNTRY_NAME = 4
+
+
+def normalize(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+
+class _KeyTable:
+    """Sorted fixed-width name entries of a memory-mapped file
+
+    Entry: key padded with zero bytes, population and record offset as int64.
+    """
+
+    KEY_WIDTH = 32
+    ENTRY = struct.Struct(f"{KEY_WIDTH}sqq")
+
+    def __init__(self, buffer: mmap.mmap | bytes):
+        self.buffer = buffer
+
+    def __len__(self) -> int:
+        return len(self.buffer) // self.ENTRY.size
+
+    def __getitem__(self, index: int) -> bytes:
+        start = index * self.ENTRY.size
+        return self.buffer[start : start + self.KEY_WIDTH]
+
+    def entry(self, index: int) -> tuple[bytes, int, int]:
+        return self.ENTRY.unpack_from(self.buffer, index * self.ENTRY.size)
+
+    @classmethod
+    def encode(cls, name: str) -> bytes:
+        return cls.pad(normalize(name).encode())
+
+    @classmethod
+    def pad(cls, key: bytes) -> bytes:
+        return key[: cls.KEY_WIDTH].ljust(cls.KEY_WIDTH, b"\0")
+
+
+class _PrefixTable(_KeyTable):
+    """Most populated places of every short prefix, most populated first
+
+    Entry: country code (zero bytes for every country) and prefix padded
+    with zero bytes, population and record offset. A prefix with fewer than
+    `TOP` entries lists all of its places.
+    """
+
+    PREFIX_WIDTH = 2
+    KEY_WIDTH = 2 + PREFIX_WIDTH
+    ENTRY = struct.Struct(f"{KEY_WIDTH}sqq")
+    TOP = 32
+
+    @classmethod
+    def key(cls, prefix: bytes, country_code: str | None = None) -> bytes:
+        country = (country_code or "").upper().encode()[:2].ljust(2, b"\0")
+        return cls.pad(country + prefix)
+
+    def offsets(self, prefix: bytes, country_code: str | None = None) -> list[int]:
+        key = self.key(prefix, country_code)
+        index = bisect_left(self, key)
+        result = []
+        while index < len(self) and self[index] == key:
+            result.append(self.entry(index)[2])
+            index += 1
+        return result
+
+
+class Gazetteer:
+    """Offline geocoding from a prebuilt GeoNames index
+
+    Index directory holds `records.tsv` with one place per line, `ids.bin` and
+    `offsets.bin` with sorted ids and their record offsets, and `names.bin`
+    with a sorted table of names for prefix search. `prefixes.bin` keeps
+    the most populated places of prefixes up to two bytes, so the first
+    keystrokes of autocomplete don't scan every matching name, and
+    `countries.tsv` maps country codes to names. All files are read through
+    mmap, lookups don't parse anything but the matched records.
+    """
+
+    RECORDS = "records.tsv"
+    IDS = "ids.bin"
+    OFFSETS = "offsets.bin"
+    NAMES = "names.bin"
+    PREFIXES = "prefixes.bin"
+    COUNTRIES = "countries.tsv"
+
+    def __init__(self, path: str):
+        self.path = path
+
+        try:
+            self._records = self._map(self.RECORDS)
+            self._ids = memoryview(self._map(self.IDS)).cast("q")
+            self._offsets = memoryview(self._map(self.OFFSETS)).cast("q")
+            self._names = _KeyTable(self._map(self.NAMES))
+        except FileNotFoundError as e:
+            logger.error(f"Gazetteer index not found in {path}: {e}")
+            raise SettingError(f"Gazetteer index not found in {path}")
+
+        # Indexes built before prefix table and country names work without them
+        try:
+            self._prefixes: _PrefixTable | None = _PrefixTable(self._map(self.PREFIXES))
+        except FileNotFoundError:
+            self._prefixes = None
+        self._countries = self._read_countries(os.path.join(path, self.COUNTRIES))
+
+    def _map(self, name: str) -> mmap.mmap | bytes:
+        with open(os.path.join(self.path, name), "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _record(self, offset: int) -> DataGeoEndpoint:
+        end = self._records.find(b"\n", offset)
+        line = self._records[offset : end if end != -1 else len(self._records)]
+        (
+            id,
+            name,
+            latitude,
+            longitude,
+            elevation,
+            feature,
+            country,
+            timezone,
+            population,
+        ) = line.decode().split("\t")
+        return DataGeoEndpoint(
+            id=int(id),
+            name=name,
+            latitude=float(latitude),
+            longitude=float(longitude),
+            elevation=float(elevation) if elevation else None,
+            feature_code=feature,
+            country_code=country,
+            country=self._countries.get(country),
+            timezone=timezone,
+            population=int(population) if population else None,
+        )
+
+    def get(self, id: int) -> DataGeoEndpoint | None:
+        """Find place by GeoNames id"""
+        index = bisect_left(self._ids, id)
+        if index < len(self._ids) and self._ids[index] == id:
+            return self._record(self._offsets[index])
+        return None
+
+    def search(
+        self, prefix: str, limit: int = 10, country_code: str | None = None
+    ) -> list[DataGeoEndpoint]:
+        """Find places whose name starts with prefix, most populated first"""
+        key = normalize(prefix).encode()[: _KeyTable.KEY_WIDTH]
+        if not key:
+            return []
+
+        if self._prefixes is not None and len(key) <= _PrefixTable.PREFIX_WIDTH:
+            offsets = self._prefixes.offsets(key, country_code)
+            results = self._filter(offsets, limit, country_code)
+            # Table lists every place of prefix or enough of the most populated
+            if len(results) >= limit or len(offsets) < _PrefixTable.TOP:
+                return results
+
+        matches: dict[int, int] = {}
+        index = bisect_left(self._names, key)
+        while index < len(self._names) and self._names[index].startswith(key):
+            _, population, offset = self._names.entry(index)
+            matches[offset] = population
+            index += 1
+
+        return self._filter(
+            sorted(matches, key=matches.__getitem__, reverse=True),
+            limit,
+            country_code,
+        )
+
+    def _filter(
+        self, offsets: list[int], limit: int, country_code: str | None
+    ) -> list[DataGeoEndpoint]:
+        """First `limit` records of offsets in country"""
+        results = []
+        for offset in offsets:
+            record = self._record(offset)
+            if country_code is None or record.country_code == country_code.upper():
+                results.append(record)
+                if len(results) >= limit:
+                    break
+        return results
+
+    @classmethod
+    def build(cls, dump: str, path: str, countries: str | None = None) -> "Gazetteer":
+        """Build index directory from GeoNames dump (e.g. cities500.txt)
+
+        Country names are read from GeoNames `countries` file, by default
+        countryInfo.txt next to the dump if it exists.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        places = sorted(cls._read_dump(dump), key=lambda place: int(place[0]))
+
+        ids, offsets = array("q"), array("q")
+        country_codes: dict[int, str] = {}
+        names: list[tuple[bytes, int, int]] = []
+        offset = 0
+        with open(os.path.join(path, cls.RECORDS), "wb") as file:
+            for place, aliases in ((place[:-1], place[-1]) for place in places):
+                line = ("\t".join(place) + "\n").encode()
+                file.write(line)
+
+                population = int(place[-1] or 0)
+                ids.append(int(place[0]))
+                offsets.append(offset)
+                country_codes[offset] = place[6]
+                for alias in aliases:
+                    names.append((_KeyTable.encode(alias), -population, offset))
+                offset += len(line)
+
+        names.sort()
+        # Prefix key -> record offset -> population of places, of every
+        # country and of the country of place
+        prefixes: dict[bytes, dict[int, int]] = defaultdict(dict)
+        for key, population, offset in names:
+            name = key.rstrip(b"\0")
+            for width in range(1, min(len(name), _PrefixTable.PREFIX_WIDTH) + 1):
+                for country in (None, country_codes[offset]):
+                    places = prefixes[_PrefixTable.key(name[:width], country)]
+                    places[offset] = -population
+
+        with open(os.path.join(path, cls.IDS), "wb") as file:
+            ids.tofile(file)
+        with open(os.path.join(path, cls.OFFSETS), "wb") as file:
+            offsets.tofile(file)
+        with open(os.path.join(path, cls.NAMES), "wb") as file:
+            for key, population, offset in names:
+                file.write(_KeyTable.ENTRY.pack(key, -population, offset))
+        with open(os.path.join(path, cls.PREFIXES), "wb") as file:
+            for key, places in sorted(prefixes.items()):
+                top = sorted(places.items(), key=lambda place: (-place[1], place[0]))
+                for offset, population in top[: _PrefixTable.TOP]:
+                    file.write(_PrefixTable.ENTRY.pack(key, population, offset))
+
+        countries = countries or os.path.join(os.path.dirname(dump), "countryInfo.txt")
+        if os.path.exists(countries):
+            with open(os.path.join(path, cls.COUNTRIES), "w", encoding="utf-8") as file:
+                for code, name in cls._read_country_info(countries):
+                    file.write(f"{code}\t{name}\n")
+
+        logger.info(f"Built gazetteer {path} with {len(ids)} places")
+        return cls(path)
+
+    @staticmethod
+    def _read_dump(dump: str) -> Iterator[list]:
+        with open(dump, encoding="utf-8") as file:
+            for line in file:
+                columns = line.rstrip("\n").split("\t")
+                if len(columns) <= GEONAMES_TIMEZONE:
+                    continue
+                yield [
+                    columns[GEONAMES_ID],
+                    columns[GEONAMES_NAME],
+                    columns[GEONAMES_LATITUDE],
+                    columns[GEONAMES_LONGITUDE],
+                    columns[GEONAMES_DEM],
+                    columns[GEONAMES_FEATURE_CODE],
+                    columns[GEONAMES_COUNTRY_CODE],
+                    columns[GEONAMES_TIMEZONE],
+                    columns[GEONAMES_POPULATION],
+                    {columns[GEONAMES_NAME], columns[GEONAMES_ASCIINAME]} - {""},
+                ]
+
+    @staticmethod
+    def _read_country_info(path: str) -> Iterator[tuple[str, str]]:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("#"):
+                    continue
+                columns = line.rstrip("\n").split("\t")
+                if len(columns) > COUNTRY_NAME:
+                    yield columns[COUNTRY_ISO], columns[COUNTRY_NAME]
+
+    @staticmethod
+    def _read_countries(path: str) -> dict[str, str]:
+        try:
+            with open(path, encoding="utf-8") as file:
+                return dict(
+                    line.rstrip("\n").split("\t", 1) for line in file if "\t" in line
+                )
+        except FileNotFoundError:
+            return {}
+
+    def __str__(self):
+        return f"Gazetteer({self.path})"
+
+
+if __name__ == "__main__":
+    # python -m src.open_meteo.gazetteer <geonames dump> <index directory> [countryInfo.txt]
+    Gazetteer.build(*sys.argv[1:4])
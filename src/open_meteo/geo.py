@@ -3,34 +3,42 @@ from loguru import logger
 import requests
 
 from src.core.api import WeatherEndpoint
+from src.core.singleflight import flights
+from src.core.transport import rebase_url, request_key
+from src.decode import decode
 from src.errors import ResponseError, SettingError
 
 
+GEO_URL = "https://geocoding-api.open-meteo.com/v1/search"
+
+
 class DataGeoEndpoint(BaseModel):
     id: int
     name: str
     latitude: float
     longitude: float
-    elevation: float
-    feature_code: str
-    country_code: str
-    admin1_id: int
-    admin2_id: int
-    admin3_id: int
-    admin4_id: int
-    timezone: str
-    population: int
-    postcodes: list[str]
-    country_id: int
-    country: str
-    admin1: str
-    admin2: str
-    admin3: str
-    admin4: str
+    # Geocoding API omits fields unknown for the place
+    elevation: float | None = None
+    feature_code: str | None = None
+    country_code: str | None = None
+    admin1_id: int | None = None
+    admin2_id: int | None = None
+    admin3_id: int | None = None
+    admin4_id: int | None = None
+    timezone: str | None = None
+    population: int | None = None
+    postcodes: list[str] = []
+    country_id: int | None = None
+    country: str | None = None
+    admin1: str | None = None
+    admin2: str | None = None
+    admin3: str | None = None
+    admin4: str | None = None
 
 
 class DataGeoEndpointList(BaseModel):
-    results: list[DataGeoEndpoint]
+    # Geocoding API omits results when nothing is found
+    results: list[DataGeoEndpoint] = []
 
 
 class GeoEndpoint(WeatherEndpoint):
@@ -39,7 +47,7 @@ class GeoEndpoint(WeatherEndpoint):
         api,
     ):
         super().__init__(api)  # create attr name, api, data
-        self.url = "https://geocoding-api.open-meteo.com/v1/search"
+        self.url = rebase_url(GEO_URL, getattr(self.api, "base_url", None))
 
         self.id = self.api.id
         self.city = self.api.city
@@ -49,24 +57,76 @@ class GeoEndpoint(WeatherEndpoint):
 
         self.check()
 
-    def refresh(self, forced: bool = False):
-        session: requests.Session = self.api.session
-
+    def params(self) -> dict:
+        """Query parameters of geocoding request, unset parameters are omitted"""
         params = {
             "name": self.city,
             "language": self.language,
             "country": self.country,
             "count": self.count,
         }
+        return {key: value for key, value in params.items() if value is not None}
+
+    def refresh(self, forced: bool = False):
+        if not forced and self._lookup_offline():
+            return
+
+        session: requests.Session = self.api.session
+        params = self.params()
+
+        def fetch() -> DataGeoEndpointList:
+            response = session.get(self.url, params=params)
+            return self._decode(response.status_code, response.content)
 
-        response = session.get(self.url, params=params)
+        # Identical searches in flight, e.g. from other API instances, are sent once
+        self._store(flights.do(request_key("GET", self.url, params), fetch))
 
-        if response.status_code != 200:
-            logger.error(f"Error network request failed: {response.status_code}")
-            raise ResponseError(f"Error network request failed: {response.status_code}")
+    async def arefresh(self):
+        if self._lookup_offline():
+            return
 
-        response_data = response.json()
-        self.data["DataGeoEndpoint"] = DataGeoEndpointList(**response_data["results"])
+        params = self.params()
+        expire_after = self.api.cache_policy.geo_expire_after
+
+        async def fetch() -> DataGeoEndpointList:
+            status_code, content = await self.api.aget(self.url, params, expire_after)
+            return self._decode(status_code, content)
+
+        self._store(await flights.ado(request_key("GET", self.url, params), fetch))
+
+    def _decode(self, status_code: int, content: bytes) -> DataGeoEndpointList:
+        """Decoded search results or raise error on failed request"""
+        if status_code != 200:
+            logger.error(f"Error network request failed: {status_code}")
+            raise ResponseError(f"Error network request failed: {status_code}")
+
+        return decode(content, DataGeoEndpointList)
+
+    def _lookup_offline(self) -> bool:
+        """Resolve city in local gazetteer, remote geocoding is used on a miss"""
+        gazetteer = getattr(self.api, "gazetteer", None)
+        if gazetteer is None or self.city is None:
+            return False
+
+        results = gazetteer.search(
+            self.city,
+            limit=self.count or 10,
+            country_code=self.country
+            if self.country and len(self.country) == 2
+            else None,
+        )
+        if not results:
+            logger.info(f"{self.name} '{self.city}' not found offline, using remote")
+            return False
+
+        self._store(DataGeoEndpointList(results=results))
+        return True
+
+    def _store(self, data: DataGeoEndpointList):
+        self.data = {
+            "DataGeoEndpointList": data,
+            "ids": {result.id: result for result in data.results},
+        }
 
     def check(self):
         """Check settings of Endpoint"""
@@ -81,6 +81,16 @@ class ForecastRequest(BaseModel):
     coordinates: Coordinates
 
 
+# ----- Raw responses -----
+class ForecastResponse(BaseModel):
+    """Forecast of one location as returned by Open-Meteo (timeformat=unixtime)"""
+
+    latitude: float
+    longitude: float
+    current: dict[str, int | float | None] = {}
+    daily: dict[str, list[int | float | None]] = {}
+
+
 # ----- Current -----
 class CurrentWeather(BaseModel):
     weather_code: WeatherCode
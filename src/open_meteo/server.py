@@ -0,0 +1,258 @@
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from loguru import logger
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import zlib
+
+from .forecast import CURRENT_VARIABLES, DAILY_VARIABLES
+from src.log import sampled
+
+
+@dataclass
+class StandInConfig:
+    host: str = "127.0.0.1"
+    port: int = 0  # 0 picks a free port
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # seconds, uniformly random extra latency
+    error_rate: float = 0.0  # share of requests answered with error_status
+    error_status: int = 429
+    days: int = 7  # forecast days when request doesn't set forecast_days
+    seed: int | None = None
+
+
+def _values(request: dict[str, list[str]], name: str) -> list[str]:
+    """Query values of parameter, repeated and comma separated forms"""
+    return [part for value in request.get(name, []) for part in value.split(",")]
+
+
+def _series(variable: str, latitude: float, longitude: float, step: int) -> float:
+    """Deterministic plausible value of variable for a point and step"""
+    phase = math.sin(latitude + longitude + step / 3)
+    if variable.startswith("weather_code"):
+        return (0, 1, 2, 3, 45, 61, 63, 80, 95)[(step + int(abs(latitude))) % 9]
+    if "direction" in variable:
+        return round((longitude * 10 + step * 37) % 360)
+    if "humidity" in variable:
+        return round(70 + 20 * phase)
+    if "wind" in variable:
+        return round(12 + 8 * phase, 1)
+    return round(25 - abs(latitude) / 3 + 6 * phase, 1)
+
+
+def forecast_payload(
+    latitude: float,
+    longitude: float,
+    current: list[str],
+    daily: list[str],
+    days: int,
+    now: int,
+) -> dict:
+    """Forecast response of one location in Open-Meteo layout (timeformat=unixtime)"""
+    start = now - now % 86400
+    payload: dict = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "generationtime_ms": 0.1,
+        "utc_offset_seconds": 0,
+        "timezone": "GMT",
+        "timezone_abbreviation": "GMT",
+        "elevation": 0.0,
+    }
+    if current:
+        payload["current"] = {"time": now - now % 900, "interval": 900} | {
+            variable: _series(variable, latitude, longitude, 0) for variable in current
+        }
+    if daily:
+        payload["daily"] = {"time": [start + day * 86400 for day in range(days)]} | {
+            variable: [
+                _series(variable, latitude, longitude, day) for day in range(days)
+            ]
+            for variable in daily
+        }
+    return payload
+
+
+def search_payload(name: str, count: int) -> dict:
+    """Geocoding response with `count` places named like the query"""
+    if len(name) < 2:
+        return {"generationtime_ms": 0.1}
+
+    seed = zlib.crc32(name.lower().encode())
+    results = []
+    for index in range(count):
+        place = (seed + index * 7919) % 1_000_000
+        results.append(
+            {
+                "id": 1_000_000 + place,
+                "name": name.title(),
+                "latitude": round((place % 18000) / 100 - 90, 5),
+                "longitude": round((place % 36000) / 100 - 180, 5),
+                "elevation": float(place % 2000),
+                "feature_code": "PPL",
+                "country_code": "ZZ",
+                "timezone": "GMT",
+                "population": place * 10,
+                "country": "Stand-in",
+            }
+        )
+    return {"results": results, "generationtime_ms": 0.1}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for high request rates
+    server: "StandInHTTPServer"
+
+    def do_GET(self):
+        config = self.server.config
+        url = urlsplit(self.path)
+        request = parse_qs(url.query)
+
+        delay = config.latency + self.server.random.uniform(0, config.jitter)
+        if delay:
+            time.sleep(delay)
+
+        if self.server.random.random() < config.error_rate:
+            self.server.count("failed")
+            return self._send(
+                config.error_status, {"error": True, "reason": "Stand-in error"}
+            )
+
+        match url.path:
+            case "/v1/forecast":
+                self._forecast(request)
+            case "/v1/search":
+                name = request.get("name", [""])[0]
+                count = int(request.get("count", ["10"])[0])
+                self._send(200, search_payload(name, count))
+            case _:
+                self._send(404, {"error": True, "reason": "Not found"})
+
+    def _forecast(self, request: dict[str, list[str]]):
+        try:
+            latitudes = [float(value) for value in _values(request, "latitude")]
+            longitudes = [float(value) for value in _values(request, "longitude")]
+            days = int(request.get("forecast_days", [self.server.config.days])[0])
+        except ValueError as e:
+            return self._send(400, {"error": True, "reason": str(e)})
+
+        if not latitudes or len(latitudes) != len(longitudes):
+            return self._send(
+                400, {"error": True, "reason": "Latitude and longitude must match"}
+            )
+
+        current = _values(request, "current") or CURRENT_VARIABLES
+        daily = _values(request, "daily") or DAILY_VARIABLES
+        now = int(time.time())
+        payloads = [
+            forecast_payload(latitude, longitude, current, daily, days, now)
+            for latitude, longitude in zip(latitudes, longitudes)
+        ]
+        self._send(200, payloads[0] if len(payloads) == 1 else payloads)
+
+    def _send(self, status: int, payload: dict | list):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count("served")
+
+    def log_message(self, format, *args):
+        # Lazy arguments are called only when the message is logged
+        sampled(100).opt(lazy=True).debug(
+            "Stand-in {} {}", lambda: self.address_string(), lambda: format % args
+        )
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config: StandInConfig):
+        super().__init__((config.host, config.port), StandInHandler)
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.stats = {"served": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+
+class StandInServer:
+    """Local imitation of Open-Meteo forecast and geocoding endpoints
+
+    Serves /v1/forecast and /v1/search with generated data, configurable
+    latency, error rate and payload size. Point OpenMeteoConfig.base_url at
+    `url` to exercise the real networking code offline.
+    """
+
+    def __init__(self, config: StandInConfig | None = None):
+        self.config = config or StandInConfig()
+        self._server: StandInHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Stand-in server isn't running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> dict:
+        return dict(self._server.stats) if self._server else {}
+
+    def start(self) -> str:
+        """Serve in background thread, returns base URL"""
+        self._server = StandInHTTPServer(self.config)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="open-meteo-stand-in",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(f"Open-Meteo stand-in server started on {self.url}")
+        return self.url
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        logger.info("Open-Meteo stand-in server stopped")
+        self._server = self._thread = None
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    # python -m src.open_meteo.server --port 8080 --latency 0.05 --error-rate 0.01
+    parser = argparse.ArgumentParser(description="Local Open-Meteo stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--seed", type=int)
+    server = StandInHTTPServer(StandInConfig(**vars(parser.parse_args())))
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}")
+    server.serve_forever()
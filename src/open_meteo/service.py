@@ -0,0 +1,176 @@
+from array import array
+from dataclasses import dataclass
+from typing import Hashable, Iterator
+from loguru import logger
+
+import math
+import time
+
+from .api import OpenMeteoAPI
+from .columnar import DailyColumns, DAILY_FIELDS
+
+from src.core.archive import TimeSeriesArchive
+from src.core.service import WeatherService, WeatherProcessor, ServiceConfig
+from src.core.storage import SQLiteStore
+from src.errors import ProcessorError
+from src.models import Coordinates
+
+
+@dataclass
+class OpenMeteoServiceConfig(ServiceConfig):
+    database: str = ".data/weather.db"
+    archive: str = ".data/archive"
+
+
+class OpenMeteoService(WeatherService):
+    def __init__(self, config: OpenMeteoServiceConfig):
+        super().__init__(config)
+
+
+def forecast_series(
+    location_id: str, data: dict
+) -> Iterator[tuple[str, str, array, array]]:
+    """Split forecast data of one location into storage series (times, values)"""
+    current: dict = data.get("current", {})
+    if (timestamp := current.get("time")) is not None:
+        for variable, value in current.items():
+            if variable not in ("time", "interval") and value is not None:
+                yield (
+                    location_id,
+                    f"current.{variable}",
+                    array("q", (timestamp,)),
+                    array("d", (value,)),
+                )
+
+    daily: DailyColumns | None = data.get("daily")
+    if daily is None:
+        return
+    # Columns are packed as they are, missing values stay NaN
+    for field, column in daily.columns.items():
+        yield location_id, field, daily.time, column
+
+
+def forecast_locations(api: OpenMeteoAPI | None) -> Iterator[tuple[str, dict]]:
+    """Forecast data of every location held by API endpoints"""
+    if api is None:
+        raise ProcessorError("Processor doesn't have API")
+
+    for endpoint in api.endpoints.values():
+        if "locations" in endpoint.data:
+            for (latitude, longitude), data in endpoint.data["locations"].items():
+                yield Coordinates(latitude=latitude, longitude=longitude).key, data
+        elif "daily" in endpoint.data:
+            if api.id is not None:
+                yield str(api.id), endpoint.data
+            elif api.coordinates is not None:
+                yield api.coordinates.key, endpoint.data
+
+
+class ForecastStorage(WeatherProcessor[OpenMeteoAPI]):
+    """Persist forecasts of API endpoints to a local SQLite database"""
+
+    def __init__(
+        self,
+        service: OpenMeteoService | None = None,
+        api: OpenMeteoAPI | None = None,
+        database: str | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.api = api
+
+        if database is None:
+            database = (
+                service.config.database  # type: ignore
+                if service is not None
+                else OpenMeteoServiceConfig.database
+            )
+        self.store = SQLiteStore(database)
+
+    def run(self):
+        """Collect series of all forecasts into buffer"""
+        for location_id, data in forecast_locations(self.api):
+            self.data.extend(forecast_series(location_id, data))
+
+    def save(self):
+        """Write buffered series to database"""
+        count = self.store.write_series(self.data)
+        logger.info(f"{self.name} saved {count} values to {self.store.path}")
+        self.data = []
+
+    def load(self, location_id: str) -> tuple[dict, DailyColumns]:
+        """Read last known current weather and daily forecast of location"""
+        current = {}
+        daily: dict[str, tuple[array, array]] = {}
+
+        for variable, (times, values) in self.store.read_series(location_id).items():
+            if variable.startswith("current."):
+                current["time"] = times[-1]
+                current[variable.removeprefix("current.")] = values[-1]
+            else:
+                daily[variable] = (times, values)
+
+        axis = array("q", sorted({t for times, _ in daily.values() for t in times}))
+        columns = {}
+        for field in DAILY_FIELDS:
+            if (series := daily.get(field)) is None:
+                columns[field] = array("d", [math.nan]) * len(axis)
+            elif series[0] == axis:
+                columns[field] = series[1]
+            else:
+                values = dict(zip(*series))
+                columns[field] = array("d", (values.get(t, math.nan) for t in axis))
+        return current, DailyColumns(axis, columns)
+
+
+class ForecastArchive(WeatherProcessor[OpenMeteoAPI]):
+    """Append daily forecasts of API endpoints to the time series archive
+
+    Only days that have already started are archived, so the kept value of a
+    day is the first forecast of it seen on that day.
+    """
+
+    def __init__(
+        self,
+        service: OpenMeteoService | None = None,
+        api: OpenMeteoAPI | None = None,
+        archive: str | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.api = api
+
+        if archive is None:
+            archive = (
+                service.config.archive  # type: ignore
+                if service is not None
+                else OpenMeteoServiceConfig.archive
+            )
+        self.archive = TimeSeriesArchive(archive)
+
+    def inputs(self) -> Hashable | None:
+        """Revisions of endpoint data and current hour, days start on the hour"""
+        inputs = super().inputs()
+        return None if inputs is None else (inputs, int(time.time() // 3600))
+
+    def run(self):
+        """Collect started days of every daily column into buffer"""
+        now = time.time()
+
+        for location_id, data in forecast_locations(self.api):
+            daily: DailyColumns | None = data.get("daily")
+            if daily is None:
+                continue
+
+            end = len(daily)
+            while end > 0 and daily.time[end - 1] > now:
+                end -= 1
+
+            for field, column in daily.columns.items():
+                self.data.append((location_id, field, daily.time[:end], column[:end]))
+
+    def save(self):
+        """Append buffered series to archive"""
+        count = sum(self.archive.append(*series) for series in self.data)
+        logger.info(f"{self.name} archived {count} points to {self.archive.root}")
+        self.data = []
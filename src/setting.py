@@ -1,58 +1,103 @@
 from typing import Callable
+from loguru import logger
+import atexit
+import tempfile
+import threading
 import toml
 import os
 
+from .core.tracing import traced
 from .errors import ConfigError
 from .utils import safe_cast, unwrap_union_type
 
 
 class Setting:
-    def __init__(self, file_path):
-        """Initialize settings by loading data from a TOML file."""
+    def __init__(self, file_path, debounce: float | None = None):
+        """Initialize settings by loading data from a TOML file.
+
+        Without debounce every change is written at once. With debounce
+        (seconds) writes are deferred: changes made within the window are
+        written together, flush() writes them immediately.
+        """
         self.file_path = file_path
-        self.data = self.load()
+        self.debounce = debounce
+
+        self._lock = threading.RLock()
+        self._timer: threading.Timer | None = None
+        self._dirty = False
+        self._signature: tuple[int, int] | None = None
+        self._data: dict = self.load()
+
+        if debounce:
+            atexit.register(self.flush)
+
+    @property
+    def data(self) -> dict:
+        """Parsed settings, the file is parsed again only after it changes on disk"""
+        with self._lock:
+            if not self._dirty and self._stat() != self._signature:
+                logger.debug(f"{self} changed on disk, reloading")
+                self._data = self.load()
+            return self._data
+
+    @data.setter
+    def data(self, value: dict):
+        with self._lock:
+            self._data = value
+            self._save_file()
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
 
+    @traced
     def load(self):
         """Load and return data from the TOML file."""
         if not os.path.exists(self.file_path):
-            with open(self.file_path, "w") as file:
-                toml.dump({}, file)
+            self._write({})
 
         with open(self.file_path, "r") as file:
-            return toml.load(file)
+            signature = os.fstat(file.fileno())
+            data = toml.load(file)
+        self._signature = signature.st_mtime_ns, signature.st_size
+        return data
 
+    @traced
     def save(self, obj, path: list[str]):
         """Save object data to a TOML path by extracting values from object's annotations."""
-        # Create structure by path if it doesn't exist
-        current = self.data
-        for key in path[:-1]:
-            if key not in current:
-                current[key] = {}
-            current = current[key]
-
-        # Get object data
-        obj_data = {}
-        if hasattr(obj.__class__, "__annotations__"):
-            for name, t in obj.__class__.__annotations__.items():
-                if hasattr(obj, name):
-                    value = getattr(obj, name)
-                    # Save only non-None values
-                    if value is not None:
-                        obj_data[name] = value
-                else:
-                    raise ConfigError(f"Object doesn't have attribute '{name}'")
-        else:
-            raise ConfigError("Object's class doesn't have __annotations__")
-
-        # Save data on path
-        if len(path) > 0:
-            current[path[-1]] = obj_data
-        else:
-            self.data.update(obj_data)
-
-        # Write to file
-        with open(self.file_path, "w") as file:
-            toml.dump(self.data, file)
+        # Data mustn't change while a debounced flush writes it
+        with self._lock:
+            # Create structure by path if it doesn't exist
+            current = self.data
+            for key in path[:-1]:
+                if key not in current:
+                    current[key] = {}
+                current = current[key]
+
+            # Get object data
+            obj_data = {}
+            if hasattr(obj.__class__, "__annotations__"):
+                for name, t in obj.__class__.__annotations__.items():
+                    if hasattr(obj, name):
+                        value = getattr(obj, name)
+                        # Save only non-None values
+                        if value is not None:
+                            obj_data[name] = value
+                    else:
+                        raise ConfigError(f"Object doesn't have attribute '{name}'")
+            else:
+                raise ConfigError("Object's class doesn't have __annotations__")
+
+            # Save data on path
+            if len(path) > 0:
+                current[path[-1]] = obj_data
+            else:
+                self.data.update(obj_data)
+
+            self._save_file()
 
     def _cast_value(self, value, annotation):
         """Cast value to type annotation (considering Union and None)."""
@@ -70,6 +115,7 @@ class Setting:
             except (ValueError, TypeError):
                 return value
 
+    @traced
     def fetch(self, obj: Callable, path: list[str]):
         """Fetch values from a TOML path and cast them to types from a class's annotations."""
         try:
@@ -93,18 +139,61 @@ class Setting:
 
     def add(self, key, value):
         """Add a new key-value pair to settings and save."""
-        self.data[key] = value
-        self._save_file()
+        with self._lock:
+            self.data[key] = value
+            self._save_file()
 
     def update(self, data: dict):
         """Update settings with a dictionary and save."""
-        self.data.update(data)
-        self._save_file()
+        with self._lock:
+            self.data.update(data)
+            self._save_file()
 
     def _save_file(self):
-        """Internal method to save current data to the TOML file."""
-        with open(self.file_path, "w") as file:
-            toml.dump(self.data, file)
+        """Write current data to the TOML file now or after debounce window."""
+        with self._lock:
+            self._dirty = True
+            if not self.debounce:
+                self.flush()
+                return
+
+            # First change opens the window, later ones join the pending write
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    @traced
+    def flush(self):
+        """Write pending changes to the TOML file."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._write(self._data)
+            self._dirty = False
+
+    def _write(self, data: dict):
+        """Replace file atomically, readers never see a partial file."""
+        directory = os.path.dirname(self.file_path) or "."
+        descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            # mkstemp creates private files, keep mode of replaced file
+            mode = (
+                os.stat(self.file_path).st_mode
+                if os.path.exists(self.file_path)
+                else 0o644
+            )
+            os.chmod(temporary, mode & 0o777)
+            with os.fdopen(descriptor, "w") as file:
+                toml.dump(data, file)
+            os.replace(temporary, self.file_path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        self._signature = self._stat()
 
     def __str__(self):
         return f"Setting({self.file_path})"
@@ -1,54 +1,156 @@
-def apis():
+from collections.abc import Mapping
+from functools import cache
+from importlib.metadata import entry_points
+from typing import Callable
+
+import threading
+
+
+class LazyRegistry(Mapping):
+    """Process-wide registry whose entries are built on first access
+
+    Every entry has a loader that imports its modules and returns the entry
+    dict. Loaders run once, later lookups are plain dict reads. Plugins add
+    loaders through package entry points of the registry group.
+    """
+
+    def __init__(self, loaders: dict[str, Callable[[], dict]], group: str):
+        self._loaders = dict(loaders)
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+        for entry_point in entry_points(group=group):
+            self._loaders.setdefault(entry_point.name, self._plugin(entry_point))
+
+    @staticmethod
+    def _plugin(entry_point) -> Callable[[], dict]:
+        def load() -> dict:
+            # Entry point refers to the entry dict or to a loader returning it
+            entry = entry_point.load()
+            return entry() if callable(entry) else entry
+
+        return load
+
+    def register(self, name: str, loader: Callable[[], dict]):
+        """Add entry, loader is called on first access"""
+        with self._lock:
+            self._loaders[name] = loader
+            self._entries.pop(name, None)
+
+    def __getitem__(self, name: str) -> dict:
+        if (entry := self._entries.get(name)) is not None:
+            return entry
+
+        loader = self._loaders[name]
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = loader()
+            return self._entries[name]
+
+    def __iter__(self):
+        return iter(self._loaders)
+
+    def __len__(self) -> int:
+        return len(self._loaders)
+
+    def __contains__(self, name) -> bool:
+        return name in self._loaders
+
+
+def _weather_api() -> dict:
     from src.core.api import WeatherAPI, ConfigAPI
     from src.core.commands import Add, Refresh, Delete, Data
 
+    return {
+        "class": WeatherAPI,
+        "config": ConfigAPI,
+        "endpoints": [],
+        "commands": {
+            "add": Add,
+            "refresh": Refresh,
+            "delete": Delete,
+            "data": Data,
+        },
+    }
+
+
+def _open_meteo_api() -> dict:
     from src.open_meteo.api import OpenMeteoAPI, OpenMeteoConfig
-    from src.open_meteo.forecast import ForecastEndpoint
+    from src.open_meteo.forecast import ForecastEndpoint, BatchForecastEndpoint
     from src.open_meteo.geo import GeoEndpoint
-    from src.open_meteo.commands import SelectGeo
+    from src.open_meteo.commands import SelectGeo, Autocomplete
 
     return {
-        "WeatherAPI": {
-            "class": WeatherAPI,
-            "config": ConfigAPI,
-            "endpoints": [],
-            "commands": {
-                "add": Add,
-                "refresh": Refresh,
-                "delete": Delete,
-                "data": Data,
-            },
+        "class": OpenMeteoAPI,
+        "config": OpenMeteoConfig,
+        "endpoints": {
+            "forecast": ForecastEndpoint,
+            "batch_forecast": BatchForecastEndpoint,
+            "geo": GeoEndpoint,
         },
-        "OpenMeteoAPI": {
-            "class": OpenMeteoAPI,
-            "config": OpenMeteoConfig,
-            "endpoints": {
-                "forecast": ForecastEndpoint,
-                "geo": GeoEndpoint,
-            },
-            "commands": {"select_geo": SelectGeo},
-        },
-        # Add new APIs here
+        "commands": {"select_geo": SelectGeo, "autocomplete": Autocomplete},
     }
 
 
-def services():
+@cache
+def apis() -> LazyRegistry:
+    return LazyRegistry(
+        {
+            "WeatherAPI": _weather_api,
+            "OpenMeteoAPI": _open_meteo_api,
+            # Add new APIs here
+        },
+        group="offweather.apis",
+    )
+
+
+def _weather_service() -> dict:
     from src.core.service import WeatherService, WeatherProcessor, ServiceConfig
 
     return {
-        "WeatherService": {
-            "class": WeatherService,
-            "config": ServiceConfig,
-            "processors": [
-                WeatherProcessor,
-            ],
-        }
+        "class": WeatherService,
+        "config": ServiceConfig,
+        "processors": [
+            WeatherProcessor,
+        ],
     }
 
 
-def workflows():
-    from src.workflow import basis
+def _open_meteo_service() -> dict:
+    from src.open_meteo.service import (
+        OpenMeteoService,
+        OpenMeteoServiceConfig,
+        ForecastStorage,
+        ForecastArchive,
+    )
 
     return {
-        "basis": {"description": "Base workflow for weather data", "executable": basis}
+        "class": OpenMeteoService,
+        "config": OpenMeteoServiceConfig,
+        "processors": {
+            "ForecastStorage": ForecastStorage,
+            "ForecastArchive": ForecastArchive,
+        },
     }
+
+
+@cache
+def services() -> LazyRegistry:
+    return LazyRegistry(
+        {
+            "WeatherService": _weather_service,
+            "OpenMeteoService": _open_meteo_service,
+        },
+        group="offweather.services",
+    )
+
+
+def _basis() -> dict:
+    from src.workflow import basis
+
+    return {"description": "Base workflow for weather data", "executable": basis}
+
+
+@cache
+def workflows() -> LazyRegistry:
+    return LazyRegistry({"basis": _basis}, group="offweather.workflows")
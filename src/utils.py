@@ -1,4 +1,5 @@
-from typing import Union, get_args, get_origin
+from functools import lru_cache
+from typing import Callable, Union, get_args, get_origin
 from types import NoneType, UnionType
 from typing_extensions import Any
 
@@ -45,65 +46,147 @@ def safe_unwrap_union_type(union_type: type | UnionType, default_type: type) ->
         return default_type
 
 
-def unwrap_and_cast[T](target_type: type[T], value) -> T:
-    """Cast value to target_type. Supports Union[T, None], containers (list, tuple, dict) and Pydantic models."""
+def _missing(value):
+    raise ValueError("Cannot unwrap None value")
 
-    if value is None:
-        raise ValueError("Cannot unwrap None value")
 
-    origin = get_origin(target_type)
-    if origin is Union:
-        args = [arg for arg in get_args(target_type) if arg is not type(None)]
-        if len(args) == 1:
-            target_type = args[0]
-            origin = get_origin(target_type)
-        else:
-            raise ValueError(f"Union {target_type} слишком сложный")
+def _simple(target_type) -> Callable[[Any], Any]:
+    def convert(value):
+        if value is None:
+            _missing(value)
+        try:
+            return target_type(value)
+        except Exception as e:
+            raise ValueError(f"Cannot cast {value!r} to {target_type}: {e}")
 
-    # ---- Containers ----
-    if origin is list:
-        (elem_type,) = get_args(target_type)
-        return [unwrap_and_cast(elem_type, v) for v in value]  # type: ignore
+    return convert
 
-    if origin is tuple:
-        elem_types = get_args(target_type)
-        if len(elem_types) == len(value):
-            return tuple(unwrap_and_cast(t, v) for t, v in zip(elem_types, value))  # type: ignore
-        else:
+
+def _list(element_type) -> Callable[[Any], Any]:
+    element = compile_converter(element_type)
+
+    if element_type in (int, float):
+        # Builtins reject None themselves: convert in C, redo per element only for the error
+        def convert_numbers(value):
+            if value is None:
+                _missing(value)
+            try:
+                return list(map(element_type, value))
+            except Exception:
+                return [element(v) for v in value]
+
+        return convert_numbers
+
+    def convert(value):
+        if value is None:
+            _missing(value)
+        return [element(v) for v in value]
+
+    return convert
+
+
+def _tuple(element_types: tuple) -> Callable[[Any], Any]:
+    if len(element_types) == 2 and element_types[1] is Ellipsis:
+        element = _list(element_types[0])
+        return lambda value: tuple(element(value))
+
+    elements = tuple(compile_converter(t) for t in element_types)
+
+    def convert(value):
+        if value is None:
+            _missing(value)
+        if len(elements) != len(value):
             raise ValueError(f"Tuple размер не совпадает: {value}")
+        return tuple([element(v) for element, v in zip(elements, value)])
 
-    if origin is dict:
-        key_type, val_type = get_args(target_type)
-        return {
-            unwrap_and_cast(key_type, k): unwrap_and_cast(val_type, v)
-            for k, v in value.items()
-        }  # type: ignore
+    return convert
 
-    # ---- Pydantic models ----
-    if inspect.isclass(target_type) and issubclass(target_type, BaseModel):
-        fields = list(target_type.model_fields.keys())
+
+def _dict(key_type, value_type) -> Callable[[Any], Any]:
+    key, item = compile_converter(key_type), compile_converter(value_type)
+
+    def convert(value):
+        if value is None:
+            _missing(value)
+        return {key(k): item(v) for k, v in value.items()}
+
+    return convert
+
+
+def _model(model: type[BaseModel]) -> Callable[[Any], Any]:
+    fields: list[tuple[str, Callable[[Any], Any]]] | None = None
+
+    def convert(value):
+        nonlocal fields
+        if value is None:
+            _missing(value)
 
         if isinstance(value, dict):
-            return target_type(**value)  # type: ignore
+            return model(**value)
 
         if isinstance(value, (list, tuple)):
+            if fields is None:
+                # Compiled on first use: models may refer to themselves
+                fields = [
+                    (name, compile_converter(field.annotation))
+                    for name, field in model.model_fields.items()
+                ]
             if len(value) != len(fields):
                 raise ValueError(
-                    f"{target_type.__name__} ожидает {len(fields)} полей, получено {len(value)}"
+                    f"{model.__name__} ожидает {len(fields)} полей, получено {len(value)}"
                 )
-            casted = {
-                f: unwrap_and_cast(target_type.model_fields[f].annotation, v)  # type: ignore
-                for f, v in zip(fields, value)
-            }
-            return target_type(**casted)  # type: ignore
+            return model(**{name: cast(v) for (name, cast), v in zip(fields, value)})
+
+        raise ValueError(f"Cannot cast {type(value)} to {model}")
 
-        raise ValueError(f"Cannot cast {type(value)} to {target_type}")
+    return convert
+
+
+def _compile(target_type) -> Callable[[Any], Any]:
+    """Inspect annotation once and build cast function specialised for it"""
+    origin = get_origin(target_type)
+    if origin is Union or isinstance(target_type, UnionType):
+        args = [arg for arg in get_args(target_type) if arg is not NoneType]
+        if len(args) != 1:
+
+            def complex_union(value):
+                if value is None:
+                    _missing(value)
+                raise ValueError(f"Union {target_type} слишком сложный")
+
+            return complex_union
+        return compile_converter(args[0])
+
+    # ---- Containers ----
+    if origin is list:
+        return _list(*get_args(target_type))
+    if origin is tuple:
+        return _tuple(get_args(target_type))
+    if origin is dict:
+        return _dict(*get_args(target_type))
+
+    # ---- Pydantic models ----
+    if inspect.isclass(target_type) and issubclass(target_type, BaseModel):
+        return _model(target_type)
 
     # ---- Simple type ----
+    return _simple(target_type)
+
+
+_compile_cached = lru_cache(maxsize=512)(_compile)
+
+
+def compile_converter[T](target_type: type[T]) -> Callable[[Any], T]:
+    """Cached cast function for target_type, see unwrap_and_cast for supported types"""
     try:
-        return target_type(value)  # type: ignore
-    except Exception as e:
-        raise ValueError(f"Cannot cast {value!r} to {target_type}: {e}")
+        return _compile_cached(target_type)
+    except TypeError:  # unhashable annotation, e.g. with Literal of a list
+        return _compile(target_type)
+
+
+def unwrap_and_cast[T](target_type: type[T], value) -> T:
+    """Cast value to target_type. Supports Union[T, None], containers (list, tuple, dict) and Pydantic models."""
+    return compile_converter(target_type)(value)
 
 
 def safe_cast[T](target_type: type[T], value: Any, default: Any = None) -> T | None:
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.core.api import WeatherAPI, WeatherEndpoint, ConfigAPI
+from src.errors import ResponseError
+from src.utils import classproperty
+
+
+class DummyAPI(WeatherAPI):
+    @classproperty
+    def name(cls) -> str:
+        return "WeatherAPI"
+
+    def __init__(self, config: ConfigAPI | None = None):
+        super().__init__(config)  # type: ignore
+
+    def check(self):
+        pass
+
+    def up(self):
+        pass
+
+
+class SlowEndpoint(WeatherEndpoint):
+    def __init__(self, api, barrier: threading.Barrier | None = None):
+        super().__init__(api)
+        self.barrier = barrier
+
+    def refresh(self):
+        if self.barrier is not None:
+            # Every endpoint waits for the others: passes only if they run concurrently
+            self.barrier.wait(timeout=5)
+        self.data = {"value": self.name}
+
+    def check(self):
+        pass
+
+
+class FailingEndpoint(SlowEndpoint):
+    def refresh(self):
+        super().refresh()
+        raise ResponseError("Network request failed: 500")
+
+
+class OtherEndpoint(SlowEndpoint):
+    pass
+
+
+class TestRefresh:
+    """Test cases for WeatherAPI.refresh"""
+
+    def test_sequential_refresh(self):
+        api = DummyAPI()
+        api.add(SlowEndpoint(api))
+        api.add(OtherEndpoint(api))
+
+        summary = api.refresh()
+        assert summary.ok
+        assert summary.results == {
+            "SlowEndpoint": {"value": "SlowEndpoint"},
+            "OtherEndpoint": {"value": "OtherEndpoint"},
+        }
+
+    def test_sequential_refresh_raises(self):
+        api = DummyAPI()
+        api.add(FailingEndpoint(api))
+
+        with pytest.raises(ResponseError):
+            api.refresh()
+
+    def test_parallel_refresh_runs_concurrently(self):
+        api = DummyAPI()
+        barrier = threading.Barrier(2)
+        api.add(SlowEndpoint(api, barrier))
+        api.add(OtherEndpoint(api, barrier))
+
+        summary = api.refresh(parallel=True)
+        assert summary.ok
+        assert set(summary.results) == {"SlowEndpoint", "OtherEndpoint"}
+
+    def test_parallel_refresh_collects_errors(self):
+        api = DummyAPI()
+        api.add(SlowEndpoint(api))
+        api.add(FailingEndpoint(api))
+
+        summary = api.refresh(parallel=True, workers=2)
+        assert not summary.ok
+        assert "SlowEndpoint" in summary.results
+        assert isinstance(summary.errors["FailingEndpoint"], ResponseError)
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_refresh_without_endpoints(self, parallel):
+        summary = DummyAPI().refresh(parallel=parallel)
+        assert summary.ok
+        assert summary.results == {}
+
+    def test_parallel_refresh_clamps_workers(self):
+        api = DummyAPI()
+        api.add(SlowEndpoint(api))
+
+        assert api.refresh(parallel=True, workers=0).ok
+
+
+class TestAsyncRefresh:
+    """Test cases for WeatherAPI.arefresh"""
+
+    def test_arefresh_gathers_endpoints(self):
+        api = DummyAPI()
+        barrier = threading.Barrier(2)
+        api.add(SlowEndpoint(api, barrier))
+        api.add(OtherEndpoint(api, barrier))
+
+        summary = asyncio.run(api.arefresh())
+        assert summary.ok
+        assert set(summary.results) == {"SlowEndpoint", "OtherEndpoint"}
+
+    def test_arefresh_collects_errors(self):
+        api = DummyAPI()
+        api.add(SlowEndpoint(api))
+        api.add(FailingEndpoint(api))
+
+        summary = asyncio.run(api.arefresh())
+        assert "SlowEndpoint" in summary.results
+        assert isinstance(summary.errors["FailingEndpoint"], ResponseError)
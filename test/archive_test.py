@@ -0,0 +1,68 @@
+from array import array
+
+import pytest
+
+from src.core.archive import TimeSeriesArchive
+from src.errors import DataBaseError
+
+
+class TestTimeSeriesArchive:
+    """Test cases for TimeSeriesArchive"""
+
+    def test_append_and_read(self, tmp_path):
+        archive = TimeSeriesArchive(str(tmp_path))
+
+        assert archive.append("loc", "t", [1, 2, 3], [1.5, 2.5, 3.5]) == 3
+        times, values = archive.read("loc", "t")
+        assert times.tolist() == [1, 2, 3]
+        assert values.tolist() == [1.5, 2.5, 3.5]
+
+        times, values = archive.read("loc", "t", start=2, end=3)
+        assert times.tolist() == [2]
+        assert values.tolist() == [2.5]
+
+    def test_append_only_newer(self, tmp_path):
+        archive = TimeSeriesArchive(str(tmp_path))
+        archive.append("loc", "t", [1, 2], [1.0, 2.0])
+
+        assert archive.append("loc", "t", [1, 2], [9.0, 9.0]) == 0
+        assert (
+            archive.append("loc", "t", array("q", [2, 3]), array("d", [9.0, 3.0])) == 1
+        )
+        assert archive.last_time("loc", "t") == 3
+        assert archive.read("loc", "t")[1].tolist() == [1.0, 2.0, 3.0]
+
+    def test_read_missing(self, tmp_path):
+        archive = TimeSeriesArchive(str(tmp_path))
+
+        times, values = archive.read("loc", "t")
+        assert len(times) == len(values) == 0
+        assert archive.last_time("loc", "t") is None
+        assert archive.variables("loc") == []
+
+    def test_variables(self, tmp_path):
+        archive = TimeSeriesArchive(str(tmp_path))
+        archive.append("loc", "b", [1], [1.0])
+        archive.append("loc", "a", [1], [1.0])
+
+        assert archive.variables("loc") == ["a", "b"]
+
+    def test_length_mismatch(self, tmp_path):
+        archive = TimeSeriesArchive(str(tmp_path))
+        with pytest.raises(DataBaseError):
+            archive.append("loc", "t", [1, 2], [1.0])
+
+    def test_interrupted_append_realigned(self, tmp_path):
+        archive = TimeSeriesArchive(str(tmp_path))
+        archive.append("loc", "t", [1, 2], [10.0, 20.0])
+
+        # Append interrupted after values were written: one orphan value
+        path = archive._path("loc", "t")
+        with open(path + archive.VALUES_SUFFIX, "ab") as file:
+            array("f", [99.0]).tofile(file)
+            file.write(b"\x00")
+
+        assert archive.append("loc", "t", [3, 4], [30.0, 40.0]) == 2
+        times, values = archive.read("loc", "t")
+        assert times.tolist() == [1, 2, 3, 4]
+        assert values.tolist() == [10.0, 20.0, 30.0, 40.0]
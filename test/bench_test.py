@@ -0,0 +1,60 @@
+import json
+
+from bench.suite import BENCHMARKS, compare, main, offline_api, run
+from src.open_meteo.forecast import ForecastEndpoint
+from src.models import Coordinates
+
+
+def results(**timings: float) -> dict:
+    return {"results": {name: {"min_ms": value} for name, value in timings.items()}}
+
+
+class TestSuite:
+    """Test cases for offline benchmark suite"""
+
+    def test_fixture_transport(self):
+        api = offline_api(coordinates=Coordinates(latitude=52.52, longitude=13.41))
+        endpoint = ForecastEndpoint(api)
+        endpoint.refresh()
+
+        assert len(endpoint.data["daily"]) == 16
+
+    def test_run(self):
+        report = run(["setting_fetch", "geo_refresh"], repeat=1)
+
+        assert set(report["results"]) == {"setting_fetch", "geo_refresh"}
+        assert report["results"]["geo_refresh"]["min_ms"] > 0
+        assert "python" in report["meta"]
+
+    def test_every_benchmark_is_registered(self):
+        assert {"forecast_refresh", "geo_refresh", "setting_save"} <= BENCHMARKS.keys()
+
+    def test_compare(self):
+        baseline = results(fast=1.0, slow=1.0, removed=1.0)
+        current = results(fast=1.1, slow=1.5, added=9.0)
+
+        regressions = compare(current, baseline, tolerance=0.25)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("slow")
+
+    def test_main_fails_on_regression(self, tmp_path):
+        baseline = results(setting_fetch=1e-9)
+        path = tmp_path / "baseline.json"
+        path.write_text(json.dumps(baseline))
+
+        output = tmp_path / "results.json"
+        code = main(
+            [
+                "--only",
+                "setting_fetch",
+                "--repeat",
+                "1",
+                "--output",
+                str(output),
+                "--baseline",
+                str(path),
+            ]
+        )
+
+        assert code == 1
+        assert "setting_fetch" in json.loads(output.read_text())["results"]
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import asyncio
+
+import requests
+
+from src.models import Coordinates
+from src.open_meteo.api import OpenMeteoAPI, OpenMeteoConfig, wait_revalidations
+from src.open_meteo.cache import CachePolicy
+from src.open_meteo.forecast import ForecastEndpoint
+from src.open_meteo.server import StandInConfig, StandInServer
+
+
+HOUR = 3600
+# 2025-01-01 00:00 UTC
+MIDNIGHT = 1_735_689_600
+
+
+def config(**kwargs):
+    fields = dict.fromkeys(
+        (
+            "geo_expire_after",
+            "forecast_expire_after",
+            "model_run_hours",
+            "stale_while_revalidate",
+        )
+    )
+    return SimpleNamespace(**{**fields, **kwargs})
+
+
+class TestCachePolicy:
+    """Test cases for CachePolicy"""
+
+    def test_from_config_keeps_defaults(self):
+        policy = CachePolicy.from_config(config(geo_expire_after=60))
+        assert policy.geo_expire_after == 60
+        assert policy.model_run_hours == 6
+        assert policy.stale_while_revalidate is True
+
+    def test_stale_while_revalidate_disabled(self):
+        policy = CachePolicy.from_config(config(stale_while_revalidate=0))
+        assert not policy.stale_while_revalidate
+
+    def test_model_run_alignment(self):
+        policy = CachePolicy(model_run_hours=6, model_run_delay=2 * HOUR)
+
+        # Run of 00:00 is published at 02:00, the next one at 08:00
+        now = MIDNIGHT + 3 * HOUR
+        assert policy.last_model_run(now) == MIDNIGHT + 2 * HOUR
+        assert policy.next_model_run(now) == MIDNIGHT + 8 * HOUR
+        assert policy.forecast_expiration(now) == 5 * HOUR
+        assert policy.forecast_fresh_since(now) == MIDNIGHT + 2 * HOUR
+
+        # Before publication the previous run is still the latest
+        now = MIDNIGHT + 1 * HOUR
+        assert policy.last_model_run(now) == MIDNIGHT - 4 * HOUR
+        assert policy.forecast_expiration(now) == 1 * HOUR
+
+    def test_fixed_forecast_expiration(self):
+        policy = CachePolicy(forecast_expire_after=600)
+
+        assert policy.forecast_expiration(MIDNIGHT) == 600
+        assert policy.forecast_fresh_since(MIDNIGHT) == MIDNIGHT - 600
+
+    def test_serves_stale(self):
+        assert CachePolicy().serves_stale(MIDNIGHT, now=MIDNIGHT + 10 * HOUR)
+
+        policy = CachePolicy(stale_while_revalidate=HOUR)
+        assert policy.serves_stale(MIDNIGHT, now=MIDNIGHT + HOUR - 1)
+        assert not policy.serves_stale(MIDNIGHT, now=MIDNIGHT + HOUR)
+        assert not CachePolicy(stale_while_revalidate=0).serves_stale(
+            MIDNIGHT, now=MIDNIGHT + 1
+        )
+
+
+def make_endpoint(url: str, **kwargs) -> ForecastEndpoint:
+    api = OpenMeteoAPI(
+        OpenMeteoConfig(
+            coordinates=Coordinates(latitude=52.52, longitude=13.41),
+            cache_backend="memory",
+            base_url=url,
+            **kwargs,
+        )
+    )
+    return ForecastEndpoint(api)
+
+
+def expire(endpoint: ForecastEndpoint):
+    """Mark cached forecast of endpoint as expired 10 s ago"""
+    session = endpoint.api.session
+    request = session.prepare_request(
+        requests.Request("GET", endpoint.url, params=endpoint.params())
+    )
+    key = session.cache.create_key(request)
+    cached = session.cache.get_response(key)
+    past = datetime.now(timezone.utc) - timedelta(seconds=10)
+    session.cache.save_response(cached, key, past)
+
+
+class TestAsyncCache:
+    """Test cases for async refresh through the HTTP cache"""
+
+    def test_async_reads_blocking_cache(self):
+        with StandInServer() as server:
+            endpoint = make_endpoint(server.url)
+            endpoint.refresh()
+            asyncio.run(endpoint.arefresh())
+
+            assert server.stats["served"] == 1
+            assert "daily" in endpoint.data
+
+    def test_blocking_reads_async_cache(self):
+        with StandInServer() as server:
+            endpoint = make_endpoint(server.url)
+            asyncio.run(endpoint.arefresh())
+            endpoint.refresh()
+            asyncio.run(endpoint.arefresh())
+
+            assert server.stats["served"] == 1
+
+    def test_stale_while_revalidate(self):
+        with StandInServer() as server:
+            endpoint = make_endpoint(server.url)
+            endpoint.refresh()
+
+            # Revalidation outlives the loop of every refresh
+            for served in (2, 3, 4):
+                expire(endpoint)
+                asyncio.run(endpoint.arefresh())
+                assert wait_revalidations(timeout=5)
+                assert server.stats["served"] == served
+
+            # Revalidated response is fresh
+            asyncio.run(endpoint.arefresh())
+            assert server.stats["served"] == 4
+
+    def test_stale_if_error(self):
+        with StandInServer(StandInConfig(error_status=500)) as server:
+            endpoint = make_endpoint(server.url, stale_while_revalidate=0)
+            endpoint.refresh()
+            expire(endpoint)
+            current = endpoint.data["current"]
+
+            server.config.error_rate = 1.0
+            asyncio.run(endpoint.arefresh())
+
+            assert server.stats["failed"] == 1
+            assert endpoint.data["current"] == current
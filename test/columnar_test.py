@@ -0,0 +1,130 @@
+import math
+
+import pytest
+
+from src.errors import ResponseError
+from src.open_meteo.columnar import (
+    CURRENT_FIELDS,
+    DailyColumns,
+    reduce,
+)
+from src.open_meteo.models import DailyWeather, WeatherCode
+
+
+def make_daily(days: int = 3, offset: float = 0.0) -> dict:
+    return {
+        "time": [1_700_000_000 + 86400 * i for i in range(days)],
+        "weather_code": [3] * days,
+        "temperature_2m_min": [offset + i for i in range(days)],
+        "temperature_2m_max": [offset + i + 10 for i in range(days)],
+    }
+
+
+class TestDailyColumns:
+    """Test cases for DailyColumns"""
+
+    def test_from_json(self):
+        columns = DailyColumns.from_json(make_daily())
+
+        assert len(columns) == 3
+        assert columns.time.typecode == "q"
+        assert list(columns.column("temperature_min")) == [0.0, 1.0, 2.0]
+        # Variables missing from response are filled with NaN
+        assert all(math.isnan(v) for v in columns.column("wind_speed_mean"))
+
+    def test_none_becomes_nan(self):
+        daily = make_daily()
+        daily["temperature_2m_min"][1] = None
+
+        columns = DailyColumns.from_json(daily)
+        assert math.isnan(columns.column("temperature_min")[1])
+        assert columns.min("temperature_min") == 0.0
+        assert columns.mean("temperature_min") == 1.0
+
+    def test_row(self):
+        daily = make_daily()
+        for variable in (
+            "temperature_2m_mean",
+            "apparent_temperature_min",
+            "apparent_temperature_max",
+            "apparent_temperature_mean",
+            "relative_humidity_2m_min",
+            "relative_humidity_2m_max",
+            "relative_humidity_2m_mean",
+            "wind_speed_10m_min",
+            "wind_speed_10m_max",
+            "wind_speed_10m_mean",
+            "wind_gusts_10m_min",
+            "wind_gusts_10m_max",
+            "wind_gusts_10m_mean",
+            "wind_direction_10m_dominant",
+        ):
+            daily[variable] = [1.0, 2.0, 3.0]
+
+        row = DailyColumns.from_json(daily).row(2)
+        assert isinstance(row, DailyWeather)
+        assert row.date == 1_700_000_000 + 86400 * 2
+        assert row.weather_code is WeatherCode.OVERCAST
+        assert row.temperature_max == 12.0
+
+    def test_reduce_across_locations(self):
+        frames = [DailyColumns.from_json(make_daily(offset=o)) for o in (0, 5)]
+
+        assert reduce(frames, "temperature_min", "min") == 0.0
+        assert reduce(frames, "temperature_max", "max") == 17.0
+        assert reduce(frames, "temperature_min", "mean") == 3.5
+
+    def test_reduce_unknown_operation(self):
+        with pytest.raises(ValueError):
+            reduce([DailyColumns.from_json(make_daily())], "temperature_min", "sum")
+
+
+class TestFromMany:
+    """Test cases for DailyColumns.from_many"""
+
+    def test_frames(self):
+        frames = DailyColumns.from_many([make_daily(2), make_daily(3, offset=5)])
+
+        assert len(frames) == 2
+        first, second = frames
+        assert len(first) == 2 and len(second) == 3
+        assert list(second.column("temperature_min")) == [5.0, 6.0, 7.0]
+        assert second.time[0] == 1_700_000_000
+
+    def test_length_mismatch(self):
+        daily = make_daily()
+        daily["temperature_2m_max"].pop()
+
+        with pytest.raises(ResponseError):
+            DailyColumns.from_many([make_daily(), daily])
+
+    def test_unknown_weather_code(self):
+        daily = make_daily()
+        daily["weather_code"][0] = 4
+
+        with pytest.raises(ResponseError):
+            DailyColumns.from_many([make_daily(), daily])
+
+    def test_missing_weather_code(self):
+        daily = make_daily()
+        daily["weather_code"][0] = None
+
+        (columns,) = DailyColumns.from_many([daily])
+        assert columns.weather_codes() == [
+            None,
+            WeatherCode.OVERCAST,
+            WeatherCode.OVERCAST,
+        ]
+
+    def test_weather(self):
+        columns = DailyColumns.from_json(make_daily())
+        current = {variable: 1.0 for variable in CURRENT_FIELDS.values()}
+        current["weather_code"] = 61
+
+        weather = columns.weather(current)
+        assert weather.current.weather_code is WeatherCode.RAIN_SLIGHT
+        assert [day.date for day in weather.daily] == list(columns.time)
+        assert weather.daily[1].temperature_max == 11.0
+
+        with pytest.raises(ResponseError):
+            columns.weather({})
@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import json
+from urllib.parse import urlencode
+
+import pytest
+
+from src.errors import ResponseError
+from src.models import Coordinates
+from src.open_meteo.api import OpenMeteoAPI, OpenMeteoConfig
+from src.open_meteo.forecast import BatchForecastEndpoint, ForecastEndpoint
+from src.open_meteo.server import StandInServer
+
+
+def make_endpoint(count: int, **kwargs) -> BatchForecastEndpoint:
+    api = SimpleNamespace(coordinates=None)
+    coordinates = [
+        Coordinates(latitude=50 + i / 100, longitude=-30 - i / 100)
+        for i in range(count)
+    ]
+    return BatchForecastEndpoint(api, coordinates, **kwargs)
+
+
+class TestBatchForecastEndpoint:
+    """Test cases for BatchForecastEndpoint"""
+
+    def test_default_coordinates_from_api(self):
+        coordinates = Coordinates(latitude=55.75, longitude=37.62)
+        endpoint = BatchForecastEndpoint(SimpleNamespace(coordinates=coordinates))
+        assert endpoint.coordinates == [coordinates]
+
+    def test_chunks_respect_url_length(self):
+        endpoint = make_endpoint(500, max_url_length=1500, max_locations=1000)
+        chunks = endpoint.chunks()
+
+        assert len(chunks) > 1
+        assert sum(len(chunk) for chunk in chunks) == 500
+        for chunk in chunks:
+            query = urlencode(endpoint.params(chunk), doseq=True)
+            assert len(endpoint.url) + 1 + len(query) <= 1500
+
+    def test_chunks_respect_max_locations(self):
+        endpoint = make_endpoint(25, max_locations=10)
+        assert [len(chunk) for chunk in endpoint.chunks()] == [10, 10, 5]
+
+    def test_demultiplex(self):
+        endpoint = make_endpoint(2)
+        chunk = endpoint.coordinates
+        payload = [
+            {"latitude": 0, "longitude": 0, "current": {"i": i}, "daily": {"time": [i]}}
+            for i in range(2)
+        ]
+
+        locations = endpoint._demultiplex(chunk, 200, json.dumps(payload).encode())
+        assert locations[(50.01, -30.01)]["current"] == {"i": 1}
+        assert list(locations[(50.01, -30.01)]["daily"].time) == [1]
+
+    def test_demultiplex_single_location(self):
+        endpoint = make_endpoint(1)
+        locations = endpoint._demultiplex(
+            endpoint.coordinates, 200, b'{"latitude": 0, "longitude": 0}'
+        )
+        assert list(locations) == [(50.0, -30.0)]
+
+    def test_demultiplex_length_mismatch(self):
+        endpoint = make_endpoint(3)
+        with pytest.raises(ResponseError):
+            endpoint._demultiplex(
+                endpoint.coordinates, 200, b'[{"latitude": 0, "longitude": 0}]'
+            )
+
+    def test_demultiplex_failed_request(self):
+        endpoint = make_endpoint(1)
+        with pytest.raises(ResponseError):
+            endpoint._demultiplex(endpoint.coordinates, 429, b"{}")
+
+    def test_demultiplex_invalid_response(self):
+        endpoint = make_endpoint(1)
+        with pytest.raises(ResponseError):
+            endpoint._demultiplex(endpoint.coordinates, 200, b'{"error": true}')
+
+
+class TestNearestForecast:
+    """Test cases for forecasts served from nearest cached point"""
+
+    def test_served_data_is_copied(self):
+        with StandInServer() as server:
+            endpoints = [
+                ForecastEndpoint(
+                    OpenMeteoAPI(
+                        OpenMeteoConfig(
+                            coordinates=Coordinates(latitude=61.5, longitude=longitude),
+                            cache_backend="memory",
+                            base_url=server.url,
+                            tolerance=5,
+                        )
+                    )
+                )
+                for longitude in (23.1, 23.11, 23.12)
+            ]
+            for endpoint in endpoints:
+                endpoint.refresh()
+
+            assert server.stats["served"] == 1
+
+        first, second, third = endpoints
+        temperature = first.data["current"]["temperature_2m"]
+        second.data["current"]["temperature_2m"] = -100.0
+        second.data["daily"].columns["temperature_min"][0] = -100.0
+
+        assert first.data["current"]["temperature_2m"] == temperature
+        assert third.data["current"]["temperature_2m"] == temperature
+        assert third.data["daily"].column("temperature_min")[0] != -100.0
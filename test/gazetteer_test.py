@@ -0,0 +1,99 @@
+import pytest
+
+from src.errors import SettingError
+from src.open_meteo.gazetteer import Gazetteer
+
+
+def geonames_line(id, name, asciiname, country, population, lat=1.0, lon=2.0):
+    columns = [""] * 19
+    columns[0] = str(id)
+    columns[1] = name
+    columns[2] = asciiname
+    columns[4] = str(lat)
+    columns[5] = str(lon)
+    columns[6] = "P"
+    columns[7] = "PPL"
+    columns[8] = country
+    columns[14] = str(population)
+    columns[16] = "150"
+    columns[17] = "Europe/Berlin"
+    return "\t".join(columns) + "\n"
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    dump = tmp_path / "cities.txt"
+    dump.write_text(
+        geonames_line(2867714, "München", "Muenchen", "DE", 1260391, 48.14, 11.58)
+        + geonames_line(524901, "Moscow", "Moscow", "RU", 10381222, 55.75, 37.62)
+        + geonames_line(5202009, "Moscow", "Moscow", "US", 2500)
+        + geonames_line(2950159, "Berlin", "Berlin", "DE", 3426354)
+        + "broken line\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "countryInfo.txt").write_text(
+        "#ISO\tISO3\tISO-Numeric\tfips\tCountry\n"
+        "DE\tDEU\t276\tGM\tGermany\n"
+        "RU\tRUS\t643\tRS\tRussia\n",
+        encoding="utf-8",
+    )
+    return Gazetteer.build(str(dump), str(tmp_path / "index"))
+
+
+class TestGazetteer:
+    """Test cases for offline Gazetteer"""
+
+    def test_get_by_id(self, gazetteer):
+        result = gazetteer.get(2867714)
+        assert result is not None
+        assert result.name == "München"
+        assert result.latitude == 48.14
+        assert result.country_code == "DE"
+        assert result.country == "Germany"
+        assert result.population == 1260391
+
+        assert gazetteer.get(1) is None
+
+    def test_prefix_search_orders_by_population(self, gazetteer):
+        results = gazetteer.search("mos")
+        assert [r.id for r in results] == [524901, 5202009]
+
+        assert [r.id for r in gazetteer.search("Mos", limit=1)] == [524901]
+
+    def test_search_ascii_name_and_country(self, gazetteer):
+        assert [r.id for r in gazetteer.search("muen")] == [2867714]
+        assert [r.id for r in gazetteer.search("mosc", country_code="us")] == [5202009]
+        assert gazetteer.search("xyz") == []
+        assert gazetteer.search("") == []
+
+    def test_short_prefix(self, gazetteer):
+        assert [r.id for r in gazetteer.search("m")] == [524901, 2867714, 5202009]
+        assert [r.id for r in gazetteer.search("M", country_code="us")] == [5202009]
+        assert [r.id for r in gazetteer.search("b", limit=1)] == [2950159]
+        # Country without name in countryInfo.txt
+        assert gazetteer.search("mo", country_code="US")[0].country is None
+
+    def test_short_prefix_beyond_top(self, tmp_path):
+        dump = tmp_path / "cities.txt"
+        dump.write_text(
+            "".join(
+                geonames_line(index, f"Sa{index}", f"Sa{index}", "FR", 1000 + index)
+                for index in range(1, 41)
+            )
+            + geonames_line(100, "Sable", "Sable", "DE", 1),
+            encoding="utf-8",
+        )
+        gazetteer = Gazetteer.build(str(dump), str(tmp_path / "index"))
+
+        assert [r.id for r in gazetteer.search("s", limit=3)] == [40, 39, 38]
+        # Least populated place isn't among the top of the prefix
+        assert [r.id for r in gazetteer.search("sa", limit=50)][-1] == 100
+        assert [r.id for r in gazetteer.search("s", country_code="DE")] == [100]
+
+    def test_reopen(self, gazetteer):
+        reopened = Gazetteer(gazetteer.path)
+        assert reopened.get(2950159).name == "Berlin"  # type: ignore
+
+    def test_missing_index(self, tmp_path):
+        with pytest.raises(SettingError):
+            Gazetteer(str(tmp_path / "missing"))
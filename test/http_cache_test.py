@@ -0,0 +1,99 @@
+import pytest
+
+from src.core.cache import BoundedStorage, codec
+from src.errors import SettingError
+
+
+def make_storage(tmp_path, **kwargs) -> BoundedStorage:
+    return BoundedStorage(str(tmp_path / "cache.sqlite"), serializer=None, **kwargs)
+
+
+class TestCodec:
+    """Test cases for compression codecs"""
+
+    @pytest.mark.parametrize("name", [None, "none", "gzip"])
+    def test_roundtrip(self, name):
+        data = b"weather " * 100
+        selected = codec(name)
+        assert selected.decompress(selected.compress(data)) == data
+
+    def test_unknown(self):
+        with pytest.raises(SettingError):
+            codec("lz4")
+
+
+class TestBoundedStorage:
+    """Test cases for BoundedStorage"""
+
+    def test_set_get_delete(self, tmp_path):
+        storage = make_storage(tmp_path, compression="gzip")
+        storage["a"] = b"x" * 1000
+
+        assert storage["a"] == b"x" * 1000
+        assert len(storage) == 1
+        assert list(storage) == ["a"]
+
+        stats = storage.stats()
+        assert stats["hits"] == 1
+        assert stats["bytes"] < stats["raw_bytes"]
+
+        del storage["a"]
+        assert storage.size == 0
+        with pytest.raises(KeyError):
+            storage["a"]
+        assert storage.stats()["misses"] == 1
+
+    def test_lru_eviction(self, tmp_path):
+        storage = make_storage(tmp_path)
+        storage["a"] = b"1" * 400
+        storage["b"] = b"2" * 400
+        budget = storage.size + 100
+        storage.max_bytes = budget
+
+        storage["a"]  # "b" becomes least recently used
+        storage["c"] = b"3" * 400
+
+        assert set(storage) == {"a", "c"}
+        assert storage.size <= budget
+        assert storage.stats()["evictions"] == 1
+
+    def test_lfu_eviction(self, tmp_path):
+        storage = make_storage(tmp_path, eviction="lfu")
+        storage["a"] = b"1" * 400
+        storage["b"] = b"2" * 400
+        storage.max_bytes = storage.size + 100
+
+        storage["a"]
+        storage["a"]
+        storage["b"]
+        storage["c"] = b"3" * 400  # new entry has no hits and goes first
+
+        assert set(storage) == {"a", "b"}
+
+    def test_size_survives_reopen(self, tmp_path):
+        storage = make_storage(tmp_path)
+        storage["a"] = b"1" * 400
+        size = storage.size
+        storage.close()
+
+        assert make_storage(tmp_path).size == size
+
+    def test_unknown_eviction(self, tmp_path):
+        with pytest.raises(SettingError):
+            make_storage(tmp_path, eviction="random")
+
+    def test_hit_defers_access_write(self, tmp_path):
+        storage = make_storage(tmp_path)
+        storage["a"] = b"1" * 10
+        assert storage._connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+        changes = storage._connection.total_changes
+        storage["a"]
+        storage["a"]
+        assert storage._connection.total_changes == changes
+
+        storage.flush_access()
+        hits = storage._connection.execute(
+            "SELECT hits FROM responses WHERE key = 'a'"
+        ).fetchone()[0]
+        assert hits == 2
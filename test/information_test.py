@@ -27,3 +27,28 @@ def test_open_meteo_api():
     open_meteo = api_info["OpenMeteoAPI"]
     assert open_meteo["class"] == OpenMeteoAPI
     assert open_meteo["config"] == OpenMeteoConfig
+
+
+def test_apis_registry_is_memoized():
+    """Test that registry is built once per process."""
+    assert apis() is apis()
+
+
+def test_registry_loads_lazily():
+    """Test that entries are loaded on first access only once."""
+    from src.static import LazyRegistry
+
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"class": object, "config": object}
+
+    registry = LazyRegistry({"Lazy": loader}, group="offweather.tests")
+    assert "Lazy" in registry
+    assert calls == []
+
+    assert registry["Lazy"]["class"] is object
+    assert registry["Lazy"] is registry["Lazy"]
+    assert calls == [1]
+    assert list(registry) == ["Lazy"]
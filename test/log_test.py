@@ -0,0 +1,64 @@
+from loguru import logger
+
+from src.log import LogConfig, configure, sampled
+
+
+class Rendered:
+    """Counts how often it was formatted into a message"""
+
+    count = 0
+
+    def __str__(self):
+        Rendered.count += 1
+        return "rendered"
+
+
+class TestSampled:
+    """Test cases for sampled logger"""
+
+    def test_every_nth_call_of_line(self):
+        messages = []
+        handler = logger.add(messages.append, format="{message}")
+        try:
+            for index in range(10):
+                sampled(4).info("event {}", index)
+            sampled(4).info("other line")
+        finally:
+            logger.remove(handler)
+
+        assert [m.strip() for m in messages] == [
+            "event 0",
+            "event 4",
+            "event 8",
+            "other line",
+        ]
+
+    def test_dropped_calls_not_formatted(self):
+        handler = logger.add(lambda _: None)
+        Rendered.count = 0
+        try:
+            for _ in range(100):
+                sampled(50).opt(lazy=True).debug("value {}", lambda: Rendered())
+        finally:
+            logger.remove(handler)
+
+        assert Rendered.count == 2
+
+
+class TestConfigure:
+    """Test cases for file sink of application log"""
+
+    def test_enqueued_rotating_sink(self, tmp_path):
+        path = tmp_path / "debug.log"
+        handler = configure(LogConfig(path=str(path), rotation=1000, retention=2))
+        try:
+            for index in range(100):
+                logger.bind(test=True).info("line {} {}", index, "x" * 40)
+            logger.complete()
+        finally:
+            logger.remove(handler)
+
+        files = sorted(tmp_path.iterdir())
+        assert 1 < len(files) <= 3
+        assert all(file.stat().st_size <= 1000 for file in files)
+        assert "line 99" in path.read_text()
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from src.core.metrics import Metric, MetricsRegistry, registry
+from src.models import Coordinates
+from src.open_meteo.api import OpenMeteoAPI, OpenMeteoConfig
+from src.open_meteo.forecast import ForecastEndpoint
+from src.open_meteo.server import StandInServer
+
+
+class TestRegistry:
+    """Test cases for MetricsRegistry"""
+
+    def test_counter(self):
+        metrics = MetricsRegistry()
+        counter = metrics.counter("requests", "Requests", ("status",))
+        counter.inc(status=200)
+        counter.inc(2, status=200)
+
+        assert counter.value(status=200) == 3
+        assert metrics.counter("requests", "Requests", ("status",)) is counter
+        with pytest.raises(ValueError):
+            counter.inc(code=200)
+
+    def test_histogram_summary(self):
+        histogram = MetricsRegistry().histogram("latency", "Latency", buckets=(1, 2, 4))
+        for value in (0.5, 1.5, 1.5, 3):
+            histogram.observe(value)
+
+        summary = histogram.summary()
+        assert summary["count"] == 4
+        assert summary["mean"] == 1.625
+        assert summary["p50"] == 2
+
+    def test_prometheus(self, tmp_path):
+        metrics = MetricsRegistry()
+        metrics.counter("hits", "Cache hits", ("endpoint",)).inc(endpoint='a"b')
+        metrics.histogram("latency", "Latency", buckets=(1,)).observe(0.5)
+
+        text = metrics.prometheus()
+        assert "# TYPE hits counter" in text
+        assert 'hits_total{endpoint="a\\"b"} 1' in text
+        assert 'latency_bucket{le="1.0"} 1' in text
+        assert 'latency_bucket{le="+Inf"} 1' in text
+        assert "latency_count 1" in text
+
+        path = tmp_path / "metrics.prom"
+        metrics.write(str(path))
+        assert path.read_text() == text
+
+
+class TestInstrumentation:
+    """Test cases for metrics recorded by API refresh"""
+
+    def test_refresh_records_cache_and_latency(self):
+        with StandInServer() as server:
+            api = OpenMeteoAPI(
+                OpenMeteoConfig(
+                    coordinates=Coordinates(latitude=52.52, longitude=13.41),
+                    cache_backend="memory",
+                    base_url=server.url,
+                )
+            )
+            api.add(ForecastEndpoint(api))
+            cache = registry.get("offweather_http_cache")
+            before = cache.value(endpoint="ForecastEndpoint", result="hit")
+
+            api.refresh()
+            api.refresh()
+
+        assert cache.value(endpoint="ForecastEndpoint", result="hit") == before + 1
+        refresh = registry.get("offweather_endpoint_refresh_seconds")
+        assert (
+            refresh.summary(api="OpenMeteoAPI", endpoint="ForecastEndpoint")["count"]
+            >= 2
+        )
+        assert registry.get("offweather_decode_seconds").series()
+
+    def test_async_refresh_records_cache_and_latency(self):
+        with StandInServer() as server:
+            api = OpenMeteoAPI(
+                OpenMeteoConfig(
+                    coordinates=Coordinates(latitude=48.85, longitude=2.35),
+                    cache_backend="memory",
+                    base_url=server.url,
+                )
+            )
+            api.add(ForecastEndpoint(api))
+            cache = registry.get("offweather_http_cache")
+            latency = registry.get("offweather_http_request_seconds")
+            labels = {"endpoint": "ForecastEndpoint"}
+            misses = cache.value(result="miss", **labels)
+            hits = cache.value(result="hit", **labels)
+            requests = latency.summary(**labels)["count"]
+
+            asyncio.run(api.arefresh())
+            asyncio.run(api.arefresh())
+
+        assert cache.value(result="miss", **labels) == misses + 1
+        assert cache.value(result="hit", **labels) == hits + 1
+        assert latency.summary(**labels)["count"] == requests + 1
+        responses = registry.get("offweather_http_responses")
+        assert responses.value(status=200, **labels) >= 2
+
+    def test_metric_is_abstract(self):
+        with pytest.raises(TypeError):
+            Metric("offweather_abstract", "Not a metric")  # type: ignore
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from src.core.pipeline import Pipeline, PipelineConfig
+from src.core.service import WeatherProcessor
+from src.errors import ProcessorError
+from test.api_test import DummyAPI, SlowEndpoint
+from test.service_test import DummyService
+
+
+class Step(WeatherProcessor):
+    def __init__(self, name: str, *after: WeatherProcessor, api=None, barrier=None):
+        super().__init__()
+        self.name = name
+        self.api = api
+        self.barrier = barrier
+        self.fail = False
+        self.runs = 0
+        self.saved: list = []
+        for processor in after:
+            self.associations = processor
+
+    def run(self):
+        if self.barrier is not None:
+            # Passes only if every processor of the barrier runs concurrently
+            self.barrier.wait(timeout=5)
+        if self.fail:
+            raise ProcessorError(f"{self.name} failed")
+        self.runs += 1
+        self.data.append(self.runs)
+
+    def save(self):
+        self.saved.extend(self.data)
+        self.data = []
+
+
+class TestPipeline:
+    """Test cases for running processors in order of associations"""
+
+    def test_stages_follow_associations(self):
+        source = Step("source")
+        left, right = Step("left", source), Step("right", source)
+        sink = Step("sink", left, right)
+
+        graph = Pipeline.graph([sink])
+        assert sorted(graph) == ["left", "right", "sink", "source"]
+        assert Pipeline.stages(graph) == [["source"], ["left", "right"], ["sink"]]
+
+    def test_cycle(self):
+        first = Step("first")
+        second = Step("second", first)
+        first.associations = second
+
+        with pytest.raises(ProcessorError, match="cycle"):
+            Pipeline().run([first])
+
+    def test_independent_processors_run_concurrently(self):
+        barrier = threading.Barrier(3)
+        steps = [Step(f"step{index}", barrier=barrier) for index in range(3)]
+
+        report = Pipeline(PipelineConfig(workers=3)).run(steps)
+        assert report.ok
+        assert report.stages == [["step0", "step1", "step2"]]
+        assert all(step.saved == [1] for step in steps)
+
+    def test_failure_stops_dependents(self):
+        source = Step("source")
+        broken = Step("broken", source)
+        sink = Step("sink", broken)
+        other = Step("other", source)
+        broken.fail = True
+
+        report = Pipeline().run([sink, other])
+        assert set(report.errors) == {"broken", "sink"}
+        assert other.runs == 1 and sink.runs == 0
+        with pytest.raises(ProcessorError, match="broken"):
+            report.raise_for_errors()
+
+    def test_unchanged_inputs_skipped(self):
+        api = DummyAPI()
+        endpoint = SlowEndpoint(api)
+        api.add(endpoint)
+        source = Step("source", api=api)
+        sink = Step("sink", source, api=api)
+        pipeline = Pipeline()
+
+        first = pipeline.run([sink])
+        assert first.skipped == []
+        assert first.timings["sink"].stage == 1
+
+        second = pipeline.run([sink])
+        assert second.skipped == ["source", "sink"]
+        assert source.runs == sink.runs == 1
+
+        endpoint.refresh()
+        third = pipeline.run([sink])
+        assert third.skipped == []
+        assert source.runs == sink.runs == 2
+
+    def test_processors_without_inputs_always_run(self):
+        step = Step("step")
+        pipeline = Pipeline()
+
+        pipeline.run([step])
+        pipeline.run([step])
+        assert step.runs == 2
+
+    def test_service_process(self):
+        service = DummyService()
+        source = Step("source")
+        service.add(source)
+        service.add(Step("sink", source))
+
+        report = service.process()
+        assert report.stages == [["source"], ["sink"]]
+        assert service.get("sink").saved == [1]
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+from src.core.scheduler import RefreshScheduler, SchedulerConfig
+from src.errors import ResponseError
+from src.models import Coordinates
+from src.open_meteo.cache import CachePolicy
+from test.api_test import DummyAPI, SlowEndpoint
+
+
+class Clock:
+    def __init__(self, now: float = 1_700_000_000):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingEndpoint(SlowEndpoint):
+    refreshes = 0
+
+    def refresh(self):
+        CountingEndpoint.refreshes += 1
+        self.data = {"value": self.api.coordinates.key}
+
+
+def api_at(latitude: float, longitude: float) -> DummyAPI:
+    api = DummyAPI()
+    api.coordinates = Coordinates(latitude=latitude, longitude=longitude)
+    api.cache_policy = CachePolicy()
+    api.add(CountingEndpoint(api))
+    return api
+
+
+@pytest.fixture(autouse=True)
+def reset_counter():
+    CountingEndpoint.refreshes = 0
+
+
+class TestRefreshScheduler:
+    """Test cases for RefreshScheduler"""
+
+    def test_next_run_after_model_run(self):
+        clock = Clock()
+        scheduler = RefreshScheduler(SchedulerConfig(jitter=120, seed=1), clock)
+        api = api_at(52.52, 13.41)
+        scheduler.add(api)
+
+        assert scheduler.run_pending() == 1
+        assert scheduler.run_pending() == 0
+
+        (state,) = scheduler.state()
+        published = api.cache_policy.next_model_run(clock.now)
+        assert published <= state.next_run <= published + 120
+        assert state.last_run == clock.now
+        assert state.runs == 1
+
+        clock.now = state.next_run
+        assert scheduler.run_pending() == 1
+        assert CountingEndpoint.refreshes == 2
+
+    def test_same_grid_cell_coalesced(self):
+        scheduler = RefreshScheduler(SchedulerConfig(grid=0.1), Clock())
+        first, second = api_at(52.52, 13.41), api_at(52.53, 13.42)
+        other = api_at(48.85, 2.35)
+
+        assert scheduler.add(first) == scheduler.add(second)
+        scheduler.add(other)
+        scheduler.run_pending()
+
+        assert CountingEndpoint.refreshes == 2
+        assert second.get("CountingEndpoint").data == {"value": "52.5200,13.4100"}
+        assert sorted(len(state.members) for state in scheduler.state()) == [1, 2]
+
+    def test_same_location_other_endpoints(self):
+        scheduler = RefreshScheduler(config=SchedulerConfig(), clock=Clock())
+        first, second = api_at(52.52, 13.41), api_at(52.52, 13.41)
+        second.add(SlowEndpoint(second))
+
+        assert scheduler.add(first) != scheduler.add(second)
+        assert len(scheduler.state()) == 2
+        assert scheduler.run_pending() == 2
+
+    def test_concurrency_cap(self):
+        running, peak = 0, 0
+        lock = threading.Lock()
+
+        class Blocking(SlowEndpoint):
+            def refresh(self):
+                nonlocal running, peak
+                with lock:
+                    running += 1
+                    peak = max(peak, running)
+                time.sleep(0.02)
+                with lock:
+                    running -= 1
+
+        scheduler = RefreshScheduler(SchedulerConfig(max_concurrent=2), Clock())
+        for index in range(6):
+            api = DummyAPI()
+            api.add(Blocking(api))
+            scheduler.add(api)
+
+        assert scheduler.run_pending() == 6
+        assert peak == 2
+
+    def test_failure_retried(self):
+        class Failing(SlowEndpoint):
+            def refresh(self):
+                raise ResponseError("Network request failed: 500")
+
+        clock = Clock()
+        scheduler = RefreshScheduler(SchedulerConfig(retry_after=60), clock)
+        api = DummyAPI()
+        api.add(Failing(api))
+        scheduler.add(api)
+        scheduler.run_pending()
+
+        (state,) = scheduler.state()
+        assert state.failures == 1
+        assert state.last_error == "Network request failed: 500"
+        assert state.next_run == clock.now + 60
+
+    def test_background_thread(self):
+        scheduler = RefreshScheduler(SchedulerConfig(max_sleep=0.01))
+        with scheduler:
+            scheduler.add(api_at(52.52, 13.41))
+            deadline = time.monotonic() + 5
+            while CountingEndpoint.refreshes == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert CountingEndpoint.refreshes == 1
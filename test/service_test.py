@@ -0,0 +1,148 @@
+import asyncio
+import os
+
+import pytest
+
+from src.core.api import WeatherEndpoint
+from src.core.service import WeatherService, ServiceConfig
+from src.errors import ResponseError, ServiceError
+from src.models import Coordinates
+from src.open_meteo.api import OpenMeteoAPI, OpenMeteoConfig
+from src.open_meteo.forecast import ForecastEndpoint
+from src.open_meteo.server import StandInServer
+from test.api_test import DummyAPI
+from test.sessions_test import loop_clients
+
+
+class DummyService(WeatherService):
+    def __init__(self):
+        super().__init__(ServiceConfig())
+
+
+class DelayedEndpoint(WeatherEndpoint):
+    def __init__(self, api, delay: float = 0.0, fail: bool = False):
+        super().__init__(api)
+        self.delay = delay
+        self.fail = fail
+        self.cancelled = False
+
+    def refresh(self):
+        asyncio.run(self.arefresh())
+
+    async def arefresh(self):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise ResponseError("Network request failed: 500")
+        self.data = {"value": self.delay}
+
+    def check(self):
+        pass
+
+
+def provider(service: WeatherService, name: str, **kwargs) -> DelayedEndpoint:
+    api = DummyAPI()
+    endpoint = DelayedEndpoint(api, **kwargs)
+    api.add(endpoint)
+    service.add_provider(api, endpoint.name, name)
+    return endpoint
+
+
+class TestFanout:
+    """Test cases for hedged requests of WeatherService providers"""
+
+    def test_fast_primary_without_hedge(self):
+        service = DummyService()
+        provider(service, "primary")
+        provider(service, "backup")
+
+        result = service.fetch(hedge_after=1)
+        assert result.provider == "primary"
+        assert result.started == ["primary"]
+        assert result.data == {"value": 0.0}
+
+    def test_hedge_wins_and_loser_cancelled(self):
+        service = DummyService()
+        slow = provider(service, "slow", delay=5)
+        provider(service, "fast", delay=0.01)
+
+        result = service.fetch(hedge_after=0.05)
+        assert result.provider == "fast"
+        assert result.started == ["slow", "fast"]
+        assert slow.cancelled
+        assert service.provider_stats["fast"].wins == 1
+
+    def test_failover(self):
+        service = DummyService()
+        provider(service, "broken", fail=True)
+        provider(service, "backup")
+
+        result = service.fetch(hedge_after=None)
+        assert result.provider == "backup"
+        assert list(result.errors) == ["broken"]
+        assert service.provider_stats["broken"].failures == 1
+
+    def test_all_fail(self):
+        service = DummyService()
+        provider(service, "first", fail=True)
+        provider(service, "second", fail=True)
+
+        with pytest.raises(ServiceError, match="All providers failed"):
+            service.fetch(hedge_after=0)
+
+    def test_timeout(self):
+        service = DummyService()
+        endpoint = provider(service, "slow", delay=5)
+
+        with pytest.raises(ServiceError, match="didn't respond"):
+            service.fetch(timeout=0.05)
+        assert endpoint.cancelled
+
+    def test_ranking_follows_latency(self):
+        service = DummyService()
+        provider(service, "slow", delay=0.2)
+        provider(service, "fast", delay=0.01)
+
+        service.fetch(hedge_after=0.05)
+        assert service.ranked_providers() == ["fast", "slow"]
+        assert service.fetch(hedge_after=1).started == ["fast"]
+
+    def test_duplicate_provider(self):
+        service = DummyService()
+        provider(service, "only")
+
+        with pytest.raises(ServiceError):
+            provider(service, "only")
+        service.delete_provider("only")
+        assert service.providers == {}
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs procfs")
+class TestBlockingFetch:
+    """Test cases for fetch on an event loop of its own"""
+
+    def test_async_clients_closed(self):
+        with StandInServer() as server:
+            service = DummyService()
+            for index in range(2):
+                api = OpenMeteoAPI(
+                    OpenMeteoConfig(
+                        coordinates=Coordinates(latitude=50 + index, longitude=10),
+                        cache_backend="memory",
+                        base_url=server.url,
+                    )
+                )
+                endpoint = ForecastEndpoint(api)
+                api.add(endpoint)
+                service.add_provider(api, endpoint.name, f"open-meteo-{index}")
+
+            service.fetch(hedge_after=0)  # warm up imports and pools
+            before = len(os.listdir("/proc/self/fd"))
+            for _ in range(20):
+                assert service.fetch(hedge_after=0).data["current"] is not None
+                assert loop_clients() == []
+
+            assert len(os.listdir("/proc/self/fd")) <= before + 2
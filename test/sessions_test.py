@@ -0,0 +1,125 @@
+import asyncio
+import os
+
+import pytest
+import requests
+
+from src.core.sessions import PoolConfig, SessionManager, sessions
+from src.models import Coordinates
+from src.open_meteo import api as open_meteo_api
+from src.open_meteo.api import OpenMeteoAPI, OpenMeteoConfig
+from src.open_meteo.forecast import ForecastEndpoint
+from src.open_meteo.server import StandInConfig, StandInServer
+
+
+def make_api(**config) -> OpenMeteoAPI:
+    return OpenMeteoAPI(
+        OpenMeteoConfig(
+            coordinates=Coordinates(latitude=52.52, longitude=13.41), **config
+        )
+    )
+
+
+class TestSessionManager:
+    """Test cases for process-wide connection pools"""
+
+    def test_adapter_shared_per_config(self):
+        first = make_api(cache_backend="memory")
+        second = make_api(cache_backend="memory")
+        tuned = make_api(cache_backend="memory", pool_size=4)
+
+        adapter = first.session.get_adapter("https://api.open-meteo.com")
+        assert second.session.get_adapter("https://api.open-meteo.com") is adapter
+        assert tuned.session.get_adapter("https://api.open-meteo.com") is not adapter
+        assert first.session.cache is not second.session.cache
+
+    def test_file_cache_shared(self, tmp_path):
+        path = str(tmp_path / "http_cache.sqlite")
+        first = make_api(cache_backend="sqlite", cache_path=path)
+        second = make_api(cache_backend="sqlite", cache_path=path)
+
+        assert first.session.cache is second.session.cache
+
+    def test_connections_reused_across_instances(self):
+        with StandInServer() as server:
+            config = PoolConfig(pool_maxsize=7)  # pools of this test only
+            for index in range(5):
+                api = make_api(cache_backend="memory", base_url=server.url, pool_size=7)
+                api.coordinates = Coordinates(latitude=50 + index, longitude=10)
+                ForecastEndpoint(api).refresh()
+
+            host = server.url
+            stats = sessions.stats()
+
+        pools = sessions.adapter(config).poolmanager.pools
+        (pool,) = [pools.get(key) for key in list(pools.keys())]
+        assert pool.num_connections == 1
+        assert stats[host]["opened"] >= 1
+
+    def test_default_timeout(self):
+        manager = SessionManager()
+        session = manager.mount(
+            requests.Session(), PoolConfig(read_timeout=0.05, retries=0)
+        )
+        with StandInServer(StandInConfig(latency=0.5)) as server:
+            with pytest.raises(requests.exceptions.RequestException):
+                session.get(f"{server.url}/v1/search", params={"name": "Berlin"})
+
+
+def open_descriptors() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def loop_clients() -> list:
+    """Async clients of caller loops, the background revalidation loop keeps its own"""
+    return [
+        loop
+        for loop in open_meteo_api._async_clients
+        if loop is not open_meteo_api._background
+    ]
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs procfs")
+class TestAsyncClient:
+    """Test cases for the shared async client of each event loop"""
+
+    def test_client_closed_with_loop(self):
+        with StandInServer() as server:
+            url = f"{server.url}/v1/search"
+
+            async def search():
+                client = open_meteo_api.async_client()
+                assert open_meteo_api.async_client() is client
+                response = await client.get(url, params={"name": "Berlin"})
+                assert response.status_code == 200
+                return client
+
+            asyncio.run(search())  # warm up imports and pools
+            before = open_descriptors()
+            clients = [asyncio.run(search()) for _ in range(20)]
+
+            assert all(client.is_closed for client in clients)
+            assert loop_clients() == []
+            assert open_descriptors() <= before + 2
+
+    def test_client_of_pool_config(self):
+        async def main():
+            api = make_api(cache_backend="memory", read_timeout=7.0, pool_size=3)
+            client = api.asession
+            assert client is open_meteo_api.async_client(api.pool_config)
+            assert client is not open_meteo_api.async_client()
+            assert client.timeout.read == 7.0
+            assert client.timeout.connect == api.pool_config.connect_timeout
+
+        asyncio.run(main())
+        assert loop_clients() == []
+
+    def test_explicit_close(self):
+        async def main():
+            client = open_meteo_api.async_client()
+            await open_meteo_api.aclose_async_client()
+            assert client.is_closed
+            assert open_meteo_api.async_client() is not client
+
+        asyncio.run(main())
+        assert loop_clients() == []
@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+
+import toml
+
+from src.open_meteo.api import OpenMeteoConfig
+from src.setting import Setting
+
+
+class TestWriteBehind:
+    """Test cases for debounced writes of Setting"""
+
+    def test_write_through_by_default(self, tmp_path):
+        path = tmp_path / "setting.toml"
+        setting = Setting(str(path))
+        setting.add("city", "Berlin")
+
+        assert toml.load(path) == {"city": "Berlin"}
+        assert os.listdir(tmp_path) == ["setting.toml"]
+
+    def test_changes_coalesced(self, tmp_path, monkeypatch):
+        path = tmp_path / "setting.toml"
+        setting = Setting(str(path), debounce=60)
+        writes = []
+        write = setting._write
+        monkeypatch.setattr(
+            setting, "_write", lambda data: writes.append(1) or write(data)
+        )
+
+        for index in range(20):
+            setting.update({f"key{index}": index})
+        config = OpenMeteoConfig(city="Berlin")
+        setting.save(config, ["open-meteo"])
+
+        assert toml.load(path) == {}
+        assert setting.fetch(OpenMeteoConfig, ["open-meteo"]).city == "Berlin"
+
+        setting.flush()
+        setting.flush()
+        assert len(writes) == 1
+        assert toml.load(path)["key19"] == 19
+
+    def test_debounce_window(self, tmp_path):
+        path = tmp_path / "setting.toml"
+        setting = Setting(str(path), debounce=0.01)
+        setting.add("city", "Berlin")
+
+        deadline = time.monotonic() + 5
+        while toml.load(path) == {} and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert toml.load(path) == {"city": "Berlin"}
+
+    def test_flush_waits_for_save(self, tmp_path, monkeypatch):
+        path = tmp_path / "setting.toml"
+        setting = Setting(str(path), debounce=60)
+        setting.add("city", "Berlin")
+        writing = threading.Event()
+        write = setting._write
+        monkeypatch.setattr(
+            setting, "_write", lambda data: writing.set() or write(data)
+        )
+        flusher = threading.Thread(target=setting.flush)
+        written_during_save = []
+
+        class Location:
+            city: str
+
+            @property
+            def city(self):
+                # Flush started in the middle of save
+                if flusher.ident is None:
+                    flusher.start()
+                    written_during_save.append(writing.wait(timeout=0.2))
+                return "Paris"
+
+        setting.save(Location(), ["location"])
+        flusher.join(timeout=5)
+
+        assert written_during_save == [False]
+        assert toml.load(path) == {"city": "Berlin", "location": {"city": "Paris"}}
+
+
+class TestCachedReads:
+    """Test cases for mtime and size cached reads of Setting"""
+
+    def test_unchanged_file_not_parsed(self, tmp_path, monkeypatch):
+        setting = Setting(str(tmp_path / "setting.toml"))
+        setting.add("city", "Berlin")
+
+        loads = []
+        monkeypatch.setattr(toml, "load", lambda file: loads.append(1) or {})
+        for _ in range(10):
+            assert setting.data == {"city": "Berlin"}
+        assert loads == []
+
+    def test_external_change_reloaded(self, tmp_path):
+        path = tmp_path / "setting.toml"
+        setting = Setting(str(path))
+        setting.add("city", "Berlin")
+
+        path.write_text('city = "Paris"\ncount = 3\n')
+        assert setting.data == {"city": "Paris", "count": 3}
+
+    def test_pending_changes_kept(self, tmp_path):
+        path = tmp_path / "setting.toml"
+        setting = Setting(str(path), debounce=60)
+        setting.add("city", "Berlin")
+
+        path.write_text('city = "Paris"\n')
+        assert setting.data == {"city": "Berlin"}
+        setting.flush()
+        assert toml.load(path) == {"city": "Berlin"}
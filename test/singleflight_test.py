@@ -0,0 +1,147 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core.singleflight import SingleFlight
+from src.core.transport import request_key
+from src.errors import ResponseError
+from src.models import Coordinates
+from src.open_meteo.api import OpenMeteoAPI, OpenMeteoConfig
+from src.open_meteo.forecast import ForecastEndpoint
+from src.open_meteo.server import StandInConfig, StandInServer
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight"""
+
+    def test_concurrent_calls_shared(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(timeout=5)
+            return {"value": 1}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(flights.do, "key", fetch) for _ in range(8)]
+            # Let followers reach the wait before the leader finishes
+            threading.Event().wait(0.05)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flights.do("key", lambda: 2) == 2
+
+    def test_error_shared(self):
+        flights = SingleFlight()
+        release = threading.Event()
+
+        def fetch():
+            release.wait(timeout=5)
+            raise ResponseError("Network request failed: 500")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(flights.do, "key", fetch) for _ in range(4)]
+            threading.Event().wait(0.05)
+            release.set()
+            for future in futures:
+                with pytest.raises(ResponseError):
+                    future.result()
+
+    def test_async_calls_shared(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def main():
+            return await asyncio.gather(*(flights.ado("key", fetch) for _ in range(5)))
+
+        assert asyncio.run(main()) == ["result"] * 5
+        assert len(calls) == 1
+
+    def test_cancelled_leader(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def main():
+            leader = asyncio.create_task(flights.ado("key", fetch))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(flights.ado("key", fetch))
+            await asyncio.sleep(0)
+            leader.cancel()
+
+            assert await follower == "result"
+            assert leader.cancelled()
+
+        asyncio.run(main())
+        assert len(calls) == 1
+
+    def test_all_callers_cancelled(self):
+        flights = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def main():
+            callers = [asyncio.create_task(flights.ado("key", fetch)) for _ in range(2)]
+            await asyncio.sleep(0)
+            for caller in callers:
+                caller.cancel()
+
+            await asyncio.wait_for(cancelled.wait(), timeout=1)
+            assert (
+                await flights.ado("key", lambda: asyncio.sleep(0, "again")) == "again"
+            )
+
+        asyncio.run(main())
+
+    def test_request_key_normalized(self):
+        url = "https://api.open-meteo.com/v1/forecast"
+        assert request_key("get", url, {"b": 1, "a": [2, 3]}) == request_key(
+            "GET", f"{url}?a=2&a=3", {"b": "1"}
+        )
+
+
+class TestCoalescedRefresh:
+    """Test cases for identical refreshes of several API instances"""
+
+    def test_one_upstream_request(self):
+        with StandInServer(StandInConfig(latency=0.2)) as server:
+            apis = []
+            for _ in range(5):
+                api = OpenMeteoAPI(
+                    OpenMeteoConfig(
+                        coordinates=Coordinates(latitude=52.52, longitude=13.41),
+                        cache_backend="memory",
+                        base_url=server.url,
+                    )
+                )
+                api.add(ForecastEndpoint(api))
+                apis.append(api)
+
+            with ThreadPoolExecutor(max_workers=5) as pool:
+                list(pool.map(lambda api: api.refresh(), apis))
+            served = server.stats["served"]
+
+        assert served == 1
+        data = [api.get("ForecastEndpoint").data for api in apis]
+        assert all(item["daily"] is data[0]["daily"] for item in data)
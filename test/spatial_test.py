@@ -0,0 +1,90 @@
+import pytest
+
+from src.core.spatial import SpatialIndex, haversine
+from src.models import Coordinates
+
+
+def point(latitude: float, longitude: float) -> Coordinates:
+    return Coordinates(latitude=latitude, longitude=longitude)
+
+
+class TestHaversine:
+    """Test cases for haversine distance"""
+
+    def test_known_distance(self):
+        # Moscow - Saint Petersburg is about 634 km
+        distance = haversine(point(55.7558, 37.6173), point(59.9343, 30.3351))
+        assert distance == pytest.approx(634, abs=5)
+
+    def test_zero_distance(self):
+        assert haversine(point(10, 10), point(10, 10)) == 0
+
+
+class TestSpatialIndex:
+    """Test cases for SpatialIndex"""
+
+    def test_nearest_within_tolerance(self):
+        index: SpatialIndex[str] = SpatialIndex()
+        index.insert(point(55.75, 37.62), "center")
+        index.insert(point(55.80, 37.62), "north")
+
+        found = index.nearest(point(55.751, 37.621), tolerance=5)
+        assert found is not None
+        coordinates, value, distance = found
+        assert value == "center"
+        assert coordinates == point(55.75, 37.62)
+        assert distance < 0.2
+
+        assert index.nearest(point(56.5, 37.62), tolerance=5) is None
+
+    def test_nearest_across_cells(self):
+        index: SpatialIndex[str] = SpatialIndex(cell=0.1)
+        index.insert(point(0.099, 0.099), "a")
+
+        found = index.nearest(point(0.101, 0.101), tolerance=1)
+        assert found is not None and found[1] == "a"
+
+    def test_nearest_across_antimeridian(self):
+        index: SpatialIndex[str] = SpatialIndex()
+        index.insert(point(0, 179.99), "east")
+
+        found = index.nearest(point(0, -179.99), tolerance=5)
+        assert found is not None and found[1] == "east"
+
+    def test_nearest_at_high_latitude(self):
+        index: SpatialIndex[str] = SpatialIndex()
+        # At 85° one degree of longitude is under 10 km
+        index.insert(point(85, 10), "far")
+
+        found = index.nearest(point(85, 11), tolerance=15)
+        assert found is not None and found[1] == "far"
+
+    def test_where_filter(self):
+        index: SpatialIndex[int] = SpatialIndex()
+        index.insert(point(1, 1), 1)
+        index.insert(point(1, 1.01), 2)
+
+        found = index.nearest(point(1, 1), tolerance=5, where=lambda v: v > 1)
+        assert found is not None and found[1] == 2
+
+    def test_insert_replaces_and_remove(self):
+        index: SpatialIndex[int] = SpatialIndex()
+        index.insert(point(1, 1), 1)
+        index.insert(point(1, 1), 2)
+        assert len(index) == 1
+
+        index.remove(point(1, 1))
+        assert len(index) == 0
+        assert index.nearest(point(1, 1), tolerance=1) is None
+
+    def test_max_size_drops_oldest(self):
+        index: SpatialIndex[int] = SpatialIndex(max_size=2)
+        index.insert(point(1, 1), 1)
+        index.insert(point(2, 2), 2)
+        index.insert(point(1, 1), 3)  # inserted again: newest
+        index.insert(point(3, 3), 4)
+
+        assert len(index) == 2
+        assert index.nearest(point(2, 2), tolerance=1) is None
+        found = index.nearest(point(1, 1), tolerance=1)
+        assert found is not None and found[1] == 3
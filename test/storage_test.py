@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import math
+import sqlite3
+
+import pytest
+
+from src.core.storage import SQLiteStore
+from src.errors import DataBaseError
+from src.models import Coordinates
+from src.open_meteo.columnar import DailyColumns
+from src.open_meteo.service import ForecastStorage
+
+
+def make_data(offset: float = 0.0) -> dict:
+    daily = {
+        "time": [1_700_000_000, 1_700_086_400],
+        "weather_code": [1, 2],
+        "temperature_2m_min": [offset, None],
+    }
+    return {
+        "current": {"time": 1_700_000_100, "interval": 900, "temperature_2m": 5.5},
+        "daily": DailyColumns.from_json(daily),
+    }
+
+
+class TestSQLiteStore:
+    """Test cases for SQLiteStore"""
+
+    def test_write_and_read(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "db" / "weather.db"))
+        rows = [("a", "t", 2, 2.0), ("a", "t", 1, 1.0), ("b", "t", 1, 3.0)]
+
+        assert store.write(rows) == 3
+        assert store.read_variable("a", "t") == [(1, 1.0), (2, 2.0)]
+        assert store.read_variable("a", "t", start=2) == [(2, 2.0)]
+        assert sorted(store.locations()) == ["a", "b"]
+
+        # Same key replaces value
+        store.write([("a", "t", 1, 10.0)])
+        assert store.read_variable("a", "t", end=2) == [(1, 10.0)]
+
+    def test_series_replace_written_range(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "weather.db"))
+        store.write_series([("a", "t", [1, 2, 4], [1.0, 2.0, 4.0])])
+
+        # Stored points before and after written range are kept
+        assert store.write_series([("a", "t", [2, 3], [20.0, 30.0])]) == 2
+        assert store.read_variable("a", "t") == [
+            (1, 1.0),
+            (2, 20.0),
+            (3, 30.0),
+            (4, 4.0),
+        ]
+
+        store.write_series([("a", "t", [0, 5], [0.0, 50.0])])
+        assert store.read_variable("a", "t") == [(0, 0.0), (5, 50.0)]
+
+    def test_series_length_mismatch(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "weather.db"))
+
+        with pytest.raises(DataBaseError):
+            store.write_series([("a", "t", [1, 2], [1.0])])
+        assert store.locations() == []
+
+    def test_migrate_value_rows(self, tmp_path):
+        path = str(tmp_path / "weather.db")
+        with sqlite3.connect(path) as connection:
+            connection.execute(
+                "CREATE TABLE forecast (location_id TEXT, variable TEXT, time INTEGER, value REAL)"
+            )
+            connection.executemany(
+                "INSERT INTO forecast VALUES (?, ?, ?, ?)",
+                [("a", "t", 2, 2.0), ("a", "t", 1, 1.0), ("b", "u", 1, 3.0)],
+            )
+
+        store = SQLiteStore(path)
+        assert store.read_variable("a", "t") == [(1, 1.0), (2, 2.0)]
+        assert store.read("b") == [("u", 1, 3.0)]
+        assert SQLiteStore(path).locations() == ["a", "b"]
+
+
+class TestForecastStorage:
+    """Test cases for ForecastStorage processor"""
+
+    def test_roundtrip(self, tmp_path):
+        coordinates = Coordinates(latitude=55.75, longitude=37.62)
+        api = SimpleNamespace(
+            id=None,
+            coordinates=coordinates,
+            endpoints={
+                "forecast": SimpleNamespace(data=make_data()),
+                "batch": SimpleNamespace(
+                    data={"locations": {(10.0, 20.0): make_data(offset=7.0)}}
+                ),
+            },
+        )
+        processor = ForecastStorage(api=api, database=str(tmp_path / "weather.db"))
+
+        processor.run()
+        processor.save()
+        assert processor.data == []
+
+        current, daily = processor.load(coordinates.key)
+        assert current == {"time": 1_700_000_100, "temperature_2m": 5.5}
+        assert list(daily.time) == [1_700_000_000, 1_700_086_400]
+        assert list(daily.column("weather_code")) == [1.0, 2.0]
+        assert daily.column("temperature_min")[0] == 0.0
+        assert math.isnan(daily.column("temperature_min")[1])
+
+        _, daily = processor.load(Coordinates(latitude=10, longitude=20).key)
+        assert daily.column("temperature_min")[0] == 7.0
@@ -0,0 +1,140 @@
+import asyncio
+import json
+
+import pytest
+
+from src.core import tracing
+from src.core.api import WeatherEndpoint
+from src.errors import ResponseError
+from test.api_test import DummyAPI
+
+
+class TracedEndpoint(WeatherEndpoint):
+    def __init__(self, api):
+        super().__init__(api)
+
+    def refresh(self):
+        with tracing.span("request"):
+            self.data = {"value": self.name}
+
+    async def arefresh(self):
+        await asyncio.sleep(0)
+        with tracing.span("request"):
+            self.data = {"value": self.name}
+
+    def check(self):
+        pass
+
+
+class OtherTracedEndpoint(TracedEndpoint):
+    pass
+
+
+@pytest.fixture
+def exporter():
+    exporter = tracing.RingBufferExporter()
+    tracing.exporters.append(exporter)
+    yield exporter
+    tracing.exporters.remove(exporter)
+
+
+def by_name(spans: list[tracing.Span]) -> dict[str, list[tracing.Span]]:
+    result: dict[str, list[tracing.Span]] = {}
+    for span in spans:
+        result.setdefault(span.name, []).append(span)
+    return result
+
+
+class TestSpan:
+    """Test cases for spans and exporters"""
+
+    def test_nested_spans(self, exporter):
+        with tracing.span("outer", kind="test") as outer:
+            with tracing.span("inner") as inner:
+                assert tracing.current_span() is inner
+        assert tracing.current_span() is None
+
+        assert exporter.spans() == [inner, outer]
+        assert inner.parent_id == outer.span_id
+        assert inner.trace_id == outer.trace_id
+        assert outer.parent_id is None
+        assert outer.attributes == {"kind": "test"}
+        assert outer.duration >= inner.duration
+
+    def test_error_recorded(self, exporter):
+        with pytest.raises(ResponseError):
+            with tracing.span("failing"):
+                raise ResponseError("Network request failed: 500")
+
+        (span,) = exporter.spans()
+        assert span.status == "error"
+        assert span.error == "ResponseError: Network request failed: 500"
+
+    def test_ring_buffer_capacity_and_slowest(self):
+        buffer = tracing.RingBufferExporter(capacity=3)
+        for index in range(5):
+            buffer.export(tracing.Span(f"s{index}", "t", f"{index}", None, 0, index))
+
+        assert [span.name for span in buffer.spans()] == ["s2", "s3", "s4"]
+        assert [span.name for span in buffer.slowest(2)] == ["s4", "s3"]
+
+    def test_json_lines(self, tmp_path):
+        path = tmp_path / "spans" / "trace.jsonl"
+        exporter = tracing.JsonLinesExporter(str(path))
+        tracing.exporters.append(exporter)
+        try:
+            with tracing.span("outer"):
+                with tracing.span("inner", city="Berlin"):
+                    pass
+        finally:
+            tracing.exporters.remove(exporter)
+
+        inner, outer = [json.loads(line) for line in path.read_text().splitlines()]
+        assert inner["parent_id"] == outer["span_id"]
+        assert inner["attributes"] == {"city": "Berlin"}
+
+
+class TestPropagation:
+    """Test cases for spans of API refresh and command dispatch"""
+
+    def test_parallel_refresh_keeps_parent(self, exporter):
+        api = DummyAPI()
+        api.add(TracedEndpoint(api))
+        api.add(OtherTracedEndpoint(api))
+
+        api.refresh(parallel=True)
+
+        spans = by_name(exporter.spans())
+        (root,) = spans["WeatherAPI.refresh"]
+        refreshes = spans["TracedEndpoint.refresh"]
+        assert len(refreshes) == 2
+        assert {span.parent_id for span in refreshes} == {root.span_id}
+        assert all(span.thread.startswith("WeatherAPI-refresh") for span in refreshes)
+        parents = {span.span_id for span in refreshes}
+        assert {span.parent_id for span in spans["request"]} == parents
+
+    def test_async_refresh_keeps_parent(self, exporter):
+        api = DummyAPI()
+        api.add(TracedEndpoint(api))
+        api.add(OtherTracedEndpoint(api))
+
+        asyncio.run(api.arefresh())
+
+        spans = by_name(exporter.spans())
+        (root,) = spans["WeatherAPI.arefresh"]
+        refreshes = spans["TracedEndpoint.arefresh"]
+        assert {span.parent_id for span in refreshes} == {root.span_id}
+        assert {span.trace_id for span in spans["request"]} == {root.trace_id}
+
+    def test_command_dispatch(self, exporter):
+        api = DummyAPI()
+        api.add(TracedEndpoint(api))
+        api.admin()
+
+        api.execute("data", "TracedEndpoint")
+
+        spans = by_name(exporter.spans())
+        (root,) = spans["WeatherAPI.execute"]
+        (command,) = spans["Data.execute"]
+        assert root.attributes == {"command": "data"}
+        assert command.parent_id == root.span_id
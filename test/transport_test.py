@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+from src.core.transport import normalize_url, rebase_url
+from src.errors import RequestError, ResponseError
+from src.models import Coordinates
+from src.open_meteo.api import OpenMeteoAPI, OpenMeteoConfig
+from src.open_meteo.forecast import BatchForecastEndpoint, ForecastEndpoint
+from src.open_meteo.geo import GeoEndpoint
+from src.open_meteo.server import StandInConfig, StandInServer
+
+BERLIN = Coordinates(latitude=52.52, longitude=13.41)
+
+
+@pytest.fixture
+def server():
+    with StandInServer(StandInConfig(days=5, seed=1)) as server:
+        yield server
+
+
+def make_api(base_url: str, **kwargs) -> OpenMeteoAPI:
+    return OpenMeteoAPI(
+        OpenMeteoConfig(
+            coordinates=BERLIN,
+            city="Berlin",
+            cache_backend="memory",
+            base_url=base_url,
+            **kwargs,
+        )
+    )
+
+
+class TestUrls:
+    """Test cases for URL helpers"""
+
+    def test_rebase_url(self):
+        url = "https://api.open-meteo.com/v1/forecast"
+        assert rebase_url(url, None) == url
+        assert rebase_url(url, "http://127.0.0.1:8080/") == (
+            "http://127.0.0.1:8080/v1/forecast"
+        )
+
+    def test_normalize_url(self):
+        assert normalize_url("http://h/p?b=2&a=1") == normalize_url(
+            "http://h/p?a=1&b=2"
+        )
+
+
+class TestStandInServer:
+    """Test cases for the local Open-Meteo stand-in"""
+
+    def test_forecast(self, server):
+        endpoint = ForecastEndpoint(make_api(server.url))
+        endpoint.refresh()
+
+        assert len(endpoint.data["daily"]) == 5
+        assert "temperature_2m" in endpoint.data["current"]
+
+    def test_batch_forecast(self, server):
+        api = make_api(server.url)
+        coordinates = [Coordinates(latitude=50 + i, longitude=10) for i in range(3)]
+        endpoint = BatchForecastEndpoint(api, coordinates)
+        endpoint.refresh()
+
+        assert len(endpoint.data["locations"]) == 3
+
+    def test_search(self, server):
+        endpoint = GeoEndpoint(make_api(server.url))
+        endpoint.refresh()
+
+        results = endpoint.data["DataGeoEndpointList"].results
+        assert len(results) == 10
+        assert results[0].name == "Berlin"
+
+    def test_errors(self):
+        with StandInServer(StandInConfig(error_rate=1.0)) as server:
+            endpoint = ForecastEndpoint(make_api(server.url))
+            with pytest.raises(ResponseError):
+                endpoint.refresh()
+            assert server.stats["failed"] == 1
+
+
+class TestRecordReplay:
+    """Test cases for RecordReplayAdapter"""
+
+    def test_replay_after_server_stopped(self, server, tmp_path):
+        url = server.url
+        recorder = ForecastEndpoint(
+            make_api(url, transport="record", transport_path=str(tmp_path))
+        )
+        recorder.refresh()
+        server.stop()
+
+        player = ForecastEndpoint(
+            make_api(url, transport="replay", transport_path=str(tmp_path))
+        )
+        player.refresh()
+        assert list(player.data["daily"].time) == list(recorder.data["daily"].time)
+
+    def test_replay_miss(self, tmp_path):
+        endpoint = ForecastEndpoint(
+            make_api(
+                "http://127.0.0.1:9", transport="replay", transport_path=str(tmp_path)
+            )
+        )
+        with pytest.raises(RequestError):
+            endpoint.refresh()
+
+    def test_pool_settings(self, tmp_path):
+        api = make_api(
+            "http://127.0.0.1:9",
+            transport="record",
+            transport_path=str(tmp_path),
+            pool_size=3,
+            read_timeout=7.0,
+        )
+        adapter = api.session.get_adapter("http://127.0.0.1:9")
+
+        assert adapter is api.transport
+        assert adapter.pool_config.pool_maxsize == 3
+        assert adapter.pool_config.read_timeout == 7.0
+        assert adapter.max_retries.total == adapter.pool_config.retries
+        # Instances with equal settings share pools of one transport
+        other = make_api(
+            "http://127.0.0.1:9",
+            transport="record",
+            transport_path=str(tmp_path),
+            pool_size=3,
+            read_timeout=7.0,
+        )
+        assert other.transport is adapter
+
+    def test_async_replay_after_server_stopped(self, server, tmp_path):
+        url = server.url
+        recorder = ForecastEndpoint(
+            make_api(url, transport="record", transport_path=str(tmp_path))
+        )
+        asyncio.run(recorder.arefresh())
+        server.stop()
+
+        player = ForecastEndpoint(
+            make_api(url, transport="replay", transport_path=str(tmp_path))
+        )
+        asyncio.run(player.arefresh())
+        assert list(player.data["daily"].time) == list(recorder.data["daily"].time)
+
+    def test_async_replay_miss(self, server, tmp_path):
+        endpoint = ForecastEndpoint(
+            make_api(server.url, transport="replay", transport_path=str(tmp_path))
+        )
+        with pytest.raises(RequestError):
+            asyncio.run(endpoint.arefresh())
+        assert server.stats["served"] == 0
@@ -1,4 +1,6 @@
+from src.models import Coordinates
 from src.utils import (
+    compile_converter,
     unwrap_and_cast,
     safe_cast,
     safe_unwrap_union_type,
@@ -84,6 +86,44 @@ class TestUnwrapAndCast:
         assert result == 1
 
 
+class TestCompileConverter:
+    """Test cases for compile_converter function"""
+
+    def test_converter_is_cached(self):
+        """Test that equal annotations share one compiled converter"""
+        assert compile_converter(list[int]) is compile_converter(list[int])
+        assert compile_converter(dict[str, list[float]])({"a": ["1"]}) == {"a": [1.0]}
+
+    def test_number_list_errors(self):
+        """Test that fast path of number lists reports failing element"""
+        assert compile_converter(list[int])(["1", 2, 3.0]) == [1, 2, 3]
+        with pytest.raises(ValueError, match=r"Cannot cast 'x'"):
+            compile_converter(list[int])(["1", "x"])
+        with pytest.raises(ValueError, match="Cannot unwrap None value"):
+            compile_converter(list[float])([1, None])
+
+    def test_unions_and_tuples(self):
+        """Test optional unions and tuple forms"""
+        assert compile_converter(int | None)("5") == 5
+        assert compile_converter(tuple[int, ...])(["1", "2"]) == (1, 2)
+        assert compile_converter(tuple[int, str])(["1", 2]) == (1, "2")
+        with pytest.raises(ValueError):
+            compile_converter(tuple[int, str])([1])
+        with pytest.raises(ValueError):
+            compile_converter(Union[int, str])("1")
+
+    def test_models(self):
+        """Test pydantic models from dicts and positional lists"""
+        convert = compile_converter(list[Coordinates])
+        result = convert([["52.5", "13.4"], {"latitude": 1, "longitude": 2}])
+        assert result == [
+            Coordinates(latitude=52.5, longitude=13.4),
+            Coordinates(latitude=1, longitude=2),
+        ]
+        with pytest.raises(ValueError):
+            convert([[1, 2, 3]])
+
+
 class TestSafeCast:
     """Test cases for safe_cast function"""
 